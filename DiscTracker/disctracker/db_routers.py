@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# Only reads made while this is set go to the replica, anything else such as
+# the refresh or a view that writes keeps reading what it wrote from the primary
+_replica_reads = ContextVar("replica_reads", default=False)
+
+ALL_USERS_PIN_KEY = "primary_pin:all"
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICA_ALIAS and _replica_reads.get():
+            return settings.DATABASE_REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Otherwise saving an instance read from the replica would write there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != settings.DATABASE_REPLICA_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICA_ALIAS or is_pinned_to_primary(request.user.id):
+            return view_func(request, *args, **kwargs)
+
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def pin_to_primary(user_id: Optional[int] = None) -> None:
+    # Without a user every user is pinned, for changes that touch them all
+    if settings.DATABASE_REPLICA_ALIAS:
+        cache.set(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id: Optional[int]) -> bool:
+    keys = [ALL_USERS_PIN_KEY]
+    if user_id is not None:
+        keys.append(_pin_key(user_id))
+    return bool(cache.get_many(keys))
+
+
+def _pin_key(user_id: Optional[int]) -> str:
+    if user_id is None:
+        return ALL_USERS_PIN_KEY
+    return f"primary_pin:{user_id}"
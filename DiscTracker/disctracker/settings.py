@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "items.apps.ItemsConfig",
     "django_filters",
     "crispy_forms",
@@ -74,6 +75,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "disctracker.middleware.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "disctracker.urls"
@@ -183,6 +185,39 @@ DATABASES = {
     }
 }
 
+# Read replica for read only views, pointing it at the primary's host simulates one
+DATABASE_REPLICA_HOST = env("DATABASE_REPLICA_HOST", default=None)
+DATABASE_REPLICA_ALIAS = "replica" if DATABASE_REPLICA_HOST else None
+if DATABASE_REPLICA_ALIAS:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES["default"],
+        "HOST": DATABASE_REPLICA_HOST,
+        "PORT": env("DATABASE_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        # Tests point the replica at the test database instead of creating one
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["disctracker.db_routers.ReplicaRouter"]
+# Seconds a user reads from the primary after changing something so they see it
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("REDIS_URL"),
+        "KEY_PREFIX": "disctracker",
+    }
+}
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+
+# Reads come from Redis and writes go through to Postgres, so a cache flush or
+# restart doesn't log everyone out
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -229,6 +264,39 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Price History
+# Also store price history as (valid_from, valid_to) intervals that are extended
+# while the price stays the same
+PRICE_INTERVALS_ENABLED = env.bool("PRICE_INTERVALS_ENABLED", default=False)
+
+# Also store each item's price history as compact delta encoded blocks per year
+PRICE_SERIES_STORE_ENABLED = env.bool("PRICE_SERIES_STORE_ENABLED", default=False)
+
+# Cold price history moved out of Postgres by the archive_price_history command
+PRICE_HISTORY_ARCHIVE_DIR = env(
+    "PRICE_HISTORY_ARCHIVE_DIR", default=os.path.join(BASE_DIR, "archive")
+)
+
+# CEX
+CEX_API_BASE_URL = env(
+    "CEX_API_BASE_URL", default="https://wss2.cex.uk.webuy.io/v3/boxes"
+)
+# Seconds the async client waits on CEX before giving up
+CEX_REQUEST_TIMEOUT = env.float("CEX_REQUEST_TIMEOUT", default=10.0)
+# Items checked within this many days are added from the catalogue without
+# asking CEX, older ones are refreshed in the background
+ITEM_FRESHNESS_DAYS = env.int("ITEM_FRESHNESS_DAYS", default=1)
+# Budget for bulk imports, which fetch unknown items from CEX in parallel
+CEX_REQUESTS_PER_SECOND = env.float("CEX_REQUESTS_PER_SECOND", default=5.0)
+BULK_IMPORT_WORKERS = env.int("BULK_IMPORT_WORKERS", default=4)
+
+# Live price changes pushed to open pages over server-sent events
+PRICE_EVENTS_REDIS_URL = env("PRICE_EVENTS_REDIS_URL", default=env("REDIS_URL"))
+# Seconds between comments that keep idle streams open through proxies
+PRICE_EVENTS_KEEPALIVE_SECONDS = env.float(
+    "PRICE_EVENTS_KEEPALIVE_SECONDS", default=15.0
+)
+
 # Celery Configuration Options
 CELERY_BROKER_URL = env("REDIS_URL")
 CELERY_RESULT_BACKEND = env("REDIS_URL")
@@ -31,4 +31,5 @@ urlpatterns = [
     ),
     path("admin/", admin.site.urls),
     path("items/", include("items.urls")),
+    path("api/", include("items.api_urls")),
 ]
@@ -1,8 +1,22 @@
 from django.contrib import admin
 
-from items.models.db_models import Item, UserItem, PriceHistory
+from items.models.db_models import (
+    ApiToken,
+    ImportJob,
+    Item,
+    ItemPriceStats,
+    PriceHistory,
+    PriceInterval,
+    PriceSeriesBlock,
+    UserItem,
+)
 
 # Register your models here.
 admin.site.register(Item)
 admin.site.register(UserItem)
 admin.site.register(PriceHistory)
+admin.site.register(PriceInterval)
+admin.site.register(ItemPriceStats)
+admin.site.register(PriceSeriesBlock)
+admin.site.register(ImportJob)
+admin.site.register(ApiToken)
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from items import api_views
+
+app_name = "api"
+urlpatterns = [
+    # ex: /api/items?title=alien&fields=cex_id,title&cursor=...
+    path("items", api_views.item_list, name="item-list"),
+    # ex: /api/items/5060020626449
+    path("items/<str:cex_id>", api_views.item_detail, name="item-detail"),
+    path("items/<str:cex_id>/history", api_views.item_history, name="item-history"),
+]
@@ -0,0 +1,282 @@
+import logging
+
+from django.db import DatabaseError
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from disctracker.db_routers import read_from_replica
+from items.filters import NULLABLE_ORDERING_FIELDS, ItemFilter
+from items.models.db_models import Item, PriceHistory
+from items.pagination import KeysetPaginator
+from items.permissions import api_token_required
+from items.services.collection_cache_service import CollectionCacheService
+from items.services.item_service import ItemService
+from items.services.price_chart_service import PriceChartService
+from items.services.price_history_service import PriceHistoryService
+from items.services.price_stats_service import PRICE_FIELDS
+from items.services.user_item_service import UserItemService
+from items.validators.item_validator import ItemDataValidator
+
+logger = logging.getLogger(__name__)
+
+API_ITEM_FIELDS = [
+    "cex_id",
+    "title",
+    "sell_price",
+    "exchange_price",
+    "cash_price",
+    "last_checked",
+]
+API_ITEM_STATS_FIELDS = [
+    f"{field}_{stat}"
+    for field in PRICE_FIELDS
+    for stat in ("min", "max", "avg", "change_30d")
+]
+API_DEFAULT_LIST_FIELDS = [*API_ITEM_FIELDS, "sell_price_change_30d"]
+API_HISTORY_FIELDS = ["date_checked", *PRICE_FIELDS]
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 200
+
+
+@require_safe
+@api_token_required
+@read_from_replica
+def item_list(request):
+    try:
+        try:
+            fields = _parse_fields(request.GET, API_DEFAULT_LIST_FIELDS)
+            limit = _parse_limit(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        item_service = ItemService(
+            validator=ItemDataValidator(),
+            user_item_service=UserItemService(),
+            price_history_service=PriceHistoryService(),
+        )
+        item_filter = ItemFilter(
+            request.GET, queryset=item_service.get_user_items(request.user)
+        )
+        if not item_filter.is_valid():
+            return JsonResponse(
+                {"error": "Invalid filters.", "filters": item_filter.errors},
+                status=400,
+            )
+
+        etag = _get_etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _api_response(not_modified, etag)
+
+        ordering = item_filter.get_ordering()
+        paginator = KeysetPaginator(
+            _select_item_fields(item_filter.qs, fields, ordering),
+            limit,
+            ordering=ordering,
+            nullable_fields=NULLABLE_ORDERING_FIELDS,
+        )
+        page = paginator.get_page(request.GET.get("cursor"))
+
+        return _api_response(
+            JsonResponse(
+                {
+                    "results": [
+                        _serialise_item(item, fields) for item in page.object_list
+                    ],
+                    "next_cursor": page.next_cursor,
+                    "previous_cursor": page.previous_cursor,
+                }
+            ),
+            etag,
+        )
+    except DatabaseError as e:
+        logger.exception("Database error occured: %s", e)
+        return JsonResponse(
+            {"error": "Database error. Please try again later."}, status=500
+        )
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        return JsonResponse(
+            {"error": "An unexpected error occurred. Please try again later."},
+            status=500,
+        )
+
+
+@require_safe
+@api_token_required
+@read_from_replica
+def item_detail(request, cex_id):
+    try:
+        try:
+            fields = _parse_fields(
+                request.GET, [*API_ITEM_FIELDS, *API_ITEM_STATS_FIELDS]
+            )
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        etag = _get_etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _api_response(not_modified, etag)
+
+        item = _select_item_fields(
+            Item.objects.filter(cex_id=cex_id, useritem__user=request.user), fields
+        ).first()
+        if item is None:
+            return JsonResponse({"error": "Item not found."}, status=404)
+
+        return _api_response(JsonResponse(_serialise_item(item, fields)), etag)
+    except DatabaseError as e:
+        logger.exception("Database error occured: %s", e)
+        return JsonResponse(
+            {"error": "Database error. Please try again later."}, status=500
+        )
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        return JsonResponse(
+            {"error": "An unexpected error occurred. Please try again later."},
+            status=500,
+        )
+
+
+@require_safe
+@api_token_required
+@read_from_replica
+def item_history(request, cex_id):
+    try:
+        try:
+            limit = _parse_limit(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        # New entries only move the item's history version, not the collection's
+        history_version = PriceChartService().get_history_version(cex_id)
+        etag = _get_etag(request, history_version)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _api_response(not_modified, etag)
+
+        item = (
+            Item.objects.filter(cex_id=cex_id, useritem__user=request.user)
+            .only("id")
+            .first()
+        )
+        if item is None:
+            return JsonResponse({"error": "Item not found."}, status=404)
+
+        paginator = KeysetPaginator(
+            PriceHistory.objects.filter(item=item).only(*API_HISTORY_FIELDS),
+            limit,
+            ordering=["-date_checked", "-id"],
+        )
+        page = paginator.get_page(request.GET.get("cursor"))
+
+        return _api_response(
+            JsonResponse(
+                {
+                    "results": [
+                        {field: getattr(entry, field) for field in API_HISTORY_FIELDS}
+                        for entry in page.object_list
+                    ],
+                    "next_cursor": page.next_cursor,
+                    "previous_cursor": page.previous_cursor,
+                }
+            ),
+            etag,
+        )
+    except DatabaseError as e:
+        logger.exception("Database error occured: %s", e)
+        return JsonResponse(
+            {"error": "Database error. Please try again later."}, status=500
+        )
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        return JsonResponse(
+            {"error": "An unexpected error occurred. Please try again later."},
+            status=500,
+        )
+
+
+def _parse_fields(query_params, default_fields):
+    requested = query_params.get("fields")
+    if not requested:
+        return default_fields
+
+    fields = list(dict.fromkeys(field.strip() for field in requested.split(",")))
+    unknown = [
+        field
+        for field in fields
+        if field not in API_ITEM_FIELDS and field not in API_ITEM_STATS_FIELDS
+    ]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _parse_limit(query_params):
+    try:
+        limit = int(query_params.get("limit", API_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be a whole number")
+
+    if not 1 <= limit <= API_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {API_MAX_LIMIT}")
+    return limit
+
+
+def _select_item_fields(queryset, fields, ordering=()):
+    # Only the requested columns and those the cursor seeks on are read
+    columns = {"id", *(field for field in fields if field in API_ITEM_FIELDS)}
+    stats_columns = {
+        f"price_stats__{field}" for field in fields if field in API_ITEM_STATS_FIELDS
+    }
+    for order_field in ordering:
+        field_name = order_field.lstrip("-")
+        if field_name.startswith("price_stats__"):
+            stats_columns.add(field_name)
+        elif field_name in API_ITEM_FIELDS:
+            columns.add(field_name)
+
+    if not stats_columns:
+        return queryset.select_related(None).only(*columns)
+    return queryset.select_related("price_stats").only(*columns, *stats_columns)
+
+
+def _serialise_item(item, fields):
+    price_stats = None
+    if any(field in API_ITEM_STATS_FIELDS for field in fields):
+        # Items without any price history have no stats
+        price_stats = getattr(item, "price_stats", None)
+
+    return {
+        field: getattr(price_stats, field, None)
+        if field in API_ITEM_STATS_FIELDS
+        else getattr(item, field)
+        for field in fields
+    }
+
+
+def _get_etag(request, *versions):
+    # Built from cached versions alone so an unchanged response skips the database
+    collection_cache_service = CollectionCacheService()
+    version = "-".join(
+        [
+            collection_cache_service.get_collection_version(request.user.id),
+            *map(str, versions),
+        ]
+    )
+    return quote_etag(
+        collection_cache_service.get_api_etag(
+            request.user.id, version, request.path, request.GET
+        )
+    )
+
+
+def _api_response(response, etag):
+    response["ETag"] = etag
+    # Clients must revalidate, which the ETag makes a cheap 304
+    response["Cache-Control"] = "private, no-cache"
+    response["Vary"] = "Authorization"
+    return response
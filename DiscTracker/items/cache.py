@@ -0,0 +1,96 @@
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from disctracker.db_routers import pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+VERSION_TIMEOUT = 60 * 60 * 24 * 30
+# Outlasts the slowest build, so a worker that dies mid build only holds it briefly
+BUILD_LOCK_TIMEOUT = 30
+BUILD_WAIT_SECONDS = 5
+BUILD_POLL_SECONDS = 0.05
+
+
+class CacheNamespace:
+    def __init__(self, name: str, timeout: Optional[int] = None):
+        self.name = name
+        self.timeout = timeout
+
+    def key(self, *parts) -> str:
+        return ":".join([self.name, *(str(part) for part in parts)])
+
+    def get(self, key: str) -> Any:
+        return cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        cache.set(key, value, timeout=self.timeout)
+
+    def get_version(self, *parts) -> int:
+        key = self.key("version", *parts)
+        version = cache.get(key)
+
+        if version is None:
+            # Start from the clock so a flushed cache can never reuse an old version
+            cache.add(key, time.time_ns(), timeout=VERSION_TIMEOUT)
+            version = cache.get(key)
+
+        return version
+
+    def bump_version(self, *parts, pin_user_id: Optional[int] = None) -> None:
+        # A lagging replica read would be cached as the new version, so readers
+        # stay on the primary until it catches up. Without a user that is everyone.
+        pin_to_primary(pin_user_id)
+        key = self.key("version", *parts)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=VERSION_TIMEOUT)
+
+    def bump_version_on_commit(self, *parts, pin_user_id: Optional[int] = None) -> None:
+        # Bumping before commit would let a reader cache the old rows as the new version
+        transaction.on_commit(
+            lambda: self.bump_version(*parts, pin_user_id=pin_user_id)
+        )
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> Any:
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        # Only one worker builds a missing value, the rest wait for its copy
+        # instead of all running the same queries at once
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, True, timeout=BUILD_LOCK_TIMEOUT):
+            try:
+                # Another worker may have finished between the read and the lock
+                value = cache.get(key)
+                if value is not None:
+                    return value
+                return self._build(key, build)
+            finally:
+                cache.delete(lock_key)
+
+        deadline = time.monotonic() + BUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(BUILD_POLL_SECONDS)
+            value = cache.get(key)
+            if value is not None:
+                return value
+            if cache.get(lock_key) is None:
+                # The build failed or had nothing to cache
+                break
+        else:
+            logger.warning(f"Timed out waiting for {key} to be built")
+
+        return self._build(key, build)
+
+    def _build(self, key: str, build: Callable[[], Any]) -> Any:
+        value = build()
+        if value is not None:
+            self.set(key, value)
+        return value
@@ -1,10 +1,18 @@
 import django_filters
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Upper
 from items.models.db_models import Item
 
 
+# Items without any price history have no stats so these sort last
+NULLABLE_ORDERING_FIELDS = ["price_stats__sell_price_change_30d"]
+
+
 class ItemFilter(django_filters.FilterSet):
-    title = django_filters.CharFilter(
-        field_name="title", lookup_expr="icontains", label="Title (Search)"
+    title = django_filters.CharFilter(method="filter_title", label="Title (Search)")
+    fuzzy_title = django_filters.BooleanFilter(
+        method="filter_fuzzy_title", label="Typo Tolerant Title Search"
     )
     sell_price_min = django_filters.NumberFilter(
         field_name="sell_price", lookup_expr="gt", label="Minimum Sell Price"
@@ -24,6 +32,15 @@ class ItemFilter(django_filters.FilterSet):
     cash_price_max = django_filters.NumberFilter(
         field_name="cash_price", lookup_expr="lt", label="Maximum Cash Price"
     )
+    sell_price_change_30d_max = django_filters.NumberFilter(
+        field_name="price_stats__sell_price_change_30d",
+        lookup_expr="lt",
+        label="Maximum 30 Day Sell Price Change",
+    )
+    sell_price_at_all_time_low = django_filters.BooleanFilter(
+        method="filter_sell_price_at_all_time_low",
+        label="Sell Price At All-Time Low",
+    )
 
     ordering = django_filters.OrderingFilter(
         choices=(
@@ -37,6 +54,14 @@ class ItemFilter(django_filters.FilterSet):
             ("-cash_price", "Cash Price (High To Low)"),
             ("last_checked", "Last Price Change (Oldest First)"),
             ("-last_checked", "Last Price Change (Newest First)"),
+            (
+                "price_stats__sell_price_change_30d",
+                "30 Day Sell Price Change (Biggest Drop First)",
+            ),
+            (
+                "-price_stats__sell_price_change_30d",
+                "30 Day Sell Price Change (Biggest Rise First)",
+            ),
         ),
         label="Order by",
     )
@@ -50,9 +75,68 @@ class ItemFilter(django_filters.FilterSet):
 
         order_by = self.data.get("ordering")
 
+        if not order_by and self._is_fuzzy_title_search():
+            # Closest matches first unless the user picked another ordering
+            return queryset.order_by("-title_similarity", "id")
+
         if order_by:
             if order_by.startswith("-"):
-                queryset = queryset.order_by(order_by, "-id")  # Descending order
+                queryset = queryset.order_by(
+                    self._order_field(order_by), "-id"
+                )  # Descending order
             else:
-                queryset = queryset.order_by(order_by, "id")  # Ascending order
+                queryset = queryset.order_by(
+                    self._order_field(order_by), "id"
+                )  # Ascending order
         return queryset
+
+    def get_ordering(self):
+        order_by = self.form.cleaned_data.get("ordering") if self.is_valid() else None
+        if not order_by and self._is_fuzzy_title_search():
+            return ["-title_similarity", "id"]
+        order_by = order_by[0] if order_by else "title"
+
+        if order_by.startswith("-"):
+            return [order_by, "-id"]
+        return [order_by, "id"]
+
+    def filter_title(self, queryset, name, value):
+        if not self._is_fuzzy_title_search():
+            return queryset.filter(title__icontains=value)
+
+        # Upper cased on both sides so % is answered by the same trigram index.
+        # similarity() returns a real, which comes back to Python rounded, so a
+        # page cursor holding it would never compare equal to the row again.
+        return queryset.annotate(
+            upper_title=Upper("title"),
+            title_similarity=Cast(
+                TrigramSimilarity(Upper("title"), value.upper()), FloatField()
+            ),
+        ).filter(
+            Q(upper_title__trigram_similar=value.upper()) | Q(title__icontains=value)
+        )
+
+    def filter_fuzzy_title(self, queryset, name, value):
+        # Only changes how filter_title matches
+        return queryset
+
+    def filter_sell_price_at_all_time_low(self, queryset, name, value):
+        if value:
+            return queryset.filter(sell_price__lte=F("price_stats__sell_price_min"))
+        return queryset.exclude(sell_price__lte=F("price_stats__sell_price_min"))
+
+    def _is_fuzzy_title_search(self):
+        return bool(
+            self.is_valid()
+            and self.form.cleaned_data.get("title")
+            and self.form.cleaned_data.get("fuzzy_title")
+        )
+
+    def _order_field(self, order_by):
+        field_name = order_by.lstrip("-")
+        if field_name not in NULLABLE_ORDERING_FIELDS:
+            return order_by
+
+        if order_by.startswith("-"):
+            return F(field_name).desc(nulls_last=True)
+        return F(field_name).asc(nulls_last=True)
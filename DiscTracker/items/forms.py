@@ -1,6 +1,16 @@
+import csv
+import io
+import re
+
 from django import forms
 from crispy_forms.helper import FormHelper, Layout
 from crispy_forms.layout import Submit, Field
+from django.urls import reverse_lazy
+
+from items.services.bulk_import_service import BULK_IMPORT_MAX_IDS
+from items.services.price_chart_service import COMPARE_MAX_ITEMS
+
+CEX_ID_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
 
 
 class AddItemForm(forms.Form):
@@ -20,6 +30,68 @@ class AddItemForm(forms.Form):
     cex_id = forms.CharField(label="CEX ID", max_length=100)
 
 
+class BulkAddItemsForm(forms.Form):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.form_id = "id-bulkAddItemsForm"
+        self.helper.form_class = "mainForms"
+        self.helper.form_method = "post"
+        self.helper.form_action = reverse_lazy("items:bulk-add")
+        self.helper.layout = Layout(
+            Field("cex_ids", placeholder="One CEX ID per line..."),
+            Field("csv_file"),
+            Submit("submit", "Import Items"),
+        )
+
+    cex_ids = forms.CharField(
+        label="CEX IDs",
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 8}),
+    )
+    csv_file = forms.FileField(
+        label="Or upload a CSV with the IDs in the first column", required=False
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+
+        cex_ids = re.split(r"[\s,;]+", cleaned_data.get("cex_ids") or "")
+        if cleaned_data.get("csv_file"):
+            cex_ids += self._read_csv(cleaned_data["csv_file"])
+        cex_ids = list(dict.fromkeys(cex_id for cex_id in cex_ids if cex_id))
+
+        if not cex_ids:
+            raise forms.ValidationError("Enter some CEX IDs or upload a CSV.")
+
+        invalid = [cex_id for cex_id in cex_ids if not CEX_ID_PATTERN.match(cex_id)]
+        if invalid:
+            raise forms.ValidationError(
+                f"Not valid CEX IDs: {', '.join(invalid[:5])}"
+                + (f" and {len(invalid) - 5} more" if len(invalid) > 5 else "")
+            )
+
+        if len(cex_ids) > BULK_IMPORT_MAX_IDS:
+            raise forms.ValidationError(
+                f"Import at most {BULK_IMPORT_MAX_IDS} items at a time."
+            )
+
+        cleaned_data["cex_ids"] = cex_ids
+        return cleaned_data
+
+    def _read_csv(self, csv_file):
+        try:
+            rows = csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8-sig"))
+            cex_ids = [row[0].strip() for row in rows if row and row[0].strip()]
+        except (UnicodeDecodeError, csv.Error):
+            raise forms.ValidationError("The CSV file could not be read.")
+
+        # Allow a header row such as "CEX ID"
+        if cex_ids and not CEX_ID_PATTERN.match(cex_ids[0]):
+            cex_ids = cex_ids[1:]
+        return cex_ids
+
+
 class UpdateItemPrices(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -46,3 +118,34 @@ class DeleteItemForm(forms.Form):
                 "submit", "Delete From Collection", css_class="btn btn-danger bt btn-sm"
             ),
         )
+
+
+class CompareItemsForm(forms.Form):
+    def __init__(self, *args, items=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["cex_id"].choices = [(item.cex_id, item.title) for item in items]
+        self.helper = FormHelper()
+        self.helper.form_id = "id-compareItemsForm"
+        self.helper.form_class = "mainForms"
+        self.helper.form_method = "get"
+        self.helper.attrs = {
+            "hx-get": reverse_lazy("items:compare-chart"),
+            "hx-target": "#chart-container",
+        }
+        self.helper.layout = Layout(
+            Field("cex_id"),
+            Field("price"),
+            Field("range"),
+            Submit("submit", "Compare"),
+        )
+
+    cex_id = forms.MultipleChoiceField(
+        label=f"Items (up to {COMPARE_MAX_ITEMS})",
+        widget=forms.CheckboxSelectMultiple,
+    )
+    price = forms.ChoiceField(
+        choices=[("sell", "Sell"), ("exchange", "Exchange"), ("cash", "Cash")]
+    )
+    range = forms.ChoiceField(
+        choices=[("1y", "1 year"), ("30d", "30 days"), ("all", "All")]
+    )
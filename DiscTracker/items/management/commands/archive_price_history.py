@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+
+
+class Command(BaseCommand):
+    help = "Moves price history older than a cutoff into compressed Parquet files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            type=str,
+            help="Archive price history checked before this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=730,
+            help="Archive price history older than this many days (default: 730)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of entries archived and deleted per batch (default: 5000)",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            type=str,
+            help="Directory to write the archive to (default: PRICE_HISTORY_ARCHIVE_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        before = options["before"]
+        batch_size = options["batch_size"]
+
+        if batch_size <= 0:
+            raise CommandError("Error: --batch-size must be greater than 0")
+
+        if before:
+            try:
+                cutoff = datetime.strptime(before, "%Y-%m-%d").date()
+            except Exception:
+                raise CommandError(
+                    "Error: Dates must be in format YYYY-MM-DD (e.g., 2024-02-10)"
+                )
+        else:
+            cutoff = date.today() - timedelta(days=options["older_than_days"])
+
+        archive_service = PriceHistoryArchiveService(archive_dir=options["archive_dir"])
+        archived_count = archive_service.archive_price_history(
+            cutoff, batch_size=batch_size
+        )
+
+        print(
+            f"Successfully archived {archived_count} price history entries before {cutoff}"
+        )
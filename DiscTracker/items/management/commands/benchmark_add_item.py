@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from items.models.db_models import Item, UserItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends concurrent add item requests through the async view against a fake "
+        "CEX that answers slowly. The items and user it creates are deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Number of concurrent add item requests (default: 20)",
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=0.5,
+            help="Seconds the fake CEX takes to answer (default: 0.5)",
+        )
+
+    def handle(self, *args, **options):
+        request_count = options["requests"]
+        delay = options["delay"]
+
+        if request_count <= 0 or delay < 0:
+            raise CommandError(
+                "Error: --requests must be positive and --delay not negative"
+            )
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), slow_cex_handler(delay))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        user = get_user_model().objects.create_user(
+            username=f"benchmark-add-item-{time.time_ns()}"
+        )
+        cex_ids = [f"BENCHADD{index}" for index in range(request_count)]
+
+        try:
+            with override_settings(
+                CEX_API_BASE_URL=f"http://127.0.0.1:{server.server_port}",
+                # The fake CEX has no budget, so the rate limit would only add waits
+                CEX_REQUESTS_PER_SECOND=request_count,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            ):
+                elapsed = async_to_sync(self.send_requests)(user, cex_ids)
+
+            added = UserItem.objects.filter(user=user).count()
+            serial = request_count * delay
+            print(
+                f"{request_count} concurrent adds against a CEX taking {delay:.2f}s: "
+                f"{elapsed:.2f}s, {added} of {request_count} items added"
+            )
+            print(
+                f"A worker blocked on each CEX call would need at least {serial:.2f}s, "
+                f"{serial / elapsed:.1f}x longer"
+            )
+        finally:
+            server.shutdown()
+            Item.objects.filter(cex_id__in=cex_ids).delete()
+            user.delete()
+
+    async def send_requests(self, user, cex_ids):
+        # A client per request so each has its own session like separate users
+        clients = [AsyncClient() for _ in cex_ids]
+        for client in clients:
+            await client.aforce_login(user)
+
+        url = reverse("items:add-item")
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                client.post(url, {"cex_id": cex_id})
+                for client, cex_id in zip(clients, cex_ids)
+            )
+        )
+        return time.perf_counter() - start
+
+
+def slow_cex_handler(delay):
+    class SlowCexHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            cex_id = self.path.strip("/").split("/")[0]
+            body = json.dumps(
+                {
+                    "response": {
+                        "ack": "success",
+                        "data": {
+                            "boxDetails": [
+                                {
+                                    "boxId": cex_id,
+                                    "boxName": f"Benchmark Item {cex_id}",
+                                    "sellPrice": 10.0,
+                                    "exchangePrice": 6.0,
+                                    "cashPrice": 4.0,
+                                }
+                            ]
+                        },
+                        "error": {"code": "", "internal_message": "", "moreInfo": []},
+                    }
+                }
+            ).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SlowCexHandler
@@ -0,0 +1,98 @@
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from items.models.db_models import Item, PriceHistory, UserItem
+from items.services.export_service import ExportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the time and peak memory of streaming collection exports with "
+        "price history of growing sizes. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=200,
+            help="Number of items in each collection (default: 200)",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=200000,
+            help="Price history rows in the largest export (default: 200000)",
+        )
+
+    def handle(self, *args, **options):
+        item_count = options["items"]
+        row_count = options["rows"]
+
+        if item_count <= 0 or row_count < item_count:
+            raise CommandError(
+                "Error: --items must be positive and --rows at least --items"
+            )
+
+        export_service = ExportService()
+
+        with transaction.atomic():
+            for size in (row_count // 16, row_count // 4, row_count):
+                user = self.seed_collection(item_count, max(size, item_count))
+
+                tracemalloc.start()
+                start = time.perf_counter()
+                body_size = 0
+                for chunk in export_service.export_collection(
+                    user, "csv", include_history=True
+                ):
+                    body_size += len(chunk)
+                elapsed = time.perf_counter() - start
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                print(
+                    f"{item_count} items x {max(size, item_count)} history rows: "
+                    f"{elapsed:.2f}s, peak memory {peak_memory / 1024:.1f} KiB, "
+                    f"body {body_size / 1024 / 1024:.1f} MiB"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed_collection(self, item_count, history_count):
+        user = get_user_model().objects.create_user(
+            username=f"benchmark-export-{time.time_ns()}"
+        )
+        items = Item.objects.bulk_create(
+            Item(
+                cex_id=f"BENCHEXPORT{user.id}X{index}",
+                title=f"Benchmark Export Item {index}",
+                sell_price=10,
+                exchange_price=6,
+                cash_price=4,
+            )
+            for index in range(item_count)
+        )
+        UserItem.objects.bulk_create(UserItem(user=user, item=item) for item in items)
+
+        points_per_item = history_count // item_count
+        start_date = date.today() - timedelta(days=points_per_item)
+        PriceHistory.objects.bulk_create(
+            (
+                PriceHistory(
+                    item=item,
+                    sell_price=10 + day % 5,
+                    exchange_price=6,
+                    cash_price=4,
+                    date_checked=start_date + timedelta(days=day),
+                )
+                for item in items
+                for day in range(points_per_item)
+            ),
+            batch_size=5000,
+        )
+        return user
@@ -0,0 +1,150 @@
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from statistics import mean
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.http import JsonResponse
+from items.models.db_models import Item, PriceHistory
+from items.services.price_chart_service import PriceChartService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the latency and peak memory of building chart JSON from model "
+        "instances against the lean tuple path. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--points",
+            type=int,
+            default=20000,
+            help="Number of price points for the item (default: 20000)",
+        )
+        parser.add_argument(
+            "--reads",
+            type=int,
+            default=5,
+            help="Number of timed reads per path (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        point_count = options["points"]
+        read_count = options["reads"]
+
+        if min(point_count, read_count) <= 0:
+            raise CommandError("Error: --points and --reads must be positive")
+
+        price_chart_service = PriceChartService()
+
+        with transaction.atomic():
+            item = self.seed_price_history(point_count)
+
+            def lean_chart():
+                data = price_chart_service.build_chart_data(item)
+                return price_chart_service.serialise_chart_data(data)[0]
+
+            def model_chart():
+                return self.build_chart_from_models(item)
+
+            if json.loads(lean_chart()) != json.loads(model_chart()):
+                raise CommandError("Error: The two paths produced different charts")
+
+            results = {
+                "Model instances": self.measure(model_chart, read_count),
+                "Lean tuples": self.measure(lean_chart, read_count),
+            }
+
+            transaction.set_rollback(True)
+
+        print(f"1 item x {point_count} points")
+        for name, (timings, peak_memory, size) in results.items():
+            print(
+                f"{name}: mean {mean(timings) * 1000:.2f} ms, "
+                f"peak memory {peak_memory / 1024:.1f} KiB, "
+                f"body {size / 1024:.1f} KiB"
+            )
+
+    def measure(self, build_chart, read_count):
+        timings = []
+        for _ in range(read_count):
+            start = time.perf_counter()
+            build_chart()
+            timings.append(time.perf_counter() - start)
+
+        # Measured separately as tracing allocations slows everything down
+        tracemalloc.start()
+        body = build_chart()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return timings, peak_memory, len(body)
+
+    def build_chart_from_models(self, item):
+        # How the chart view used to build its response
+        labels = []
+        sell_prices = []
+        exchange_prices = []
+        cash_prices = []
+
+        if item.price_history.exists():
+            for price_entry in item.price_history.all().order_by("date_checked"):
+                labels.append(price_entry.date_checked.strftime("%Y-%m-%d"))
+                sell_prices.append(float(price_entry.sell_price))
+                exchange_prices.append(float(price_entry.exchange_price))
+                cash_prices.append(float(price_entry.cash_price))
+
+        data = {
+            "labels": labels,
+            "datasets": [
+                {
+                    "label": "Sell Price",
+                    "data": sell_prices,
+                    "borderColor": "rgba(255, 99, 132, 1)",
+                    "fill": False,
+                },
+                {
+                    "label": "Exchange Price",
+                    "data": exchange_prices,
+                    "borderColor": "rgba(54, 162, 235, 1)",
+                    "fill": False,
+                },
+                {
+                    "label": "Cash Price",
+                    "data": cash_prices,
+                    "borderColor": "rgba(75, 192, 192, 1)",
+                    "fill": False,
+                },
+            ],
+        }
+        return JsonResponse(data).content
+
+    def seed_price_history(self, point_count):
+        item = Item.objects.create(
+            cex_id="BENCHCHART",
+            title="Benchmark Chart Item",
+            sell_price=10,
+            exchange_price=6,
+            cash_price=4,
+        )
+
+        start_date = date.today() - timedelta(days=point_count)
+        price_history = []
+        sell_pence = 1000
+        for day in range(point_count):
+            sell_pence = max(0, sell_pence + random.randint(-50, 50))
+            price_history.append(
+                PriceHistory(
+                    item=item,
+                    sell_price=sell_pence / 100,
+                    exchange_price=(sell_pence * 6 // 10) / 100,
+                    cash_price=(sell_pence * 4 // 10) / 100,
+                    date_checked=start_date + timedelta(days=day),
+                )
+            )
+        PriceHistory.objects.bulk_create(price_history, batch_size=5000)
+        return item
@@ -0,0 +1,129 @@
+import random
+import time
+from datetime import date, timedelta
+from statistics import mean
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from items.models.db_models import Item, PriceHistory
+from items.services.price_series_service import PriceSeriesService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the size and read latency of the row per point price history table "
+        "against the delta encoded price series store. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=20,
+            help="Number of synthetic items (default: 20)",
+        )
+        parser.add_argument(
+            "--points",
+            type=int,
+            default=2000,
+            help="Number of price points per item (default: 2000)",
+        )
+        parser.add_argument(
+            "--reads",
+            type=int,
+            default=5,
+            help="Number of timed reads per item (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        item_count = options["items"]
+        point_count = options["points"]
+        read_count = options["reads"]
+
+        if min(item_count, point_count, read_count) <= 0:
+            raise CommandError("Error: --items, --points and --reads must be positive")
+
+        price_series_service = PriceSeriesService()
+
+        with transaction.atomic():
+            history_size_before = self.relation_size("items_pricehistory")
+            series_size_before = self.relation_size("items_priceseriesblock")
+
+            items = self.seed_price_history(item_count, point_count)
+            history_size = (
+                self.relation_size("items_pricehistory") - history_size_before
+            )
+
+            for item in items:
+                price_series_service.rebuild_from_price_history(item)
+            series_size = (
+                self.relation_size("items_priceseriesblock") - series_size_before
+            )
+
+            row_timings = []
+            series_timings = []
+            for item in items:
+                for _ in range(read_count):
+                    start = time.perf_counter()
+                    rows = item.price_history.order_by("date_checked").values_list(
+                        "date_checked", "sell_price", "exchange_price", "cash_price"
+                    )
+                    [
+                        (str(date_checked), float(sell), float(exchange), float(cash))
+                        for date_checked, sell, exchange, cash in rows
+                    ]
+                    row_timings.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    price_series_service.get_price_series(item)
+                    series_timings.append(time.perf_counter() - start)
+
+            transaction.set_rollback(True)
+
+        total_points = item_count * point_count
+        print(f"{item_count} items x {point_count} points = {total_points} points")
+        print(
+            f"Row per point table: {history_size / 1024:.1f} KiB "
+            f"({history_size / total_points:.1f} bytes/point), "
+            f"mean read {mean(row_timings) * 1000:.2f} ms/item"
+        )
+        print(
+            f"Delta encoded store: {series_size / 1024:.1f} KiB "
+            f"({series_size / total_points:.1f} bytes/point), "
+            f"mean read {mean(series_timings) * 1000:.2f} ms/item"
+        )
+
+    def seed_price_history(self, item_count, point_count):
+        items = Item.objects.bulk_create(
+            Item(
+                cex_id=f"BENCH{index}",
+                title=f"Benchmark Item {index}",
+                sell_price=10,
+                exchange_price=6,
+                cash_price=4,
+            )
+            for index in range(item_count)
+        )
+
+        start_date = date.today() - timedelta(days=point_count)
+        for item in items:
+            price_history = []
+            sell_pence = 1000
+            for day in range(point_count):
+                sell_pence = max(0, sell_pence + random.randint(-50, 50))
+                price_history.append(
+                    PriceHistory(
+                        item=item,
+                        sell_price=sell_pence / 100,
+                        exchange_price=(sell_pence * 6 // 10) / 100,
+                        cash_price=(sell_pence * 4 // 10) / 100,
+                        date_checked=start_date + timedelta(days=day),
+                    )
+                )
+            PriceHistory.objects.bulk_create(price_history, batch_size=5000)
+        return items
+
+    def relation_size(self, table_name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table_name])
+            return cursor.fetchone()[0]
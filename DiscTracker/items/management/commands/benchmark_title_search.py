@@ -0,0 +1,104 @@
+import random
+import time
+from statistics import mean
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from items.filters import ItemFilter
+from items.models.db_models import Item
+
+SYLLABLES = ["ba", "ken", "lor", "mi", "nat", "ro", "sha", "tu", "vel", "zor"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares title search latency with and without the trigram index over "
+        "growing catalogue sizes. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10000, 50000, 200000],
+            help="Catalogue sizes to measure (default: 10000 50000 200000)",
+        )
+        parser.add_argument(
+            "--reads",
+            type=int,
+            default=10,
+            help="Number of timed searches per query (default: 10)",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["sizes"])
+        read_count = options["reads"]
+
+        if min(*sizes, read_count) <= 0:
+            raise CommandError("Error: --sizes and --reads must be positive")
+
+        # Titles are made of invented words so searches match a realistic few rows
+        vocabulary = [
+            "".join(random.choices(SYLLABLES, k=random.randint(2, 4))).title()
+            for _ in range(5000)
+        ]
+        word = max(vocabulary, key=len)
+        typo = word[:3] + word[4:]
+        searches = {
+            f"icontains '{word}'": {"title": word},
+            f"fuzzy '{typo}'": {"title": typo, "fuzzy_title": "true"},
+        }
+
+        with transaction.atomic():
+            seeded = 0
+            for size in sizes:
+                self.seed_items(seeded, size, vocabulary)
+                seeded = size
+
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE items_item")
+
+                for name, data in searches.items():
+                    indexed = self.time_search(data, read_count)
+                    scanned = self.time_search(data, read_count, use_index=False)
+                    print(
+                        f"{size} items, {name}: "
+                        f"trigram index {indexed * 1000:.2f} ms, "
+                        f"sequential scan {scanned * 1000:.2f} ms"
+                    )
+
+            transaction.set_rollback(True)
+
+    def time_search(self, data, read_count, use_index=True):
+        with connection.cursor() as cursor:
+            setting = "on" if use_index else "off"
+            cursor.execute(f"SET LOCAL enable_bitmapscan = {setting}")
+
+        timings = []
+        for _ in range(read_count):
+            start = time.perf_counter()
+            item_filter = ItemFilter(data, queryset=Item.objects.all())
+            # Ordered like the index page so every match has to be found
+            list(item_filter.qs.order_by(*item_filter.get_ordering())[:9])
+            timings.append(time.perf_counter() - start)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_bitmapscan = on")
+
+        return mean(timings)
+
+    def seed_items(self, start, end, vocabulary):
+        Item.objects.bulk_create(
+            (
+                Item(
+                    cex_id=f"BENCHTITLE{index}",
+                    title=" ".join(random.sample(vocabulary, 3)),
+                    sell_price=10,
+                    exchange_price=6,
+                    cash_price=4,
+                )
+                for index in range(start, end)
+            ),
+            batch_size=5000,
+        )
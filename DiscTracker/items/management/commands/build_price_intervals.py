@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from items.models.db_models import Item
+from items.services.price_interval_service import PriceIntervalService
+
+
+class Command(BaseCommand):
+    help = "Builds price intervals for every item from its existing price history"
+
+    def handle(self, *args, **options):
+        price_interval_service = PriceIntervalService()
+
+        total_intervals = 0
+        for item in Item.objects.all().iterator():
+            total_intervals += price_interval_service.rebuild_from_price_history(item)
+
+        print(f"Successfully built {total_intervals} price intervals")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from items.models.db_models import Item
+from items.services.price_series_service import PriceSeriesService
+
+
+class Command(BaseCommand):
+    help = "Builds the delta encoded price series for every item from its price history"
+
+    def handle(self, *args, **options):
+        price_series_service = PriceSeriesService()
+
+        total_points = 0
+        for item in Item.objects.all().iterator():
+            total_points += price_series_service.rebuild_from_price_history(item)
+
+        print(f"Successfully encoded {total_points} price points")
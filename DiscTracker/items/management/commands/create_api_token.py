@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from items.services.api_token_service import ApiTokenService
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates an API token for a user. The key is only shown once as just its "
+        "hash is stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User the token reads the API as")
+        parser.add_argument(
+            "--name",
+            default="default",
+            help="Name to tell the user's tokens apart (default: default)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Error: No user named {options['username']}")
+
+        token, key = ApiTokenService().create_token(user, options["name"])
+        if token is None:
+            raise CommandError("Error: Failed to create the API token")
+
+        print(f"Created API token {token.name} for {user.username}: {key}")
+        print("Send it as the header 'Authorization: Token <key>'")
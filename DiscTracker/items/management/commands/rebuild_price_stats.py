@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from items.services.price_stats_service import PriceStatsService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the per-item price statistics from the price history table"
+
+    def handle(self, *args, **options):
+        rebuilt_count = PriceStatsService().rebuild_price_stats()
+        print(f"Successfully rebuilt price stats for {rebuilt_count} items")
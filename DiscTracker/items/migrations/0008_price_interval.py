@@ -0,0 +1,96 @@
+# Generated by Django 5.1.5 on 2026-10-19 03:48
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0007_useritem_items_useri_user_id_df6d48_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceInterval",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sell_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                0, "Sell Price must be greater or equal to 0"
+                            ),
+                            django.core.validators.MaxValueValidator(
+                                3000, "Sell Price must be less than or equal to 3000"
+                            ),
+                        ],
+                    ),
+                ),
+                (
+                    "exchange_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                0, "Exchange Price must be greater or equal to 0"
+                            ),
+                            django.core.validators.MaxValueValidator(
+                                3000,
+                                "Exchange Price must be less than or equal to 3000",
+                            ),
+                        ],
+                    ),
+                ),
+                (
+                    "cash_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                0, "Cash Price must be greater or equal to 0"
+                            ),
+                            django.core.validators.MaxValueValidator(
+                                3000, "Cash Price must be less than or equal to 3000"
+                            ),
+                        ],
+                    ),
+                ),
+                ("valid_from", models.DateField(default=django.utils.timezone.now)),
+                ("valid_to", models.DateField(default=django.utils.timezone.now)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_intervals",
+                        to="items.item",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("item", "valid_from"), name="unique_item_valid_from"
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("valid_to__gte", models.F("valid_from"))),
+                        name="valid_to_after_valid_from",
+                    ),
+                ],
+            },
+        ),
+    ]
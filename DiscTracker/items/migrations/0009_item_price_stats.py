@@ -0,0 +1,120 @@
+# Generated by Django 5.1.5 on 2026-10-19 03:51
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+PRICE_FIELDS = ["sell_price", "exchange_price", "cash_price"]
+
+
+def populate_item_price_stats(apps, schema_editor):
+    PriceHistory = apps.get_model("items", "PriceHistory")
+    ItemPriceStats = apps.get_model("items", "ItemPriceStats")
+
+    aggregates = {"entry_count": Count("id")}
+    for field in PRICE_FIELDS:
+        aggregates[f"{field}_min"] = Min(field)
+        aggregates[f"{field}_max"] = Max(field)
+        aggregates[f"{field}_sum"] = Sum(field)
+
+    price_stats = []
+    for row in PriceHistory.objects.values("item_id").annotate(**aggregates):
+        for field in PRICE_FIELDS:
+            row[f"{field}_avg"] = (row[f"{field}_sum"] / row["entry_count"]).quantize(
+                Decimal("0.01")
+            )
+        price_stats.append(ItemPriceStats(**row))
+
+    # 30 day changes are filled in by the next price refresh
+    ItemPriceStats.objects.bulk_create(price_stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0008_price_interval"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemPriceStats",
+            fields=[
+                (
+                    "item",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="price_stats",
+                        serialize=False,
+                        to="items.item",
+                    ),
+                ),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                (
+                    "sell_price_min",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "sell_price_max",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "sell_price_sum",
+                    models.DecimalField(decimal_places=2, max_digits=16),
+                ),
+                (
+                    "sell_price_avg",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "sell_price_change_30d",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                (
+                    "exchange_price_min",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "exchange_price_max",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "exchange_price_sum",
+                    models.DecimalField(decimal_places=2, max_digits=16),
+                ),
+                (
+                    "exchange_price_avg",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "exchange_price_change_30d",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                (
+                    "cash_price_min",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "cash_price_max",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "cash_price_sum",
+                    models.DecimalField(decimal_places=2, max_digits=16),
+                ),
+                (
+                    "cash_price_avg",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "cash_price_change_30d",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            populate_item_price_stats, reverse_code=migrations.RunPython.noop
+        ),
+    ]
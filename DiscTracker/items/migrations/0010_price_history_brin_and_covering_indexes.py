@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-19 03:53
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0009_item_price_stats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pricehistory",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["date_checked"], name="items_pricehistory_date_brin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pricehistory",
+            index=models.Index(
+                fields=["item", "date_checked"],
+                include=("sell_price", "exchange_price", "cash_price"),
+                name="items_pricehistory_chart_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pricehistory",
+            name="item",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="price_history",
+                to="items.item",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.5 on 2026-10-19 03:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0010_price_history_brin_and_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceSeriesBlock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.PositiveSmallIntegerField()),
+                ("point_count", models.PositiveIntegerField(default=0)),
+                ("first_date", models.DateField()),
+                ("last_date", models.DateField()),
+                ("last_sell_price", models.IntegerField()),
+                ("last_exchange_price", models.IntegerField()),
+                ("last_cash_price", models.IntegerField()),
+                ("data", models.BinaryField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_series_blocks",
+                        to="items.item",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("item", "period"), name="unique_item_period"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0012_item_title_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["title", "id"], name="items_item_title_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["sell_price", "id"], name="items_item_sell_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["exchange_price", "id"], name="items_item_exchange_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["cash_price", "id"], name="items_item_cash_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["last_checked", "id"], name="items_item_checked_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-19 05:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("items", "0015_api_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="last_refreshed",
+            field=models.DateField(default=django.utils.timezone.now),
+        ),
+        # Existing items were last known to be refreshed when their price changed
+        migrations.RunSQL(
+            "UPDATE items_item SET last_refreshed = last_checked",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
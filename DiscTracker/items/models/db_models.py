@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.conf import settings
@@ -41,6 +43,29 @@ class Item(models.Model):
         ],
     )
     last_checked = models.DateField(default=timezone.now)
+    # Moves on every refresh, last_checked only when the price changes
+    last_refreshed = models.DateField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Trigrams of the upper cased title serve both icontains, which Django
+            # runs as UPPER(title) LIKE UPPER(...), and similarity searches
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="items_item_title_trgm",
+            ),
+            # One per ItemFilter ordering, with the id tie-break, so a page of the
+            # collection is read in order and stops once it has enough rows
+            models.Index(fields=["title", "id"], name="items_item_title_id_idx"),
+            models.Index(fields=["sell_price", "id"], name="items_item_sell_id_idx"),
+            models.Index(
+                fields=["exchange_price", "id"], name="items_item_exchange_id_idx"
+            ),
+            models.Index(fields=["cash_price", "id"], name="items_item_cash_id_idx"),
+            models.Index(
+                fields=["last_checked", "id"], name="items_item_checked_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -62,7 +87,10 @@ class UserItem(models.Model):
 
 class PriceHistory(models.Model):
     item = models.ForeignKey(
-        Item, related_name="price_history", on_delete=models.CASCADE
+        Item,
+        related_name="price_history",
+        on_delete=models.CASCADE,
+        db_index=False,  # Covered by items_pricehistory_chart_idx
     )
     sell_price = models.DecimalField(
         max_digits=10,
@@ -92,5 +120,173 @@ class PriceHistory(models.Model):
     )
     date_checked = models.DateField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Rows arrive in roughly date order so a tiny BRIN serves global range scans
+            BrinIndex(fields=["date_checked"], name="items_pricehistory_date_brin"),
+            # Lets per-item chart reads be index only scans
+            models.Index(
+                fields=["item", "date_checked"],
+                include=["sell_price", "exchange_price", "cash_price"],
+                name="items_pricehistory_chart_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Price History for {self.item.title} on {self.date_checked}"
+
+
+class PriceInterval(models.Model):
+    item = models.ForeignKey(
+        Item, related_name="price_intervals", on_delete=models.CASCADE
+    )
+    sell_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[
+            MinValueValidator(0, "Sell Price must be greater or equal to 0"),
+            MaxValueValidator(3000, "Sell Price must be less than or equal to 3000"),
+        ],
+    )
+    exchange_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[
+            MinValueValidator(0, "Exchange Price must be greater or equal to 0"),
+            MaxValueValidator(
+                3000, "Exchange Price must be less than or equal to 3000"
+            ),
+        ],
+    )
+    cash_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[
+            MinValueValidator(0, "Cash Price must be greater or equal to 0"),
+            MaxValueValidator(3000, "Cash Price must be less than or equal to 3000"),
+        ],
+    )
+    # First and last date the price was current, both inclusive, so intervals
+    # never overlap and each ends the day before the next one starts
+    valid_from = models.DateField(default=timezone.now)
+    valid_to = models.DateField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "valid_from"], name="unique_item_valid_from"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(valid_to__gte=models.F("valid_from")),
+                name="valid_to_after_valid_from",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Price Interval for {self.item.title} from {self.valid_from} to {self.valid_to}"
+
+
+class ItemPriceStats(models.Model):
+    item = models.OneToOneField(
+        Item, primary_key=True, related_name="price_stats", on_delete=models.CASCADE
+    )
+    entry_count = models.PositiveIntegerField(default=0)
+
+    sell_price_min = models.DecimalField(max_digits=10, decimal_places=2)
+    sell_price_max = models.DecimalField(max_digits=10, decimal_places=2)
+    sell_price_sum = models.DecimalField(max_digits=16, decimal_places=2)
+    sell_price_avg = models.DecimalField(max_digits=10, decimal_places=2)
+    sell_price_change_30d = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
+
+    exchange_price_min = models.DecimalField(max_digits=10, decimal_places=2)
+    exchange_price_max = models.DecimalField(max_digits=10, decimal_places=2)
+    exchange_price_sum = models.DecimalField(max_digits=16, decimal_places=2)
+    exchange_price_avg = models.DecimalField(max_digits=10, decimal_places=2)
+    exchange_price_change_30d = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
+
+    cash_price_min = models.DecimalField(max_digits=10, decimal_places=2)
+    cash_price_max = models.DecimalField(max_digits=10, decimal_places=2)
+    cash_price_sum = models.DecimalField(max_digits=16, decimal_places=2)
+    cash_price_avg = models.DecimalField(max_digits=10, decimal_places=2)
+    cash_price_change_30d = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Price Stats for {self.item.title}"
+
+
+class PriceSeriesBlock(models.Model):
+    item = models.ForeignKey(
+        Item, related_name="price_series_blocks", on_delete=models.CASCADE
+    )
+    period = models.PositiveSmallIntegerField()  # Year the block covers
+    point_count = models.PositiveIntegerField(default=0)
+    first_date = models.DateField()
+    last_date = models.DateField()
+    # Last point in pence so appends can delta encode without decoding the block
+    last_sell_price = models.IntegerField()
+    last_exchange_price = models.IntegerField()
+    last_cash_price = models.IntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "period"], name="unique_item_period"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Price Series for {self.item.title} in {self.period}"
+
+
+class ImportJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="import_jobs", on_delete=models.CASCADE
+    )
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    cex_ids = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    already_owned = models.PositiveIntegerField(default=0)
+    # IDs CEX had no item for
+    not_found = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.COMPLETED, self.Status.FAILED)
+
+    def __str__(self):
+        return f"Import of {self.total} items for {self.user.username}"
+
+
+class ApiToken(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="api_tokens", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=100)
+    # Only a hash is stored so a leaked database can't be used to call the API
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"API token {self.name} for {self.user.username}"
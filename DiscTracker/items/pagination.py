@@ -0,0 +1,184 @@
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.db.models import F, Q, QuerySet
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeysetPage:
+    object_list: List
+    has_next: bool = False
+    has_previous: bool = False
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+    approximate_count: Optional[int] = None
+    ordering: Sequence[str] = field(default_factory=list)
+
+
+class KeysetPaginator:
+    # Seeks past the last row shown instead of using OFFSET, so every page costs
+    # an index range scan of per_page rows however deep it is. The ordering
+    # must end with a unique field such as id so no two rows tie.
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        ordering: Sequence[str],
+        nullable_fields: Sequence[str] = (),
+        approximate_count: bool = False,
+    ):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.nullable_fields = set(nullable_fields)
+        self.approximate_count = approximate_count
+
+    def get_page(self, cursor: Optional[str] = None) -> KeysetPage:
+        position = self._decode_cursor(cursor)
+        backwards = bool(position) and position["direction"] == "previous"
+
+        queryset = self.queryset.order_by(*self._order_by(backwards))
+        if position:
+            queryset = queryset.filter(self._seek(position["values"], backwards))
+
+        # One extra row tells us whether there is another page without a COUNT
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+
+        # Going back past the start would leave a short page so show the first one
+        if backwards and not has_more:
+            return self.get_page()
+
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        page = KeysetPage(
+            object_list=rows,
+            has_next=has_more if not backwards else True,
+            has_previous=has_more if backwards else bool(position),
+            ordering=self.ordering,
+        )
+
+        if rows:
+            if page.has_next:
+                page.next_cursor = self._encode_cursor(rows[-1], "next")
+            if page.has_previous:
+                page.previous_cursor = self._encode_cursor(rows[0], "previous")
+
+        if self.approximate_count:
+            page.approximate_count = self._estimate_count()
+
+        return page
+
+    def _order_by(self, backwards: bool) -> list:
+        order_by = []
+        for field_name, descending in self._fields():
+            if field_name not in self.nullable_fields:
+                order_by.append(
+                    f"-{field_name}" if descending != backwards else field_name
+                )
+                continue
+
+            # Nulls sort last going forwards so they come first going backwards
+            nulls = {"nulls_first": True} if backwards else {"nulls_last": True}
+            if descending != backwards:
+                order_by.append(F(field_name).desc(**nulls))
+            else:
+                order_by.append(F(field_name).asc(**nulls))
+        return order_by
+
+    def _seek(self, values: list, backwards: bool) -> Q:
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y), with nulls treated as
+        # greater than every value because they sort last
+        condition = None
+        same_so_far = Q()
+
+        for (field_name, descending), value in zip(self._fields(), values):
+            nullable = field_name in self.nullable_fields
+            lookup = "lt" if descending != backwards else "gt"
+
+            if value is None:
+                beyond = Q(**{f"{field_name}__isnull": False}) if backwards else None
+                same = Q(**{f"{field_name}__isnull": True})
+            else:
+                beyond = Q(**{f"{field_name}__{lookup}": value})
+                if nullable and not backwards:
+                    beyond |= Q(**{f"{field_name}__isnull": True})
+                same = Q(**{field_name: value})
+
+            if beyond is not None:
+                step = same_so_far & beyond
+                condition = step if condition is None else condition | step
+            same_so_far &= same
+
+        if condition is None:
+            return Q(pk__in=[])
+
+        # The OR can't bound an index scan by itself so repeat the first column
+        # as a plain range the planner can start the scan from
+        field_name, descending = self._fields()[0]
+        if values[0] is not None and field_name not in self.nullable_fields:
+            lookup = "lte" if descending != backwards else "gte"
+            condition = Q(**{f"{field_name}__{lookup}": values[0]}) & condition
+
+        return condition
+
+    def _fields(self) -> list:
+        return [
+            (field_name.lstrip("-"), field_name.startswith("-"))
+            for field_name in self.ordering
+        ]
+
+    def _encode_cursor(self, row, direction: str) -> str:
+        values = [self._value(row, field_name) for field_name, _ in self._fields()]
+        payload = {"o": self.ordering, "d": direction, "v": values}
+        data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: Optional[str]) -> Optional[dict]:
+        if not cursor:
+            return None
+
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            direction = payload["d"]
+            values = payload["v"]
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring invalid page cursor {cursor}: {e}")
+            return None
+
+        # A cursor from before the ordering changed would seek on the wrong fields
+        if payload.get("o") != self.ordering or len(values) != len(self.ordering):
+            logger.info("Ignoring page cursor for a different ordering")
+            return None
+        if direction not in ("next", "previous"):
+            return None
+
+        return {"direction": direction, "values": values}
+
+    def _value(self, row, field_name: str):
+        value = row
+        for part in field_name.split("__"):
+            value = getattr(value, part, None)
+            if value is None:
+                return None
+        return value
+
+    def _estimate_count(self) -> Optional[int]:
+        # The planner's row estimate is free compared to COUNT(*) over the join
+        try:
+            plan = json.loads(self.queryset.order_by().explain(format="json"))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (DatabaseError, ValueError, KeyError, IndexError) as e:
+            logger.warning(f"Failed to estimate row count: {e}")
+            return None
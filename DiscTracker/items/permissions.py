@@ -1,6 +1,37 @@
+from functools import wraps
+
+from django.http import JsonResponse
+
+from items.services.api_token_service import ApiTokenService
+
+API_TOKEN_SCHEMES = ("token", "bearer")
+
+
 def is_admin(user):
     return user.is_authenticated and (user.is_staff or user.is_superuser)
 
 
 def is_in_group(user, group_name):
     return user.is_authenticated and user.groups.filter(name=group_name).exists()
+
+
+def api_token_required(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        scheme, _, key = request.headers.get("Authorization", "").partition(" ")
+        token = None
+        if scheme.lower() in API_TOKEN_SCHEMES:
+            token = ApiTokenService().authenticate(key.strip())
+
+        if token is None:
+            response = JsonResponse(
+                {"error": "Invalid or missing API token."}, status=401
+            )
+            response["WWW-Authenticate"] = "Token"
+            return response
+
+        # Replaces the session user so the API never reads or writes a session
+        request.user = token.user
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,228 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from items.models.db_models import (
+    ImportJob,
+    Item,
+    ItemPriceStats,
+    PriceHistory,
+    UserItem,
+)
+from items.models.pydantic_models import ItemData
+from items.services.cex_service import CexService
+from items.services.collection_cache_service import CollectionCacheService
+from items.services.price_interval_service import PriceIntervalService
+from items.services.price_series_service import PriceSeriesService
+from items.services.price_stats_service import PRICE_FIELDS
+from items.validators.item_validator import ItemDataValidator
+
+logger = logging.getLogger(__name__)
+
+BULK_IMPORT_MAX_IDS = 1000
+PROGRESS_UPDATE_EVERY = 10
+BULK_CREATE_BATCH_SIZE = 500
+
+
+class BulkImportService:
+    def __init__(
+        self,
+        cex_service: Optional[CexService] = None,
+        validator: Optional[ItemDataValidator] = None,
+        collection_cache_service: Optional[CollectionCacheService] = None,
+    ):
+        self.cex_service = cex_service or CexService()
+        self.validator = validator or ItemDataValidator()
+        self.collection_cache_service = (
+            collection_cache_service or CollectionCacheService()
+        )
+
+    def create_job(self, user, cex_ids: List[str]) -> Optional[ImportJob]:
+        try:
+            job = ImportJob.objects.create(
+                user=user, cex_ids=cex_ids, total=len(cex_ids)
+            )
+            logger.info(f"Created import job {job.id} of {job.total} items")
+            return job
+        except DatabaseError as e:
+            logger.exception(f"Database error while creating import job: {e}")
+            return None
+
+    def run_job(self, job_id) -> Optional[ImportJob]:
+        try:
+            job = ImportJob.objects.select_related("user").get(pk=job_id)
+        except ImportJob.DoesNotExist:
+            logger.error(f"Import job {job_id} does not exist")
+            return None
+
+        if job.is_finished:
+            logger.info(f"Import job {job_id} has already finished")
+            return job
+
+        try:
+            self._update_job(job, status=ImportJob.Status.RUNNING)
+
+            # Only IDs the catalogue doesn't know yet cost a request to CEX
+            known_item_ids = dict(
+                Item.objects.filter(cex_id__in=job.cex_ids).values_list("cex_id", "id")
+            )
+            unknown_cex_ids = [
+                cex_id for cex_id in job.cex_ids if cex_id not in known_item_ids
+            ]
+            self._update_job(job, processed=len(known_item_ids))
+
+            fetched_items, not_found = self._fetch_items(job, unknown_cex_ids)
+
+            with transaction.atomic():
+                new_item_ids = self._create_items(fetched_items)
+                added, already_owned = self._link_items(
+                    job.user, [*known_item_ids.values(), *new_item_ids]
+                )
+                self.collection_cache_service.invalidate_collections_on_commit(
+                    [job.user_id]
+                )
+                self._update_job(
+                    job,
+                    status=ImportJob.Status.COMPLETED,
+                    processed=job.total,
+                    added=added,
+                    already_owned=already_owned,
+                    not_found=not_found,
+                )
+
+            logger.info(
+                f"Import job {job.id} added {added} items, "
+                f"{already_owned} already owned and {len(not_found)} not found"
+            )
+            return job
+        except Exception as e:
+            logger.exception(f"Import job {job_id} failed: {e}")
+            self._update_job(job, status=ImportJob.Status.FAILED)
+            return None
+
+    def _fetch_items(
+        self, job: ImportJob, cex_ids: List[str]
+    ) -> Tuple[List[ItemData], List[str]]:
+        fetched_items = []
+        not_found = []
+        if not cex_ids:
+            return fetched_items, not_found
+
+        # fetch_item waits its turn in the shared CEX budget
+        with ThreadPoolExecutor(max_workers=settings.BULK_IMPORT_WORKERS) as executor:
+            futures = {
+                executor.submit(self.cex_service.fetch_item, cex_id): cex_id
+                for cex_id in cex_ids
+            }
+
+            for completed, future in enumerate(as_completed(futures), start=1):
+                item_data = self.validator.validate_item_data(future.result())
+                if item_data:
+                    fetched_items.append(item_data)
+                else:
+                    not_found.append(futures[future])
+
+                # The threads only talk to CEX, progress is written from here
+                if completed % PROGRESS_UPDATE_EVERY == 0:
+                    self._update_job(
+                        job, processed=job.processed + PROGRESS_UPDATE_EVERY
+                    )
+
+        return fetched_items, not_found
+
+    def _create_items(self, fetched_items: List[ItemData]) -> List[int]:
+        today = date.today()
+        Item.objects.bulk_create(
+            [
+                Item(
+                    cex_id=item_data.cex_id,
+                    title=item_data.title,
+                    sell_price=item_data.sell_price,
+                    exchange_price=item_data.exchange_price,
+                    cash_price=item_data.cash_price,
+                    last_checked=today,
+                )
+                for item_data in fetched_items
+            ],
+            ignore_conflicts=True,
+            batch_size=BULK_CREATE_BATCH_SIZE,
+        )
+
+        items = list(
+            Item.objects.filter(
+                cex_id__in=[item_data.cex_id for item_data in fetched_items]
+            )
+        )
+
+        # An item added by someone else while the job ran already has its stats
+        # and first price so only the ones without are written here
+        new_items = Item.objects.filter(
+            id__in=[item.id for item in items], price_stats__isnull=True
+        )
+        self._record_first_prices(list(new_items), today)
+
+        return [item.id for item in items]
+
+    def _record_first_prices(self, items: List[Item], on_date: date) -> None:
+        PriceHistory.objects.bulk_create(
+            [
+                PriceHistory(
+                    item=item,
+                    sell_price=item.sell_price,
+                    exchange_price=item.exchange_price,
+                    cash_price=item.cash_price,
+                    date_checked=on_date,
+                )
+                for item in items
+            ],
+            batch_size=BULK_CREATE_BATCH_SIZE,
+        )
+
+        stats = []
+        for item in items:
+            item_stats = ItemPriceStats(item=item, entry_count=1)
+            for field in PRICE_FIELDS:
+                price = getattr(item, field)
+                setattr(item_stats, f"{field}_min", price)
+                setattr(item_stats, f"{field}_max", price)
+                setattr(item_stats, f"{field}_sum", price)
+                setattr(item_stats, f"{field}_avg", price)
+            stats.append(item_stats)
+        ItemPriceStats.objects.bulk_create(stats, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        # The optional stores have no bulk path but are off by default
+        if settings.PRICE_SERIES_STORE_ENABLED:
+            price_series_service = PriceSeriesService()
+            for item in items:
+                price_series_service.append_price(
+                    item, item.sell_price, item.exchange_price, item.cash_price, on_date
+                )
+        if settings.PRICE_INTERVALS_ENABLED:
+            price_interval_service = PriceIntervalService()
+            for item in items:
+                price_interval_service.record_price(item, on_date)
+
+    def _link_items(self, user, item_ids: List[int]) -> Tuple[int, int]:
+        owned_item_ids = set(
+            UserItem.objects.filter(user=user, item_id__in=item_ids).values_list(
+                "item_id", flat=True
+            )
+        )
+        new_user_items = [
+            UserItem(user=user, item_id=item_id)
+            for item_id in dict.fromkeys(item_ids)
+            if item_id not in owned_item_ids
+        ]
+        UserItem.objects.bulk_create(
+            new_user_items, ignore_conflicts=True, batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        return len(new_user_items), len(owned_item_ids)
+
+    def _update_job(self, job: ImportJob, **fields) -> None:
+        for field, value in fields.items():
+            setattr(job, field, value)
+        job.save(update_fields=[*fields, "updated_at"])
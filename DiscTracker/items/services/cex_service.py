@@ -1,6 +1,14 @@
+import asyncio
+import math
+import time
+from functools import cache
 from typing import Optional
+import httpx
 import requests
 import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache as django_cache
 from pydantic import ValidationError
 
 from items.models.pydantic_models import (
@@ -11,32 +19,63 @@ from items.models.pydantic_models import (
 
 logger = logging.getLogger(__name__)
 
-CEX_API_BASE_URL = "https://wss2.cex.uk.webuy.io/v3/boxes"
+CEX_RATE_LIMIT_KEY = "cex_requests"
+
+
+class RateLimiter:
+    # Counts calls per window in the shared cache, so the imports, the price
+    # updates and the add view on every worker draw from one CEX budget
+    def __init__(self, calls_per_second: Optional[float] = None):
+        self.calls_per_second = calls_per_second
+
+    def wait(self) -> None:
+        while (delay := self._try_acquire()) > 0:
+            time.sleep(delay)
+
+    async def await_turn(self) -> None:
+        while (delay := await sync_to_async(self._try_acquire)()) > 0:
+            await asyncio.sleep(delay)
+
+    def _try_acquire(self) -> float:
+        # Returns 0 once a call may go ahead, otherwise the seconds until the
+        # next window opens
+        calls_per_second = self.calls_per_second or settings.CEX_REQUESTS_PER_SECOND
+        # Slower rates than one a second get longer windows of a single call
+        window_seconds = max(1.0, 1 / calls_per_second)
+        limit = max(1, int(calls_per_second * window_seconds))
+
+        now = time.time()
+        window = int(now // window_seconds)
+        key = f"{CEX_RATE_LIMIT_KEY}:{window}"
+        try:
+            django_cache.add(key, 0, timeout=math.ceil(window_seconds) + 1)
+            count = django_cache.incr(key)
+        except ValueError:
+            # Expired between the add and the incr, so the window is over
+            return 0.01
+        except Exception as e:
+            # Fetching unthrottled beats failing every fetch while the cache is down
+            logger.warning(f"Failed to check the CEX rate limit: {e}")
+            return 0
+
+        if count <= limit:
+            return 0
+        return max((window + 1) * window_seconds - now, 0.01)
 
 
 class CexService:
-    def __init__(self):
-        pass
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
+        self.rate_limiter = rate_limiter or RateLimiter()
 
     def fetch_item(self, cex_id) -> Optional[ItemData]:
         if not self._validate_cex_id(cex_id):
             logger.error("CEX ID validation failed")
             return None
 
+        self.rate_limiter.wait()
         try:
             response_json = self._get_item_data(cex_id)
-            validated_response = self._validate_response(response_json)
-
-            if not validated_response:
-                logger.error(f"Response validation failed for {cex_id}")
-                return None
-
-            logger.info("Successfully fetched item with CEX ID %s", cex_id)
-
-            api_data = validated_response.response.data.boxDetails
-            item_data = ItemData.from_api(api_data)
-
-            return item_data
+            return self._to_item_data(cex_id, response_json)
         except requests.exceptions.HTTPError as e:
             logger.exception(
                 "HTTP Error when fetching item by CEX ID %s: %s", cex_id, e
@@ -55,8 +94,37 @@ class CexService:
             )
             return None
 
+    async def afetch_item(self, cex_id) -> Optional[ItemData]:
+        if not self._validate_cex_id(cex_id):
+            logger.error("CEX ID validation failed")
+            return None
+
+        await self.rate_limiter.await_turn()
+        try:
+            response_json = await self._aget_item_data(cex_id)
+            return self._to_item_data(cex_id, response_json)
+        except Exception as e:
+            logger.exception(
+                "An unexpected error occurred for fetching item by CEX ID %s: %s",
+                cex_id,
+                e,
+            )
+            return None
+
+    def _to_item_data(self, cex_id, response_json) -> Optional[ItemData]:
+        validated_response = self._validate_response(response_json)
+
+        if not validated_response:
+            logger.error(f"Response validation failed for {cex_id}")
+            return None
+
+        logger.info("Successfully fetched item with CEX ID %s", cex_id)
+
+        api_data = validated_response.response.data.boxDetails
+        return ItemData.from_api(api_data)
+
     def _get_item_data(self, cex_id) -> Optional[dict]:
-        search_url = f"{CEX_API_BASE_URL}/{cex_id}/detail"
+        search_url = f"{settings.CEX_API_BASE_URL}/{cex_id}/detail"
 
         try:
             response = requests.get(search_url)
@@ -80,6 +148,34 @@ class CexService:
             )
             return None
 
+    async def _aget_item_data(self, cex_id) -> Optional[dict]:
+        search_url = f"{settings.CEX_API_BASE_URL}/{cex_id}/detail"
+
+        # Awaiting the response frees the event loop to serve other requests
+        # while CEX is slow to answer
+        try:
+            async with httpx.AsyncClient(
+                timeout=settings.CEX_REQUEST_TIMEOUT, verify=_ssl_context()
+            ) as client:
+                response = await client.get(search_url)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.exception(
+                "HTTP Error when fetching item by CEX ID %s: %s", cex_id, e
+            )
+            return None
+        except httpx.RequestError as e:
+            logger.exception(
+                "Request to CEX failed when fetching item by CEX ID %s: %s", cex_id, e
+            )
+            return None
+        except ValueError as e:
+            logger.exception(
+                "Failed to parse JSON response for CEX ID %s: %s", cex_id, e
+            )
+            return None
+
     def _validate_response(
         self, response_json: dict
     ) -> Optional[CexItemApiResponseWrapper]:
@@ -100,3 +196,10 @@ class CexService:
         except ValidationError as e:
             logger.exception(f"Error validating CEX ID: {e}")
             return False
+
+
+@cache
+def _ssl_context():
+    # Loading the CA bundle takes tens of milliseconds and would block the event
+    # loop if every client built its own
+    return httpx.create_ssl_context()
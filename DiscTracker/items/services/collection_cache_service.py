@@ -0,0 +1,70 @@
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+from items.cache import CacheNamespace
+from items.models.db_models import Item, UserItem
+
+logger = logging.getLogger(__name__)
+
+GRID_CACHE_TIMEOUT = 60 * 60 * 24
+# Bumped when something shown on every card changes, like the daily 30 day changes
+ALL_COLLECTIONS = "all"
+
+
+class CollectionCacheService:
+    def __init__(self, cache_namespace: Optional[CacheNamespace] = None):
+        self.cache_namespace = cache_namespace or CacheNamespace(
+            "collection", timeout=GRID_CACHE_TIMEOUT
+        )
+
+    def get_collection_version(self, user_id) -> str:
+        return (
+            f"{self.cache_namespace.get_version(user_id)}"
+            f"-{self.cache_namespace.get_version(ALL_COLLECTIONS)}"
+        )
+
+    def invalidate_collection(self, user_id) -> None:
+        self.cache_namespace.bump_version(user_id, pin_user_id=user_id)
+        logger.info(f"Invalidated cached collection for user {user_id}")
+
+    def invalidate_all_collections(self) -> None:
+        self.cache_namespace.bump_version(ALL_COLLECTIONS)
+        logger.info("Invalidated every cached collection")
+
+    def invalidate_collections_on_commit(self, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self.cache_namespace.bump_version_on_commit(user_id, pin_user_id=user_id)
+
+    def invalidate_item_owners_on_commit(self, item: Item) -> None:
+        user_ids = UserItem.objects.filter(item=item).values_list("user_id", flat=True)
+        self.invalidate_collections_on_commit(user_ids)
+
+    def get_cached_grid(self, user_id, version, query_params) -> Optional[str]:
+        return self.cache_namespace.get(self._grid_key(user_id, version, query_params))
+
+    def cache_grid(self, user_id, version, query_params, html: str) -> None:
+        self.cache_namespace.set(self._grid_key(user_id, version, query_params), html)
+
+    def get_collection_etag(self, user_id, version, query_params, csrf_token) -> str:
+        # The page embeds a CSRF token so a new one must invalidate the copy the
+        # browser holds or its forms would stop working
+        fingerprint = f"{user_id}:{version}:{self._variant(query_params)}:{csrf_token}"
+        return hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+
+    def get_api_etag(self, user_id, version, path, query_params) -> str:
+        fingerprint = f"{user_id}:{version}:{path}:{self._variant(query_params)}"
+        return hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+
+    def _variant(self, query_params) -> str:
+        canonical = "&".join(
+            f"{key}={value}"
+            for key, values in sorted(query_params.lists())
+            for value in values
+        )
+        return hashlib.md5(canonical.encode(), usedforsecurity=False).hexdigest()[:12]
+
+    def _grid_key(self, user_id, version, query_params) -> str:
+        return self.cache_namespace.key(
+            "grid", user_id, version, self._variant(query_params)
+        )
@@ -0,0 +1,140 @@
+import csv
+import heapq
+import io
+import json
+import logging
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Value
+
+from items.models.db_models import Item, PriceHistory
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = [
+    "record",
+    "cex_id",
+    "title",
+    "date",
+    "sell_price",
+    "exchange_price",
+    "cash_price",
+]
+# Rows fetched from the server side cursor per round trip
+EXPORT_CURSOR_CHUNK_SIZE = 2000
+# Rows encoded into each chunk of the response
+EXPORT_ROWS_PER_CHUNK = 500
+
+
+class ExportService:
+    def __init__(
+        self,
+        using: Optional[str] = None,
+        archive_service: Optional[PriceHistoryArchiveService] = None,
+    ):
+        self.using = using
+        self.archive_service = archive_service or PriceHistoryArchiveService()
+
+    def export_collection(
+        self, user, export_format: str = "csv", include_history: bool = False
+    ) -> Iterator[str]:
+        # Checked up front as the generator would only fail once it is streaming
+        if not isinstance(user, get_user_model()):
+            raise ValueError("Invalid user type")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        return self._stream_collection(user, export_format, include_history)
+
+    def _stream_collection(
+        self, user, export_format: str, include_history: bool
+    ) -> Iterator[str]:
+        encode = self._to_csv if export_format == "csv" else self._to_ndjson
+        row_count = 0
+
+        # Outside a transaction the cursor is declared WITH HOLD, which makes
+        # Postgres copy out the whole result before the first row is read
+        with transaction.atomic(using=self.using):
+            if export_format == "csv":
+                yield self._to_csv([EXPORT_COLUMNS])
+
+            rows = self._get_rows(user, include_history)
+            while chunk := list(islice(rows, EXPORT_ROWS_PER_CHUNK)):
+                row_count += len(chunk)
+                yield encode(chunk)
+
+        logger.info(f"Exported {row_count} rows as {export_format} for user {user.id}")
+
+    def _get_rows(self, user, include_history: bool) -> Iterator[tuple]:
+        items = (
+            Item.objects.using(self.using)
+            .filter(useritem__user=user)
+            .annotate(record=Value("current"), date=F("last_checked"))
+            .order_by("id")
+            .values_list(*EXPORT_COLUMNS)
+        )
+        yield from items.iterator(chunk_size=EXPORT_CURSOR_CHUNK_SIZE)
+
+        if not include_history:
+            return
+
+        # Item then date order follows the chart index so no sort is needed
+        price_history = (
+            PriceHistory.objects.using(self.using)
+            .filter(item__useritem__user=user)
+            .annotate(
+                record=Value("history"),
+                cex_id=F("item__cex_id"),
+                title=F("item__title"),
+                date=F("date_checked"),
+            )
+            .order_by("item_id", "date_checked", "id")
+            .values_list("item_id", "id", *EXPORT_COLUMNS)
+        )
+        live_rows = (
+            ((item_id, row[3], entry_id), tuple(row))
+            for item_id, entry_id, *row in price_history.iterator(
+                chunk_size=EXPORT_CURSOR_CHUNK_SIZE
+            )
+        )
+
+        # Both are in item, date and id order, so merging keeps each item's
+        # archived history together with its live history
+        for _, row in heapq.merge(
+            self._get_archived_rows(user), live_rows, key=lambda row: row[0]
+        ):
+            yield row
+
+    def _get_archived_rows(self, user) -> Iterator[tuple]:
+        items = {
+            item_id: (cex_id, title)
+            for item_id, cex_id, title in Item.objects.using(self.using)
+            .filter(useritem__user=user)
+            .values_list("id", "cex_id", "title")
+        }
+        archived_history = self.archive_service.get_archived_price_history_for_items(
+            list(items)
+        )
+        for item_id, entry_id, date_checked, *prices in archived_history:
+            cex_id, title = items[item_id]
+            yield (
+                (item_id, date_checked, entry_id),
+                ("history", cex_id, title, date_checked, *prices),
+            )
+
+    def _to_csv(self, rows: Iterable) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def _to_ndjson(self, rows: List[tuple]) -> str:
+        return "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), cls=DjangoJSONEncoder) + "\n"
+            for row in rows
+        )
@@ -1,9 +1,11 @@
 import logging
-from datetime import date
+from datetime import date, timedelta
 from typing import Optional, Tuple
+from django.conf import settings
 from django.db import DatabaseError, transaction
 from django.db.models import QuerySet
 from django.contrib.auth import get_user_model
+from items.services.collection_cache_service import CollectionCacheService
 from items.services.price_history_service import PriceHistoryService
 from items.services.user_item_service import UserItemService
 from items.validators.item_validator import ItemDataValidator
@@ -18,10 +20,14 @@ class ItemService:
         validator: ItemDataValidator,
         user_item_service: UserItemService,
         price_history_service: PriceHistoryService,
+        collection_cache_service: Optional[CollectionCacheService] = None,
     ):
         self.validator = validator
         self.user_item_service = user_item_service
         self.price_history_service = price_history_service
+        self.collection_cache_service = (
+            collection_cache_service or CollectionCacheService()
+        )
 
     def get_item_by_cex_id(self, cex_id) -> Optional[Item]:
         try:
@@ -35,6 +41,20 @@ class ItemService:
             print(f"Multiple items found with cex_id: {cex_id}")
             return None
 
+    async def aget_item_by_cex_id(self, cex_id) -> Optional[Item]:
+        logger.info(f"Fetching item by cex_id {cex_id}")
+        return await Item.objects.filter(cex_id=cex_id).afirst()
+
+    def is_item_fresh(self, item: Item) -> bool:
+        return item.last_refreshed >= date.today() - timedelta(
+            days=settings.ITEM_FRESHNESS_DAYS
+        )
+
+    def mark_item_refreshed(self, item: Item) -> None:
+        # CEX had the same price so only the refresh date moves
+        item.last_refreshed = date.today()
+        Item.objects.filter(pk=item.pk).update(last_refreshed=item.last_refreshed)
+
     def get_all_items(self) -> QuerySet[Item]:
         return Item.objects.all()
 
@@ -42,7 +62,11 @@ class ItemService:
         if not isinstance(user, get_user_model()):
             raise ValueError("Invalid user type")
 
-        return Item.objects.filter(useritem__user=user).order_by("title")
+        return (
+            Item.objects.filter(useritem__user=user)
+            .select_related("price_stats")
+            .order_by("title")
+        )
 
     def create_item(self, item_data) -> Tuple[Optional[Item], bool]:
         validated_item_data = self.validator.validate_item_data(item_data)
@@ -95,7 +119,9 @@ class ItemService:
             item.exchange_price = validated_item_data.exchange_price
             item.cash_price = validated_item_data.cash_price
             item.last_checked = date.today()
+            item.last_refreshed = date.today()
             item.save()
+            self.collection_cache_service.invalidate_item_owners_on_commit(item)
 
             logger.info(f"Item {cex_id} updated successfully")
             return item
@@ -0,0 +1,426 @@
+from datetime import date, datetime, timedelta, timezone
+import hashlib
+import json
+import logging
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import CharField, F, FloatField, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+from items.cache import CacheNamespace
+from items.models.db_models import Item, PriceHistory
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+from items.services.price_series_service import PriceSeriesService
+
+logger = logging.getLogger(__name__)
+
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+COMPARE_MAX_ITEMS = 10
+COMPARE_PRICE_FIELDS = {
+    "sell": "sell_price",
+    "exchange": "exchange_price",
+    "cash": "cash_price",
+}
+CHART_RANGES = {"30d": timedelta(days=30), "1y": timedelta(days=365), "all": None}
+# The window the detail page opens on, embedded in the page rather than fetched
+INITIAL_CHART_QUERY = {"range": "30d", "points": "500"}
+
+
+class PriceChartService:
+    def __init__(
+        self,
+        price_series_service: Optional[PriceSeriesService] = None,
+        archive_service: Optional[PriceHistoryArchiveService] = None,
+        cache_namespace: Optional[CacheNamespace] = None,
+    ):
+        self.price_series_service = price_series_service or PriceSeriesService()
+        self.archive_service = archive_service or PriceHistoryArchiveService()
+        self.cache_namespace = cache_namespace or CacheNamespace(
+            "price_chart", timeout=CHART_CACHE_TIMEOUT
+        )
+
+    def get_history_version(self, cex_id) -> int:
+        return self.cache_namespace.get_version(cex_id)
+
+    def invalidate_history(self, cex_id) -> None:
+        self.cache_namespace.bump_version(cex_id)
+        logger.info(f"Invalidated cached price charts for item {cex_id}")
+
+    def invalidate_history_on_commit(self, cex_ids: Iterable[str]) -> None:
+        # Any user can open an item's chart so every reader is pinned
+        for cex_id in cex_ids:
+            self.cache_namespace.bump_version_on_commit(cex_id)
+
+    def parse_chart_params(self, query_params) -> dict:
+        max_points = query_params.get("points")
+        if max_points is not None:
+            if not max_points.isdigit() or int(max_points) < 3:
+                raise ValueError("points must be a whole number of at least 3")
+            max_points = int(max_points)
+
+        chart_range = query_params.get("range", "all")
+        if chart_range not in CHART_RANGES:
+            raise ValueError(f"range must be one of {', '.join(CHART_RANGES)}")
+
+        # Presets are turned into dates so cached charts roll over each day
+        start = None
+        if CHART_RANGES[chart_range]:
+            start = date.today() - CHART_RANGES[chart_range]
+
+        try:
+            if query_params.get("from"):
+                start = date.fromisoformat(query_params["from"])
+            end = (
+                date.fromisoformat(query_params["to"])
+                if query_params.get("to")
+                else None
+            )
+        except ValueError:
+            raise ValueError("from and to must be dates in YYYY-MM-DD format")
+
+        if start and end and start > end:
+            raise ValueError("from must not be after to")
+
+        return {
+            "include_archived": query_params.get("include_archived") == "1",
+            "max_points": max_points,
+            "start": start,
+            "end": end,
+        }
+
+    def get_chart_etag(self, cex_id, version, chart_params) -> str:
+        return f'"{cex_id}-{version}-{self._variant(chart_params)}"'
+
+    def get_or_build_chart(
+        self,
+        cex_id,
+        version,
+        chart_params,
+        get_item: Callable[[], Item],
+    ) -> Optional[Tuple[bytes, Optional[datetime]]]:
+        def build_chart():
+            data = self.build_chart_data(get_item(), **chart_params)
+            if data is None:
+                return None
+            return self.serialise_chart_data(data)
+
+        return self.cache_namespace.get_or_build(
+            self._chart_key(cex_id, version, chart_params), build_chart
+        )
+
+    def get_chart_data(self, item: Item, chart_params) -> Optional[dict]:
+        # Shares the cache with the chart endpoint so either can warm it
+        version = self.get_history_version(item.cex_id)
+        chart = self.get_or_build_chart(
+            item.cex_id, version, chart_params, lambda: item
+        )
+        return json.loads(chart[0]) if chart else None
+
+    def build_chart_data(
+        self,
+        item: Item,
+        include_archived: bool = False,
+        max_points: int = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[dict]:
+        price_series = None
+        if settings.PRICE_SERIES_STORE_ENABLED and not include_archived:
+            price_series = self.price_series_service.get_price_series(
+                item, start=start, end=end
+            )
+
+        if price_series and price_series["dates"].size:
+            labels = np.datetime_as_string(price_series["dates"], unit="D").tolist()
+            sell_prices = price_series["sell_prices"].tolist()
+            exchange_prices = price_series["exchange_prices"].tolist()
+            cash_prices = price_series["cash_prices"].tolist()
+
+            # Prices are only recorded when they change so the window opens with
+            # whatever price was current on its first day
+            if start and labels[0] > start.isoformat():
+                opening_point = self._get_opening_point(item, start)
+                if opening_point:
+                    labels = [start.isoformat(), *labels]
+                    sell_prices = [opening_point[0], *sell_prices]
+                    exchange_prices = [opening_point[1], *exchange_prices]
+                    cash_prices = [opening_point[2], *cash_prices]
+        else:
+            labels, sell_prices, exchange_prices, cash_prices = self._get_chart_columns(
+                item, start, end, include_archived
+            )
+
+        if not labels:
+            return None
+
+        if max_points and len(labels) > max_points:
+            prices = np.array([sell_prices, exchange_prices, cash_prices])
+            indices = lttb_indices(
+                np.array(labels, dtype="datetime64[D]").astype(np.int64),
+                prices,
+                max_points,
+            )
+
+            labels = [labels[index] for index in indices]
+            sell_prices, exchange_prices, cash_prices = prices[:, indices].tolist()
+
+        return {
+            "labels": labels,
+            "datasets": [
+                {
+                    "label": "Sell Price",
+                    "data": sell_prices,
+                    "borderColor": "rgba(255, 99, 132, 1)",
+                    "fill": False,
+                },
+                {
+                    "label": "Exchange Price",
+                    "data": exchange_prices,
+                    "borderColor": "rgba(54, 162, 235, 1)",
+                    "fill": False,
+                },
+                {
+                    "label": "Cash Price",
+                    "data": cash_prices,
+                    "borderColor": "rgba(75, 192, 192, 1)",
+                    "fill": False,
+                },
+            ],
+        }
+
+    def build_comparison_data(
+        self,
+        user,
+        cex_ids: Iterable[str],
+        price: str = "sell",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[dict]:
+        cex_ids = list(dict.fromkeys(cex_ids))
+        price_field = COMPARE_PRICE_FIELDS[price]
+
+        price_history = PriceHistory.objects.filter(
+            item__cex_id__in=cex_ids, item__useritem__user=user
+        )
+        if start:
+            # Reach back to each item's last change before the window so its line
+            # starts on the first day instead of at its next change
+            opening_date = (
+                PriceHistory.objects.filter(
+                    item=OuterRef("item"), date_checked__lt=start
+                )
+                .order_by("-date_checked")
+                .values("date_checked")[:1]
+            )
+            price_history = price_history.filter(
+                date_checked__gte=Coalesce(Subquery(opening_date), Value(start))
+            )
+        if end:
+            price_history = price_history.filter(date_checked__lte=end)
+
+        rows = price_history.order_by("date_checked", "id").values_list(
+            "item__cex_id", "item__title", "date_checked", price_field
+        )
+
+        df = pd.DataFrame.from_records(
+            rows, columns=["cex_id", "title", "date_checked", "price"]
+        )
+        if df.empty:
+            return None
+
+        if start:
+            df["date_checked"] = df["date_checked"].clip(lower=start)
+        df["price"] = df["price"].astype(float)
+
+        # Several checks on one day keep the last, then every item gets a value on
+        # every date any item changed by carrying its previous price forward
+        aligned = (
+            df.drop_duplicates(["cex_id", "date_checked"], keep="last")
+            .pivot(index="date_checked", columns="cex_id", values="price")
+            .sort_index()
+            .ffill()
+        )
+        aligned = aligned[[cex_id for cex_id in cex_ids if cex_id in aligned.columns]]
+        titles = df.drop_duplicates("cex_id").set_index("cex_id")["title"]
+
+        return {
+            "labels": [date_checked.isoformat() for date_checked in aligned.index],
+            "datasets": [
+                {
+                    "label": titles[cex_id],
+                    # Dates before an item was first tracked stay as gaps
+                    "data": aligned[cex_id]
+                    .astype(object)
+                    .where(aligned[cex_id].notna(), None)
+                    .tolist(),
+                    "fill": False,
+                    "spanGaps": False,
+                }
+                for cex_id in aligned.columns
+            ],
+        }
+
+    def serialise_chart_data(self, data: dict) -> Tuple[bytes, Optional[datetime]]:
+        # Every value is already a str or float so the C encoder needs no fallback
+        body = json.dumps(data, separators=(",", ":"), check_circular=False).encode()
+
+        last_modified = None
+        if data["labels"]:
+            last_modified = datetime.strptime(data["labels"][-1], "%Y-%m-%d").replace(
+                tzinfo=timezone.utc
+            )
+
+        return body, last_modified
+
+    def _get_chart_columns(
+        self,
+        item: Item,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        include_archived: bool = False,
+    ) -> List[list]:
+        price_history = item.price_history.all()
+        if start:
+            # Reaches back to the last change before the window in the same query
+            # so the line opens with the price that was current on its first day
+            opening_date = (
+                item.price_history.filter(date_checked__lt=start)
+                .order_by("-date_checked")
+                .values("date_checked")[:1]
+            )
+            price_history = price_history.filter(
+                date_checked__gte=Coalesce(Subquery(opening_date), Value(start))
+            )
+        if end:
+            price_history = price_history.filter(date_checked__lte=end)
+
+        # Formatting and casting in Postgres means each row arrives as a tuple of
+        # ready to serialise values with no Decimal or date objects in between
+        rows = list(
+            price_history.order_by("date_checked", "id")
+            .annotate(
+                label=Func(
+                    F("date_checked"),
+                    Value("YYYY-MM-DD"),
+                    function="to_char",
+                    output_field=CharField(),
+                ),
+                sell=Cast("sell_price", FloatField()),
+                exchange=Cast("exchange_price", FloatField()),
+                cash=Cast("cash_price", FloatField()),
+            )
+            .values_list("label", "sell", "exchange", "cash")
+        )
+
+        if include_archived:
+            # Archiving moves the oldest entries first so these all come before
+            # the live rows
+            rows = [
+                self._to_row(*archived_row)
+                for archived_row in self.archive_service.get_archived_price_history(
+                    item, start, end
+                )
+            ] + rows
+
+        if start:
+            # The change before the window may have been archived
+            if not rows or rows[0][0] > start.isoformat():
+                archived_opening = self.archive_service.get_archived_price_before(
+                    item, start
+                )
+                if archived_opening:
+                    rows = [self._to_row(*archived_opening), *rows]
+            rows = self._open_window(rows, start.isoformat())
+
+        return self._to_columns(rows)
+
+    def _open_window(self, rows: list, start_label: str) -> list:
+        # Keeps only the last row before the window, moved onto its first day,
+        # unless a change on that day already opens it
+        opening_rows = [row for row in rows if row[0] < start_label]
+        rows = rows[len(opening_rows) :]
+        if opening_rows and (not rows or rows[0][0] > start_label):
+            rows = [(start_label, *opening_rows[-1][1:]), *rows]
+        return rows
+
+    def _get_opening_point(self, item: Item, start: date) -> Optional[tuple]:
+        opening_point = (
+            item.price_history.filter(date_checked__lt=start)
+            .order_by("-date_checked", "-id")
+            .annotate(
+                sell=Cast("sell_price", FloatField()),
+                exchange=Cast("exchange_price", FloatField()),
+                cash=Cast("cash_price", FloatField()),
+            )
+            .values_list("sell", "exchange", "cash")
+            .first()
+        )
+        if opening_point:
+            return opening_point
+
+        archived_opening = self.archive_service.get_archived_price_before(item, start)
+        if archived_opening:
+            return self._to_row(*archived_opening)[1:]
+        return None
+
+    def _to_row(self, date_checked: date, sell, exchange, cash) -> tuple:
+        return (date_checked.isoformat(), float(sell), float(exchange), float(cash))
+
+    def _to_columns(self, rows) -> List[list]:
+        return [list(column) for column in zip(*rows)] or [[], [], [], []]
+
+    def _variant(self, chart_params) -> str:
+        canonical = "&".join(
+            f"{key}={value}" for key, value in sorted(chart_params.items())
+        )
+        return hashlib.md5(canonical.encode(), usedforsecurity=False).hexdigest()[:12]
+
+    def _chart_key(self, cex_id, version, chart_params) -> str:
+        return self.cache_namespace.key(
+            "chart", cex_id, version, self._variant(chart_params)
+        )
+
+
+def lttb_indices(x: np.ndarray, ys: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest Triangle Three Buckets, picking one point per bucket for all series
+    # at once so every series keeps the same dates. The chosen point is the one
+    # whose triangle with the previous choice and the next bucket's average has
+    # the largest area summed across the series.
+    point_count = x.size
+    if threshold >= point_count or threshold < 3:
+        return np.arange(point_count)
+
+    x = x.astype(np.float64)
+    ys = ys.astype(np.float64)
+
+    # The first and last points are always kept so the middle is split evenly
+    bucket_size = (point_count - 2) / (threshold - 2)
+    edges = np.append(
+        (np.arange(threshold - 1) * bucket_size).astype(np.int64) + 1, point_count
+    )
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = point_count - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end, next_end = edges[bucket], edges[bucket + 1], edges[bucket + 2]
+
+        next_x = x[end:next_end].mean()
+        next_ys = ys[:, end:next_end].mean(axis=1, keepdims=True)
+        previous_x = x[previous]
+        previous_ys = ys[:, previous : previous + 1]
+
+        areas = np.abs(
+            (previous_x - next_x) * (ys[:, start:end] - previous_ys)
+            - (previous_x - x[start:end]) * (next_ys - previous_ys)
+        ).sum(axis=0)
+
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
@@ -0,0 +1,120 @@
+import json
+import logging
+from functools import cache
+from typing import AsyncIterator, Optional
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+
+from items.models.db_models import Item, ItemPriceStats, UserItem
+from items.services.price_stats_service import PRICE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+PRICE_EVENT_ITEM_FIELDS = ["cex_id", *PRICE_FIELDS, "last_checked"]
+PRICE_EVENT_STATS_FIELDS = [
+    f"{field}_{stat}"
+    for field in PRICE_FIELDS
+    for stat in ("min", "max", "avg", "change_30d")
+]
+# Milliseconds a browser waits before reconnecting a dropped stream
+PRICE_EVENTS_RETRY_MS = 5000
+
+
+class PriceEventService:
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.redis_client = redis_client
+
+    def publish_price_change_on_commit(self, item: Item) -> None:
+        # Pages must not show a price the refresh could still roll back
+        item_id = item.id
+        transaction.on_commit(lambda: self.publish_price_change(item_id))
+
+    def publish_price_change(self, item_id) -> None:
+        try:
+            change = (
+                Item.objects.filter(id=item_id).values(*PRICE_EVENT_ITEM_FIELDS).first()
+            )
+            if change is None:
+                return
+
+            stats = (
+                ItemPriceStats.objects.filter(item_id=item_id)
+                .values(*PRICE_EVENT_STATS_FIELDS)
+                .first()
+            )
+            change.update(stats or dict.fromkeys(PRICE_EVENT_STATS_FIELDS))
+
+            user_ids = list(
+                UserItem.objects.filter(item_id=item_id).values_list(
+                    "user_id", flat=True
+                )
+            )
+        except DatabaseError as e:
+            logger.exception(f"Database error while building price change: {e}")
+            return
+
+        if not user_ids:
+            return
+
+        message = json.dumps(change, cls=DjangoJSONEncoder)
+        try:
+            # Each owner has their own channel so pages only hear about their items
+            with self._get_redis_client().pipeline(transaction=False) as pipeline:
+                for user_id in user_ids:
+                    pipeline.publish(self.get_channel(user_id), message)
+                pipeline.execute()
+            logger.info(
+                f"Published price change for item {change['cex_id']} "
+                f"to {len(user_ids)} users"
+            )
+        except redis.RedisError as e:
+            # Open pages miss the update but the refresh itself has committed
+            logger.exception(f"Failed to publish price change: {e}")
+
+    async def stream_price_events(
+        self, user_id, redis_client: Optional[redis.asyncio.Redis] = None
+    ) -> AsyncIterator[str]:
+        redis_client = redis_client or redis.asyncio.from_url(
+            settings.PRICE_EVENTS_REDIS_URL
+        )
+        pubsub = redis_client.pubsub()
+
+        try:
+            await pubsub.subscribe(self.get_channel(user_id))
+            yield f"retry: {PRICE_EVENTS_RETRY_MS}\n\n"
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=settings.PRICE_EVENTS_KEEPALIVE_SECONDS,
+                )
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                yield f"event: price-change\ndata: {data}\n\n"
+        except redis.RedisError as e:
+            # The browser reconnects after the retry delay
+            logger.exception(f"Price event stream for user {user_id} failed: {e}")
+        finally:
+            await pubsub.aclose()
+            await redis_client.aclose()
+
+    def get_channel(self, user_id) -> str:
+        return f"price_events:{user_id}"
+
+    def _get_redis_client(self) -> redis.Redis:
+        return self.redis_client or _redis_client()
+
+
+@cache
+def _redis_client():
+    # Shared so the refresh reuses pooled connections instead of opening new ones
+    return redis.Redis.from_url(settings.PRICE_EVENTS_REDIS_URL)
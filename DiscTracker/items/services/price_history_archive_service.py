@@ -0,0 +1,257 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Exists, OuterRef, Q
+
+from items.models.db_models import Item, PriceHistory
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [
+    "id",
+    "item_id",
+    "date_checked",
+    "sell_price",
+    "exchange_price",
+    "cash_price",
+]
+
+PRICE_COLUMNS = ["sell_price", "exchange_price", "cash_price"]
+
+
+class PriceHistoryArchiveService:
+    def __init__(self, archive_dir=None):
+        self.archive_dir = Path(archive_dir or settings.PRICE_HISTORY_ARCHIVE_DIR)
+
+    def archive_price_history(self, cutoff: date, batch_size: int = 5000) -> int:
+        archived_count = 0
+
+        while True:
+            written_files = []
+            try:
+                with transaction.atomic():
+                    batch = list(
+                        self._get_archivable_price_history(cutoff)
+                        .order_by("id")
+                        .values_list(*ARCHIVE_COLUMNS)[:batch_size]
+                    )
+
+                    if not batch:
+                        break
+
+                    written_files = self._write_batch(batch)
+                    PriceHistory.objects.filter(
+                        id__in=[row[0] for row in batch]
+                    ).delete()
+
+                    # Charts without archived history no longer match what is cached
+                    self._invalidate_charts({row[1] for row in batch})
+            except (DatabaseError, OSError) as e:
+                # The rows are still in the table so drop the partial archive files
+                for file_path in written_files:
+                    file_path.unlink(missing_ok=True)
+                logger.exception(f"Failed to archive price history batch: {e}")
+                raise
+
+            archived_count += len(batch)
+            logger.info(
+                f"Archived {len(batch)} price history entries ({archived_count} total)"
+            )
+
+        return archived_count
+
+    def get_archived_price_history(
+        self, item: Item, start: Optional[date] = None, end: Optional[date] = None
+    ) -> List[Tuple[date, Decimal, Decimal, Decimal]]:
+        if not self.archive_dir.exists():
+            return []
+
+        filters = [("item_id", "==", item.id)]
+        if start:
+            filters.append(("year", ">=", start.year))
+        if end:
+            filters.append(("year", "<=", end.year))
+
+        try:
+            df = pd.read_parquet(
+                self.archive_dir,
+                engine="pyarrow",
+                columns=["date_checked", *PRICE_COLUMNS],
+                filters=filters,
+            )
+        except (OSError, ValueError) as e:
+            logger.exception(
+                f"Failed to read archived price history for item {item.cex_id}: {e}"
+            )
+            return []
+
+        if start:
+            df = df[df["date_checked"] >= pd.Timestamp(start)]
+        if end:
+            df = df[df["date_checked"] <= pd.Timestamp(end)]
+
+        df = df.sort_values("date_checked", kind="stable")
+
+        return [
+            (
+                date_checked.date(),
+                self._from_pence(sell_price),
+                self._from_pence(exchange_price),
+                self._from_pence(cash_price),
+            )
+            for date_checked, sell_price, exchange_price, cash_price in df.itertuples(
+                index=False
+            )
+        ]
+
+    def get_archived_price_history_for_items(
+        self, item_ids: List[int]
+    ) -> Iterator[Tuple[int, int, date, Decimal, Decimal, Decimal]]:
+        # Every archived entry of the items as (item_id, id, date, prices...) in
+        # item, date and id order
+        if not item_ids or not self.archive_dir.exists():
+            return
+
+        try:
+            df = pd.read_parquet(
+                self.archive_dir,
+                engine="pyarrow",
+                columns=ARCHIVE_COLUMNS,
+                filters=[("item_id", "in", list(item_ids))],
+            )
+        except (OSError, ValueError) as e:
+            logger.exception(f"Failed to read archived price history: {e}")
+            raise
+
+        df = df.sort_values(["item_id", "date_checked", "id"])
+        for row in df.itertuples(index=False):
+            yield (
+                int(row.item_id),
+                int(row.id),
+                row.date_checked.date(),
+                self._from_pence(row.sell_price),
+                self._from_pence(row.exchange_price),
+                self._from_pence(row.cash_price),
+            )
+
+    def get_archived_price_before(
+        self, item: Item, before: date
+    ) -> Optional[Tuple[date, Decimal, Decimal, Decimal]]:
+        # The last archived change before a date, which was the price on that date
+        # when no live entry precedes it
+        if not self.archive_dir.exists():
+            return None
+
+        try:
+            df = pd.read_parquet(
+                self.archive_dir,
+                engine="pyarrow",
+                columns=["id", "date_checked", *PRICE_COLUMNS],
+                filters=[("item_id", "==", item.id), ("year", "<=", before.year)],
+            )
+        except (OSError, ValueError) as e:
+            logger.exception(
+                f"Failed to read archived price history for item {item.cex_id}: {e}"
+            )
+            return None
+
+        df = df[df["date_checked"] < pd.Timestamp(before)]
+        if df.empty:
+            return None
+
+        row = df.sort_values(["date_checked", "id"]).iloc[-1]
+        return (
+            row["date_checked"].date(),
+            self._from_pence(row["sell_price"]),
+            self._from_pence(row["exchange_price"]),
+            self._from_pence(row["cash_price"]),
+        )
+
+    def get_archived_price_totals(self) -> Dict[int, dict]:
+        # The entry count and each price's min, max and sum for every item
+        if not self.archive_dir.exists():
+            return {}
+
+        try:
+            df = pd.read_parquet(
+                self.archive_dir, engine="pyarrow", columns=["item_id", *PRICE_COLUMNS]
+            )
+        except (OSError, ValueError) as e:
+            # Totals missing the archive would quietly rewrite the all-time stats
+            logger.exception(f"Failed to read archived price totals: {e}")
+            raise
+
+        aggregates = {"entry_count": ("item_id", "size")}
+        for column in PRICE_COLUMNS:
+            for aggregate in ("min", "max", "sum"):
+                aggregates[f"{column}_{aggregate}"] = (column, aggregate)
+
+        return {
+            int(item_id): {
+                key: value if key == "entry_count" else self._from_pence(value)
+                for key, value in totals.items()
+            }
+            for item_id, totals in df.groupby("item_id")
+            .agg(**aggregates)
+            .to_dict("index")
+            .items()
+        }
+
+    def _get_archivable_price_history(self, cutoff: date):
+        # Imported here as the stats service reads archives through this service
+        from items.services.price_stats_service import CHANGE_WINDOW_DAYS
+
+        # An entry only goes once a newer one also predates the 30 day window, so
+        # each item keeps its latest entry for the price change checks and the
+        # baseline its 30 day change is measured from
+        change_cutoff = date.today() - timedelta(days=CHANGE_WINDOW_DAYS)
+        newer_entry = PriceHistory.objects.filter(
+            item=OuterRef("item"), date_checked__lte=change_cutoff
+        ).filter(
+            Q(date_checked__gt=OuterRef("date_checked"))
+            | Q(date_checked=OuterRef("date_checked"), id__gt=OuterRef("id"))
+        )
+        return PriceHistory.objects.filter(date_checked__lt=cutoff).filter(
+            Exists(newer_entry)
+        )
+
+    def _invalidate_charts(self, item_ids) -> None:
+        # Imported here as the chart service reads archives through this service
+        from items.services.price_chart_service import PriceChartService
+
+        cex_ids = Item.objects.filter(id__in=item_ids).values_list("cex_id", flat=True)
+        # This also keeps readers on the primary, where the replica would count
+        # the archived rows twice until it sees the delete
+        PriceChartService(archive_service=self).invalidate_history_on_commit(cex_ids)
+
+    def _write_batch(self, batch) -> List[Path]:
+        df = pd.DataFrame(batch, columns=ARCHIVE_COLUMNS)
+        df["date_checked"] = pd.to_datetime(df["date_checked"])
+        # Whole pence compress far better than decimals and are exact
+        for column in PRICE_COLUMNS:
+            df[column] = df[column].map(lambda price: int(price * 100)).astype(np.int32)
+
+        written_files = []
+        for year, year_df in df.groupby(df["date_checked"].dt.year):
+            year_dir = self.archive_dir / f"year={year}"
+            year_dir.mkdir(parents=True, exist_ok=True)
+
+            file_path = (
+                year_dir / f"part-{year_df['id'].min()}-{year_df['id'].max()}.parquet"
+            )
+            year_df.sort_values(["item_id", "date_checked"]).to_parquet(
+                file_path, engine="pyarrow", compression="zstd", index=False
+            )
+            written_files.append(file_path)
+
+        return written_files
+
+    def _from_pence(self, pence) -> Decimal:
+        return Decimal(int(pence)).scaleb(-2)
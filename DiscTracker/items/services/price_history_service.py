@@ -2,17 +2,39 @@ from datetime import date
 import logging
 from typing import Optional
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import DatabaseError
+from django.db.models import QuerySet
 from pydantic import ValidationError
 
 from items.models.db_models import Item, PriceHistory
+from items.services.price_chart_service import PriceChartService
+from items.services.price_interval_service import PriceIntervalService
+from items.services.price_series_service import PriceSeriesService
+from items.services.price_stats_service import PriceStatsService
 
 logger = logging.getLogger(__name__)
 
 
 class PriceHistoryService:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        price_interval_service: Optional[PriceIntervalService] = None,
+        price_stats_service: Optional[PriceStatsService] = None,
+        price_series_service: Optional[PriceSeriesService] = None,
+        price_chart_service: Optional[PriceChartService] = None,
+    ):
+        if price_interval_service is None and settings.PRICE_INTERVALS_ENABLED:
+            price_interval_service = PriceIntervalService()
+        if price_series_service is None and settings.PRICE_SERIES_STORE_ENABLED:
+            price_series_service = PriceSeriesService()
+        self.price_interval_service = price_interval_service
+        self.price_series_service = price_series_service
+        self.price_stats_service = price_stats_service or PriceStatsService()
+        self.price_chart_service = price_chart_service or PriceChartService(
+            price_series_service=price_series_service
+        )
 
     def create_price_history_entry(self, item: Item) -> Optional[PriceHistory]:
         if not self._validate_item(item):
@@ -28,6 +50,22 @@ class PriceHistoryService:
                 date_checked=date.today(),
             )
             logger.info(f"Created price history entry for item {item.cex_id}")
+
+            if self.price_interval_service:
+                self.price_interval_service.record_price(item, price_entry.date_checked)
+
+            if self.price_series_service:
+                self.price_series_service.append_price(
+                    item,
+                    price_entry.sell_price,
+                    price_entry.exchange_price,
+                    price_entry.cash_price,
+                    price_entry.date_checked,
+                )
+
+            self.price_stats_service.record_price_history_entry(price_entry)
+            self.price_chart_service.invalidate_history_on_commit([item.cex_id])
+
             return price_entry
         except DatabaseError as e:
             logger.exception(f"Database error while creating price history: {e}")
@@ -68,8 +106,32 @@ class PriceHistoryService:
             else:
                 return price_history_entry
         else:
+            self.record_unchanged_price(item)
             return None
 
+    def record_unchanged_price(self, item: Item) -> None:
+        # Point history only stores changes but intervals track every observation
+        if self.price_interval_service:
+            self.price_interval_service.record_price(item, date.today())
+
+    def get_user_price_history(self, user) -> QuerySet[PriceHistory]:
+        if not isinstance(user, get_user_model()):
+            raise ValueError("Invalid user type")
+
+        # Joins through ownership so the item comes back with each row
+        return (
+            PriceHistory.objects.filter(item__useritem__user=user)
+            .select_related("item")
+            .only(
+                "sell_price",
+                "exchange_price",
+                "cash_price",
+                "date_checked",
+                "item__cex_id",
+                "item__title",
+            )
+        )
+
     # TODO: Change to equal method
     def has_price_changed(
         self, item: Item, new_sell_price, new_exchange_price, new_cash_price
@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+import logging
+from typing import Optional
+
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+
+from items.models.db_models import Item, PriceHistory, PriceInterval
+
+logger = logging.getLogger(__name__)
+
+
+class PriceIntervalService:
+    def __init__(self):
+        pass
+
+    def record_price(
+        self, item: Item, observed_on: Optional[date] = None
+    ) -> Optional[PriceInterval]:
+        if not isinstance(item, Item):
+            logger.error(
+                f"Invalid item type, expected Item model instead of {type(item)}"
+            )
+            return None
+
+        observed_on = observed_on or date.today()
+
+        try:
+            with transaction.atomic():
+                latest_interval = (
+                    PriceInterval.objects.select_for_update()
+                    .filter(item=item)
+                    .order_by("-valid_from")
+                    .first()
+                )
+
+                if latest_interval and observed_on < latest_interval.valid_to:
+                    logger.warning(
+                        f"Ignoring out of order observation on {observed_on} for item {item.cex_id}"
+                    )
+                    return latest_interval
+
+                if latest_interval and not self._has_price_changed(
+                    latest_interval, item
+                ):
+                    # Same price so extend the open interval in place
+                    if latest_interval.valid_to != observed_on:
+                        latest_interval.valid_to = observed_on
+                        latest_interval.save(update_fields=["valid_to"])
+                    return latest_interval
+
+                if latest_interval and latest_interval.valid_from == observed_on:
+                    # Price changed again on the same day so replace the day's price
+                    latest_interval.sell_price = item.sell_price
+                    latest_interval.exchange_price = item.exchange_price
+                    latest_interval.cash_price = item.cash_price
+                    latest_interval.save(
+                        update_fields=["sell_price", "exchange_price", "cash_price"]
+                    )
+                    return latest_interval
+
+                if latest_interval:
+                    # The old price held until the day before, even if it was
+                    # already extended to today by an earlier unchanged check
+                    latest_interval.valid_to = observed_on - timedelta(days=1)
+                    latest_interval.save(update_fields=["valid_to"])
+
+                interval = PriceInterval.objects.create(
+                    item=item,
+                    sell_price=item.sell_price,
+                    exchange_price=item.exchange_price,
+                    cash_price=item.cash_price,
+                    valid_from=observed_on,
+                    valid_to=observed_on,
+                )
+                logger.info(
+                    f"Opened price interval for item {item.cex_id} from {observed_on}"
+                )
+                return interval
+        except DatabaseError as e:
+            logger.exception(f"Database error while recording price interval: {e}")
+            return None
+        except Exception as e:
+            logger.exception(
+                f"Failed to record price interval for item {item.cex_id}: {e}"
+            )
+            return None
+
+    def get_price_at(self, item: Item, on_date: date) -> Optional[PriceInterval]:
+        # Served by the (item, valid_from) unique index as a single backwards seek
+        return (
+            PriceInterval.objects.filter(item=item, valid_from__lte=on_date)
+            .order_by("-valid_from")
+            .first()
+        )
+
+    def get_intervals(self, item: Item) -> QuerySet[PriceInterval]:
+        return PriceInterval.objects.filter(item=item).order_by("valid_from")
+
+    def rebuild_from_price_history(self, item: Item) -> int:
+        price_points = (
+            PriceHistory.objects.filter(item=item)
+            .order_by("date_checked", "id")
+            .values_list("sell_price", "exchange_price", "cash_price", "date_checked")
+        )
+        price_points = list(price_points)
+
+        intervals = []
+        for sell_price, exchange_price, cash_price, date_checked in price_points:
+            current = intervals[-1] if intervals else None
+
+            if current and (
+                current.sell_price,
+                current.exchange_price,
+                current.cash_price,
+            ) == (sell_price, exchange_price, cash_price):
+                current.valid_to = date_checked
+            elif current and current.valid_from == date_checked:
+                current.sell_price = sell_price
+                current.exchange_price = exchange_price
+                current.cash_price = cash_price
+            else:
+                if current:
+                    # History only records changes so the old price held until then
+                    current.valid_to = date_checked - timedelta(days=1)
+                intervals.append(
+                    PriceInterval(
+                        item=item,
+                        sell_price=sell_price,
+                        exchange_price=exchange_price,
+                        cash_price=cash_price,
+                        valid_from=date_checked,
+                        valid_to=date_checked,
+                    )
+                )
+
+        with transaction.atomic():
+            PriceInterval.objects.filter(item=item).delete()
+            PriceInterval.objects.bulk_create(intervals)
+
+        logger.info(
+            f"Rebuilt {len(intervals)} price intervals for item {item.cex_id} from {len(price_points)} price history entries"
+        )
+        return len(intervals)
+
+    def _has_price_changed(self, interval: PriceInterval, item: Item) -> bool:
+        return (
+            interval.sell_price != item.sell_price
+            or interval.exchange_price != item.exchange_price
+            or interval.cash_price != item.cash_price
+        )
@@ -0,0 +1,252 @@
+from datetime import date
+from decimal import Decimal
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.db import DatabaseError, transaction
+from django.db.models import BinaryField, F, Func, Value
+
+from items.models.db_models import Item, PriceHistory, PriceSeriesBlock
+
+logger = logging.getLogger(__name__)
+
+# Each point is four varints: days since the previous point (or since the start
+# of the block's year for the first point) then the zigzag encoded change in
+# pence of the sell, exchange and cash prices.
+VALUES_PER_POINT = 4
+
+
+class ConcatBytes(Func):
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+    output_field = BinaryField()
+
+
+class PriceSeriesService:
+    def __init__(self):
+        pass
+
+    def append_price(
+        self, item: Item, sell_price, exchange_price, cash_price, on_date: date
+    ) -> Optional[PriceSeriesBlock]:
+        prices = (
+            self._to_pence(sell_price),
+            self._to_pence(exchange_price),
+            self._to_pence(cash_price),
+        )
+
+        try:
+            with transaction.atomic():
+                block = (
+                    PriceSeriesBlock.objects.select_for_update()
+                    .defer("data")
+                    .filter(item=item, period=on_date.year)
+                    .first()
+                )
+
+                if block is None:
+                    return self._create_block(item, on_date, prices)
+
+                if on_date < block.last_date:
+                    logger.warning(
+                        f"Ignoring out of order price on {on_date} for item {item.cex_id}"
+                    )
+                    return None
+
+                last_prices = (
+                    block.last_sell_price,
+                    block.last_exchange_price,
+                    block.last_cash_price,
+                )
+                chunk = encode_points(
+                    [(on_date - block.last_date).days],
+                    [prices],
+                    previous_prices=last_prices,
+                )
+
+                # Appends the new bytes in the database so the block is never read back
+                PriceSeriesBlock.objects.filter(pk=block.pk).update(
+                    data=ConcatBytes(F("data"), Value(chunk, BinaryField())),
+                    point_count=F("point_count") + 1,
+                    last_date=on_date,
+                    last_sell_price=prices[0],
+                    last_exchange_price=prices[1],
+                    last_cash_price=prices[2],
+                )
+                return block
+        except DatabaseError as e:
+            logger.exception(f"Database error while appending price series: {e}")
+            return None
+        except Exception as e:
+            logger.exception(
+                f"Failed to append price series for item {item.cex_id}: {e}"
+            )
+            return None
+
+    def get_price_series(
+        self, item: Item, start: Optional[date] = None, end: Optional[date] = None
+    ) -> Dict[str, np.ndarray]:
+        blocks = PriceSeriesBlock.objects.filter(item=item).order_by("period")
+        if start:
+            blocks = blocks.filter(period__gte=start.year)
+        if end:
+            blocks = blocks.filter(period__lte=end.year)
+
+        decoded = [
+            decode_block(bytes(data), period)
+            for period, data in blocks.values_list("period", "data")
+        ]
+
+        if not decoded:
+            return {
+                "dates": np.array([], dtype="datetime64[D]"),
+                "sell_prices": np.array([], dtype=np.float64),
+                "exchange_prices": np.array([], dtype=np.float64),
+                "cash_prices": np.array([], dtype=np.float64),
+            }
+
+        dates, prices = zip(*decoded)
+        dates = np.concatenate(dates)
+        prices = np.concatenate(prices)
+
+        # Blocks cover whole years so trim to the days asked for
+        in_range = np.ones(dates.size, dtype=bool)
+        if start:
+            in_range &= dates >= np.datetime64(start, "D")
+        if end:
+            in_range &= dates <= np.datetime64(end, "D")
+        dates = dates[in_range]
+        prices = prices[in_range]
+
+        return {
+            "dates": dates,
+            "sell_prices": prices[:, 0] / 100,
+            "exchange_prices": prices[:, 1] / 100,
+            "cash_prices": prices[:, 2] / 100,
+        }
+
+    def rebuild_from_price_history(self, item: Item) -> int:
+        price_points = (
+            PriceHistory.objects.filter(item=item)
+            .order_by("date_checked", "id")
+            .values_list("date_checked", "sell_price", "exchange_price", "cash_price")
+        )
+
+        points_by_period = {}
+        for date_checked, sell_price, exchange_price, cash_price in price_points:
+            points_by_period.setdefault(date_checked.year, []).append(
+                (
+                    date_checked,
+                    (
+                        self._to_pence(sell_price),
+                        self._to_pence(exchange_price),
+                        self._to_pence(cash_price),
+                    ),
+                )
+            )
+
+        blocks = []
+        for period, points in points_by_period.items():
+            dates = [point[0] for point in points]
+            day_deltas = [(dates[0] - date(period, 1, 1)).days] + [
+                (current - previous).days for previous, current in zip(dates, dates[1:])
+            ]
+            point_prices = [point[1] for point in points]
+
+            blocks.append(
+                PriceSeriesBlock(
+                    item=item,
+                    period=period,
+                    point_count=len(points),
+                    first_date=dates[0],
+                    last_date=dates[-1],
+                    last_sell_price=point_prices[-1][0],
+                    last_exchange_price=point_prices[-1][1],
+                    last_cash_price=point_prices[-1][2],
+                    data=encode_points(day_deltas, point_prices),
+                )
+            )
+
+        with transaction.atomic():
+            PriceSeriesBlock.objects.filter(item=item).delete()
+            PriceSeriesBlock.objects.bulk_create(blocks)
+
+        return sum(block.point_count for block in blocks)
+
+    def _create_block(self, item: Item, on_date: date, prices) -> PriceSeriesBlock:
+        block = PriceSeriesBlock.objects.create(
+            item=item,
+            period=on_date.year,
+            point_count=1,
+            first_date=on_date,
+            last_date=on_date,
+            last_sell_price=prices[0],
+            last_exchange_price=prices[1],
+            last_cash_price=prices[2],
+            data=encode_points([(on_date - date(on_date.year, 1, 1)).days], [prices]),
+        )
+        logger.info(f"Created {on_date.year} price series block for item {item.cex_id}")
+        return block
+
+    def _to_pence(self, price) -> int:
+        return int(Decimal(str(price)) * 100)
+
+
+def encode_points(
+    day_deltas: Iterable[int],
+    prices: Iterable[Tuple[int, int, int]],
+    previous_prices: Tuple[int, int, int] = (0, 0, 0),
+) -> bytes:
+    encoded = bytearray()
+    for day_delta, point_prices in zip(day_deltas, prices):
+        _write_varint(encoded, day_delta)
+        for previous, current in zip(previous_prices, point_prices):
+            _write_varint(encoded, _zigzag(current - previous))
+        previous_prices = point_prices
+    return bytes(encoded)
+
+
+def decode_block(data: bytes, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    values = _read_varints(data)
+    if len(values) % VALUES_PER_POINT:
+        raise ValueError(f"Corrupt price series block for {period}")
+
+    points = values.reshape(-1, VALUES_PER_POINT).astype(np.int64)
+
+    days = np.cumsum(points[:, 0])
+    dates = np.datetime64(f"{period}-01-01", "D") + days.astype("timedelta64[D]")
+
+    deltas = (points[:, 1:] >> 1) ^ -(points[:, 1:] & 1)  # Undo zigzag
+    prices = np.cumsum(deltas, axis=0)
+
+    return dates, prices
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varints(data: bytes) -> np.ndarray:
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == 0:
+        return np.array([], dtype=np.uint64)
+
+    ends = np.flatnonzero(raw < 0x80)
+    if ends.size == 0 or ends[-1] != raw.size - 1:
+        raise ValueError("Price series block ends part way through a varint")
+    starts = np.concatenate(([0], ends[:-1] + 1))
+
+    # Position of every byte inside its varint gives its 7 bit shift
+    varint_index = np.repeat(np.arange(starts.size), ends - starts + 1)
+    shifts = (np.arange(raw.size) - starts[varint_index]) * 7
+
+    payload = (raw & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(payload, starts)
@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import logging
+from typing import Optional
+
+from django.db import DatabaseError, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+
+from items.models.db_models import Item, ItemPriceStats, PriceHistory
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ["sell_price", "exchange_price", "cash_price"]
+
+CHANGE_WINDOW_DAYS = 30
+
+
+class PriceStatsService:
+    def __init__(self, archive_service: Optional[PriceHistoryArchiveService] = None):
+        self.archive_service = archive_service or PriceHistoryArchiveService()
+
+    def record_price_history_entry(
+        self, price_entry: PriceHistory
+    ) -> Optional[ItemPriceStats]:
+        if not isinstance(price_entry, PriceHistory):
+            logger.error(
+                f"Invalid price history type, expected PriceHistory model instead of {type(price_entry)}"
+            )
+            return None
+
+        try:
+            with transaction.atomic():
+                prices = {
+                    field: self._to_decimal(getattr(price_entry, field))
+                    for field in PRICE_FIELDS
+                }
+
+                defaults = {"entry_count": 1}
+                for field, price in prices.items():
+                    defaults[f"{field}_min"] = price
+                    defaults[f"{field}_max"] = price
+                    defaults[f"{field}_sum"] = price
+                    defaults[f"{field}_avg"] = price
+
+                stats, created = (
+                    ItemPriceStats.objects.select_for_update().get_or_create(
+                        item_id=price_entry.item_id, defaults=defaults
+                    )
+                )
+
+                if not created:
+                    stats.entry_count += 1
+                    for field, price in prices.items():
+                        setattr(
+                            stats,
+                            f"{field}_min",
+                            min(getattr(stats, f"{field}_min"), price),
+                        )
+                        setattr(
+                            stats,
+                            f"{field}_max",
+                            max(getattr(stats, f"{field}_max"), price),
+                        )
+                        price_sum = getattr(stats, f"{field}_sum") + price
+                        setattr(stats, f"{field}_sum", price_sum)
+                        setattr(
+                            stats,
+                            f"{field}_avg",
+                            self._average(price_sum, stats.entry_count),
+                        )
+
+                baseline = self._get_change_baseline(price_entry.item_id)
+                for field, price in prices.items():
+                    baseline_price = getattr(baseline, field) if baseline else price
+                    setattr(stats, f"{field}_change_30d", price - baseline_price)
+
+                stats.save()
+                return stats
+        except DatabaseError as e:
+            logger.exception(f"Database error while recording price stats: {e}")
+            return None
+        except Exception as e:
+            logger.exception(
+                f"Failed to record price stats for item {price_entry.item_id}: {e}"
+            )
+            return None
+
+    def refresh_price_changes(self) -> int:
+        # The 30 day window moves every day even when no new history is written
+        cutoff = date.today() - timedelta(days=CHANGE_WINDOW_DAYS)
+
+        item_history = PriceHistory.objects.filter(item=OuterRef("item"))
+        before_cutoff = item_history.filter(date_checked__lte=cutoff).order_by(
+            "-date_checked", "-id"
+        )
+        earliest = item_history.order_by("date_checked", "id")
+        current = Item.objects.filter(pk=OuterRef("item"))
+
+        changes = {}
+        for field in PRICE_FIELDS:
+            current_price = Subquery(current.values(field)[:1])
+            baseline_price = Coalesce(
+                Subquery(before_cutoff.values(field)[:1]),
+                Subquery(earliest.values(field)[:1]),
+                current_price,
+            )
+            changes[f"{field}_change_30d"] = ExpressionWrapper(
+                current_price - baseline_price,
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+
+        updated_count = ItemPriceStats.objects.update(**changes)
+        logger.info(f"Refreshed 30 day price changes for {updated_count} items")
+        return updated_count
+
+    def rebuild_price_stats(self) -> int:
+        aggregates = {"entry_count": Count("id")}
+        for field in PRICE_FIELDS:
+            aggregates[f"{field}_min"] = Min(field)
+            aggregates[f"{field}_max"] = Max(field)
+            aggregates[f"{field}_sum"] = Sum(field)
+
+        rows = PriceHistory.objects.values("item_id").annotate(**aggregates)
+        # Archived rows are gone from the table but still count towards all-time stats
+        archived_totals = self.archive_service.get_archived_price_totals()
+
+        price_stats = []
+        for row in rows:
+            archived = archived_totals.get(row["item_id"])
+            if archived:
+                row = self._combine_totals(row, archived)
+
+            stats = ItemPriceStats(**row)
+            for field in PRICE_FIELDS:
+                setattr(
+                    stats,
+                    f"{field}_avg",
+                    self._average(row[f"{field}_sum"], row["entry_count"]),
+                )
+            price_stats.append(stats)
+
+        update_fields = [
+            field.name
+            for field in ItemPriceStats._meta.concrete_fields
+            if not field.primary_key and not field.name.endswith("_change_30d")
+        ]
+
+        with transaction.atomic():
+            ItemPriceStats.objects.bulk_create(
+                price_stats,
+                update_conflicts=True,
+                unique_fields=["item"],
+                update_fields=update_fields,
+            )
+            self.refresh_price_changes()
+
+        logger.info(f"Rebuilt price stats for {len(price_stats)} items")
+        return len(price_stats)
+
+    def _combine_totals(self, row: dict, archived: dict) -> dict:
+        combined = {
+            "item_id": row["item_id"],
+            "entry_count": row["entry_count"] + archived["entry_count"],
+        }
+        for field in PRICE_FIELDS:
+            combined[f"{field}_min"] = min(
+                row[f"{field}_min"], archived[f"{field}_min"]
+            )
+            combined[f"{field}_max"] = max(
+                row[f"{field}_max"], archived[f"{field}_max"]
+            )
+            combined[f"{field}_sum"] = row[f"{field}_sum"] + archived[f"{field}_sum"]
+        return combined
+
+    def _get_change_baseline(self, item_id) -> Optional[PriceHistory]:
+        cutoff = date.today() - timedelta(days=CHANGE_WINDOW_DAYS)
+        item_history = PriceHistory.objects.filter(item_id=item_id)
+
+        baseline = (
+            item_history.filter(date_checked__lte=cutoff)
+            .order_by("-date_checked", "-id")
+            .first()
+        )
+        return baseline or item_history.order_by("date_checked", "id").first()
+
+    def _average(self, price_sum, entry_count) -> Decimal:
+        return (price_sum / entry_count).quantize(Decimal("0.01"))
+
+    def _to_decimal(self, price) -> Decimal:
+        return Decimal(str(price)).quantize(Decimal("0.01"))
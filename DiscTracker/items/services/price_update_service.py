@@ -1,9 +1,12 @@
 import logging
+from typing import Optional
 
 from django.db import DatabaseError, transaction
+from items.models.db_models import Item
 from items.services.price_history_service import PriceHistoryService
 from items.services.cex_service import CexService
 from items.services.item_service import ItemService
+from items.services.price_event_service import PriceEventService
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +17,12 @@ class PriceUpdateService:
         item_service: ItemService,
         api_service: CexService,
         price_history_service: PriceHistoryService,
+        price_event_service: Optional[PriceEventService] = None,
     ):
         self.item_service = item_service
         self.price_history_service = price_history_service
         self.api_service = api_service
+        self.price_event_service = price_event_service or PriceEventService()
 
     def check_price_updates(self):
         updated_items = []
@@ -27,67 +32,71 @@ class PriceUpdateService:
             items = self.item_service.get_all_items()
 
             for item in items:
-                if not item.cex_id:
-                    logger.warning("Item has no cex_id so skipping")
-                    continue
+                updated_item = self.update_item_price(item)
+                if updated_item:
+                    updated_items.append(updated_item)
+            logger.info("Price updates completed successfully")
+            return updated_items
+        except Exception as e:
+            logger.exception(
+                "An unexpected error occurred for checking item prices: %s", e
+            )
+            return None
+
+    def update_item_price(self, item) -> Optional[Item]:
+        if not item.cex_id:
+            logger.warning("Item has no cex_id so skipping")
+            return None
 
-                logger.info(f"Fetching data for CEX ID: {item.cex_id}")
+        logger.info(f"Fetching data for CEX ID: {item.cex_id}")
 
-                fetched_item_data = self.api_service.fetch_item(item.cex_id)
+        fetched_item_data = self.api_service.fetch_item(item.cex_id)
 
-                if not fetched_item_data:
-                    logger.warning(
-                        f"No fetched data for CEX ID {item.cex_id} so skipping"
+        if not fetched_item_data:
+            logger.warning(f"No fetched data for CEX ID {item.cex_id} so skipping")
+            return None
+
+        if not self._validate_price_data(fetched_item_data):
+            logger.warning(f"Invalid price data for CEX ID: {item.cex_id}")
+            return None
+
+        if not self.price_history_service.has_price_changed(
+            item,
+            fetched_item_data.sell_price,
+            fetched_item_data.exchange_price,
+            fetched_item_data.cash_price,
+        ):
+            self.item_service.mark_item_refreshed(item)
+            self.price_history_service.record_unchanged_price(item)
+            return None
+
+        try:
+            with transaction.atomic():
+                updated_item = self.item_service.update_item(fetched_item_data)
+                if not updated_item:
+                    raise DatabaseError(
+                        f"Failed to update item for CEX ID {item.cex_id}"
                     )
-                    continue
-
-                if not self._validate_price_data(fetched_item_data):
-                    logger.warning(f"Invalid price data for CEX ID: {item.cex_id}")
-                    continue
-
-                if self.price_history_service.has_price_changed(
-                    item,
-                    fetched_item_data.sell_price,
-                    fetched_item_data.exchange_price,
-                    fetched_item_data.cash_price,
-                ):
-                    try:
-                        with transaction.atomic():
-                            updated_item = self.item_service.update_item(
-                                fetched_item_data
-                            )
-                            if not updated_item:
-                                raise DatabaseError(
-                                    f"Failed to update item for CEX ID {item.cex_id}"
-                                )
-                            price_history_entry = (
-                                self.price_history_service.create_price_history_entry(
-                                    updated_item
-                                )
-                            )
-                            if not price_history_entry:
-                                raise DatabaseError(
-                                    f"Failed to create price history entry for CEX ID {item.cex_id}"
-                                )
-                            updated_items.append(updated_item)
-                            logger.info(
-                                f"Successfully updated item and price history for CEX ID: {item.cex_id}"
-                            )
-                    except DatabaseError as e:
-                        logger.exception(
-                            f"Database error during price update for CEX ID {item.cex_id}: {e}"
-                        )
-                        continue
-                    except Exception as e:
-                        logger.exception(
-                            f"Unexpected error during price update for CEX ID {item.cex_id}: {e}"
-                        )
-                        continue
-            logger.info("Price updates completed successfully")
-            return updated_items
+                price_history_entry = (
+                    self.price_history_service.create_price_history_entry(updated_item)
+                )
+                if not price_history_entry:
+                    raise DatabaseError(
+                        f"Failed to create price history entry for CEX ID {item.cex_id}"
+                    )
+                self.price_event_service.publish_price_change_on_commit(updated_item)
+                logger.info(
+                    f"Successfully updated item and price history for CEX ID: {item.cex_id}"
+                )
+                return updated_item
+        except DatabaseError as e:
+            logger.exception(
+                f"Database error during price update for CEX ID {item.cex_id}: {e}"
+            )
+            return None
         except Exception as e:
             logger.exception(
-                "An unexpected error occurred for checking item prices: %s", e
+                f"Unexpected error during price update for CEX ID {item.cex_id}: {e}"
             )
             return None
 
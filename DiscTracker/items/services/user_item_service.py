@@ -1,14 +1,21 @@
 import logging
+from typing import Optional
+from asgiref.sync import sync_to_async
 from django.db import IntegrityError, DatabaseError, transaction
 from django.contrib.auth import get_user_model
 from items.models.db_models import Item, UserItem
+from items.services.collection_cache_service import CollectionCacheService
 
 logger = logging.getLogger(__name__)
 
 
 class UserItemService:
-    def __init__(self):
-        pass
+    def __init__(
+        self, collection_cache_service: Optional[CollectionCacheService] = None
+    ):
+        self.collection_cache_service = (
+            collection_cache_service or CollectionCacheService()
+        )
 
     def user_owns_item(self, user, item) -> bool:
         # TODO: Validate inputs
@@ -21,6 +28,7 @@ class UserItemService:
 
         try:
             user_item = UserItem.objects.create(user=user, item=item)
+            self.collection_cache_service.invalidate_collections_on_commit([user.id])
             logger.info(
                 f"User {user.username} added item {item.cex_id} to their collection."
             )
@@ -37,6 +45,36 @@ class UserItemService:
             )
             return None
 
+    async def auser_owns_item(self, user, item) -> bool:
+        return await UserItem.objects.filter(user=user, item=item).aexists()
+
+    async def aadd_user_item(self, user, item):
+        if await self.auser_owns_item(user, item):
+            logger.info(f"User {user.username} already owns item {item.cex_id}")
+            return None
+
+        try:
+            user_item = await UserItem.objects.acreate(user=user, item=item)
+            # Async queries run in autocommit so the row is already visible
+            await sync_to_async(self.collection_cache_service.invalidate_collection)(
+                user.id
+            )
+            logger.info(
+                f"User {user.username} added item {item.cex_id} to their collection."
+            )
+            return user_item
+        except IntegrityError as e:
+            logger.error(f"IntegrityError while adding user-item relation: {e}")
+            return None
+        except DatabaseError as e:
+            logger.exception(f"Database error while adding user to item: {e}")
+            return None
+        except Exception as e:
+            logger.error(
+                f"An unexpected error occurred when adding user-item relation: {e}"
+            )
+            return None
+
     def delete_user_item(self, user, item):
         if not self.user_owns_item(user, item):
             logger.info(f"User {user.username} doesn't own item {item.cex_id}")
@@ -48,6 +86,9 @@ class UserItemService:
                 deleted_count, _ = user_item.delete()
 
                 if deleted_count == 1:
+                    self.collection_cache_service.invalidate_collections_on_commit(
+                        [user.id]
+                    )
                     logger.info(
                         f"User {user.username} added item {item.cex_id} to their collection."
                     )
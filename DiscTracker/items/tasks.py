@@ -1,15 +1,21 @@
 import logging
 from celery import shared_task
+from django.core.cache import cache
 
+from items.services.bulk_import_service import BulkImportService
 from items.services.cex_service import CexService
+from items.services.collection_cache_service import CollectionCacheService
 from items.services.item_service import ItemService
 from items.services.price_history_service import PriceHistoryService
+from items.services.price_stats_service import PriceStatsService
 from items.services.price_update_service import PriceUpdateService
 from items.services.user_item_service import UserItemService
 from items.validators.item_validator import ItemDataValidator
 
 logger = logging.getLogger(__name__)
 
+REFRESH_QUEUED_TIMEOUT = 60 * 10
+
 
 @shared_task
 def update_prices_task():
@@ -31,3 +37,60 @@ def update_prices_task():
     logger.info("Starting Check Price Updates Task")
     price_update_service.check_price_updates()
     logger.info("Prices Updated")
+
+    PriceStatsService().refresh_price_changes()
+    logger.info("Price Stats Refreshed")
+
+    # Every card shows a 30 day change which the refresh above may have moved
+    CollectionCacheService().invalidate_all_collections()
+
+
+@shared_task
+def refresh_item_task(cex_id):
+    validator = ItemDataValidator()
+    api_service = CexService()
+    price_history_service = PriceHistoryService()
+    user_item_service = UserItemService()
+    item_service = ItemService(
+        validator=validator,
+        user_item_service=user_item_service,
+        price_history_service=price_history_service,
+    )
+    price_update_service = PriceUpdateService(
+        item_service=item_service,
+        api_service=api_service,
+        price_history_service=price_history_service,
+    )
+
+    item = item_service.get_item_by_cex_id(cex_id)
+    if not item:
+        logger.warning(f"Item {cex_id} no longer exists so not refreshing")
+        return
+
+    logger.info(f"Refreshing item {cex_id}")
+    price_update_service.update_item_price(item)
+    cache.delete(_refresh_queued_key(cex_id))
+
+
+@shared_task
+def bulk_import_task(job_id):
+    logger.info(f"Starting import job {job_id}")
+    BulkImportService().run_job(job_id)
+
+
+def queue_item_refresh(cex_id) -> bool:
+    # Adds of a popular stale item would otherwise queue a refresh each
+    if not cache.add(_refresh_queued_key(cex_id), True, timeout=REFRESH_QUEUED_TIMEOUT):
+        return False
+
+    try:
+        refresh_item_task.delay(cex_id)
+        return True
+    except Exception as e:
+        logger.exception(f"Failed to queue refresh for item {cex_id}: {e}")
+        cache.delete(_refresh_queued_key(cex_id))
+        return False
+
+
+def _refresh_queued_key(cex_id) -> str:
+    return f"item_refresh_queued:{cex_id}"
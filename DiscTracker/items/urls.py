@@ -6,6 +6,22 @@ app_name = "items"
 urlpatterns = [
     # ex: /items/
     path("", views.index, name="index"),
+    # ex: /items/compare?cex_id=1&cex_id=2
+    path("compare", views.compare_items, name="compare"),
+    path("compare/data", views.compare_items_chart, name="compare-chart"),
+    # ex: /items/bulk-add
+    path("bulk-add", views.bulk_add_items, name="bulk-add"),
+    # ex: /items/export?format=csv&history=1
+    path("export", views.export_collection, name="export"),
+    # ex: /items/price-events
+    path("price-events", views.price_events, name="price-events"),
+    # ex: /items/imports/1
+    path("imports/<int:job_id>", views.import_job, name="import-job"),
+    path(
+        "imports/<int:job_id>/progress",
+        views.import_job_progress,
+        name="import-job-progress",
+    ),
     # ex: /items/1
     path("<str:cex_id>/", views.detail, name="detail"),
     path("<str:cex_id>/chart", views.item_price_chart, name="item-price-chart"),
@@ -1,26 +1,66 @@
-from django.shortcuts import redirect, render, get_object_or_404, get_list_or_404
-from django.db import DatabaseError
-from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render, get_object_or_404
+from django.db import DatabaseError, connections, router
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.core.paginator import Paginator
+from django.core.handlers.asgi import ASGIRequest
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 import logging
 
+from asgiref.sync import sync_to_async
+from disctracker.db_routers import read_from_replica
+from items.services.bulk_import_service import BulkImportService
 from items.services.cex_service import CexService
+from items.services.collection_cache_service import CollectionCacheService
+from items.services.export_service import EXPORT_CONTENT_TYPES, ExportService
+from items.services.price_event_service import PriceEventService
 from items.services.price_history_service import PriceHistoryService
+from items.services.price_chart_service import (
+    COMPARE_MAX_ITEMS,
+    COMPARE_PRICE_FIELDS,
+    INITIAL_CHART_QUERY,
+    PriceChartService,
+)
 from items.services.user_item_service import UserItemService
 from items.validators.item_validator import ItemDataValidator
 from items.services.item_service import ItemService
-from items.models.db_models import Item, PriceHistory
-from items.forms import AddItemForm, UpdateItemPrices, DeleteItemForm
-from items.tasks import update_prices_task
+from items.models.db_models import ImportJob, Item
+from items.forms import (
+    AddItemForm,
+    BulkAddItemsForm,
+    CompareItemsForm,
+    UpdateItemPrices,
+    DeleteItemForm,
+)
+from items.tasks import bulk_import_task, queue_item_refresh, update_prices_task
 from items.permissions import is_admin
-from items.filters import ItemFilter
+from items.filters import NULLABLE_ORDERING_FIELDS, ItemFilter
+from items.pagination import KeysetPaginator
 
 logger = logging.getLogger(__name__)
 
 
+def _collection_etag(request):
+    # Flash messages are only shown once so a page carrying them can't be reused
+    if len(messages.get_messages(request)):
+        return None
+
+    collection_cache_service = CollectionCacheService()
+    version = collection_cache_service.get_collection_version(request.user.id)
+    return collection_cache_service.get_collection_etag(
+        request.user.id, version, request.GET, request.META.get("CSRF_COOKIE", "")
+    )
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_collection_etag)
+@read_from_replica
 def index(request):
     if request.method != "GET":
         logger.warning("Invalid request method (%s) - GET required", request.method)
@@ -44,14 +84,36 @@ def index(request):
         NUMBER_OF_ITEMS_PER_PAGE = 9
         item_filter = ItemFilter(request.GET, queryset=item_list)
 
-        paginator = Paginator(item_filter.qs, NUMBER_OF_ITEMS_PER_PAGE)
+        # The grid is the only part that reads the collection so a cached copy
+        # lets unchanged pages skip the queries and card rendering entirely
+        collection_cache_service = CollectionCacheService()
+        version = collection_cache_service.get_collection_version(request.user.id)
+        collection_grid = collection_cache_service.get_cached_grid(
+            request.user.id, version, request.GET
+        )
 
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
+        if collection_grid is None:
+            paginator = KeysetPaginator(
+                item_filter.qs,
+                NUMBER_OF_ITEMS_PER_PAGE,
+                ordering=item_filter.get_ordering(),
+                nullable_fields=NULLABLE_ORDERING_FIELDS,
+                approximate_count=True,
+            )
+
+            page_obj = paginator.get_page(request.GET.get("cursor"))
+
+            collection_grid = render_to_string(
+                "items/partials/collection_grid.html",
+                {"items_list": page_obj.object_list, "page_obj": page_obj},
+                request=request,
+            )
+            collection_cache_service.cache_grid(
+                request.user.id, version, request.GET, collection_grid
+            )
 
         context = {
-            "items_list": page_obj.object_list,
-            "page_obj": page_obj,
+            "collection_grid": mark_safe(collection_grid),
             "add_item_form": AddItemForm,
             "update_item_prices_form": UpdateItemPrices,
             "filter": item_filter,
@@ -69,6 +131,7 @@ def index(request):
 
 
 @login_required
+@read_from_replica
 def detail(request, cex_id):
     if request.method != "GET":
         logger.warning("Invalid request method (%s) - GET required", request.method)
@@ -76,30 +139,30 @@ def detail(request, cex_id):
         return redirect("items:index")
 
     try:
-        validator = ItemDataValidator()
-        user_item_service = UserItemService()
-        price_history_service = PriceHistoryService()
-
-        item_service = ItemService(
-            validator=validator,
-            user_item_service=user_item_service,
-            price_history_service=price_history_service,
-        )
-
         logger.info("Fetching item %s for detail view", cex_id)
-        item = item_service.get_item_by_cex_id(cex_id=cex_id)
+        # Ownership and the summary stats come back with the item in one query
+        item = get_object_or_404(
+            Item.objects.select_related("price_stats"),
+            cex_id=cex_id,
+            useritem__user=request.user,
+        )
 
-        if not item:
-            logger.exception(f"Error fetching item by cex_id {cex_id}")
-            messages.error(request, f"Item with ID '{cex_id}' not found.")
-            return redirect("items:index")
+        price_chart_service = PriceChartService()
+        chart_data = price_chart_service.get_chart_data(
+            item, price_chart_service.parse_chart_params(INITIAL_CHART_QUERY)
+        )
 
         context = {
             "item": item,
+            "chart_data": chart_data,
             "delete_item_form": DeleteItemForm,
         }
 
         return render(request, "items/detail.html", context)
+    except Http404:
+        logger.warning(f"Item {cex_id} not found in user's collection")
+        messages.error(request, f"Item with ID '{cex_id}' not found.")
+        return redirect("items:index")
     except DatabaseError as e:
         logger.exception("Database error occured: %s", e)
         messages.error(request, "Database error occurred. Please try again later.")
@@ -111,6 +174,7 @@ def detail(request, cex_id):
 
 
 @login_required
+@read_from_replica
 def price_history(request):
     if request.method != "GET":
         logger.warning("Invalid request method (%s) - GET required", request.method)
@@ -119,17 +183,18 @@ def price_history(request):
 
     try:
         logger.info("Fetching price history for price_history view")
-        # TODO: Change to use item not user
-        price_history = get_list_or_404(PriceHistory, item__user=request.user)
-        return render(request, "items/price_history.html", {"item": price_history})
-    except Http404 as e:
-        logger.exception("Error fetching price history: %s", e)
-        messages.warning(request, "No price history available.")
-        return render(
-            request,
-            "error.html",
-            {"message": "Error fetching price history: " + str(e)},
+        price_history_service = PriceHistoryService()
+        price_history = price_history_service.get_user_price_history(request.user)
+
+        NUMBER_OF_ENTRIES_PER_PAGE = 100
+        paginator = KeysetPaginator(
+            price_history,
+            NUMBER_OF_ENTRIES_PER_PAGE,
+            ordering=["-date_checked", "-id"],
         )
+        page_obj = paginator.get_page(request.GET.get("cursor"))
+
+        return render(request, "items/price_history.html", {"page_obj": page_obj})
     except DatabaseError as e:
         logger.exception("Database error occured: %s", e)
         messages.error(request, "Database error occurred. Please try again later.")
@@ -147,7 +212,75 @@ def price_history(request):
 
 
 @login_required
-def add_item_from_cex(request):
+@read_from_replica
+def export_collection(request):
+    export_format = request.GET.get("format", "csv")
+    include_history = request.GET.get("history") == "1"
+
+    if export_format not in EXPORT_CONTENT_TYPES:
+        logger.warning(f"Invalid export format requested: {export_format}")
+        messages.error(request, "Exports are only available as CSV or NDJSON.")
+        return redirect("items:index")
+
+    logger.info(f"Exporting collection as {export_format} for user {request.user.id}")
+    # The rows are read after the view returns so the alias is fixed here
+    export_service = ExportService(using=router.db_for_read(Item))
+    content = export_service.export_collection(
+        request.user, export_format, include_history
+    )
+
+    # ASGI reads a sync iterator into a list before sending any of it
+    if isinstance(request, ASGIRequest):
+        content = _iterate_in_thread(content)
+
+    filename = "collection-history" if include_history else "collection"
+    response = StreamingHttpResponse(
+        content, content_type=EXPORT_CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
+async def _iterate_in_thread(iterator):
+    # Every chunk is read on the request's thread so the cursor stays on its
+    # connection and inside its transaction
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(iterator, None)) is not None:
+            yield chunk
+    finally:
+        # A client that disconnects early leaves the transaction to be closed here
+        await sync_to_async(iterator.close)()
+
+
+@login_required
+async def price_events(request):
+    # The images serve ASGI through uvicorn workers. Under a WSGI server such as
+    # manage.py runserver a stream that never ends would hold a worker for good,
+    # so a 204 tells the browser not to reconnect.
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    logger.info(f"Opening price event stream for user {user.id}")
+    # The stream can stay open for hours and never touches the database again
+    await sync_to_async(connections.close_all)()
+
+    price_event_service = PriceEventService()
+    response = StreamingHttpResponse(
+        price_event_service.stream_price_events(user.id),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stops nginx holding events back in its buffer
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+async def add_item_from_cex(request):
     if request.method != "POST":
         logger.warning("Invalid request method (%s) - POST required", request.method)
         messages.warning(request, "Invalid request method - only POST is allowed.")
@@ -163,6 +296,7 @@ def add_item_from_cex(request):
 
     try:
         logger.info("Fetching item by cex_id %s", cex_id)
+        user = await request.auser()
 
         validator = ItemDataValidator()
         user_item_service = UserItemService()
@@ -173,58 +307,65 @@ def add_item_from_cex(request):
             user_item_service=user_item_service,
             price_history_service=price_history_service,
         )
-        cex_service = CexService()
-
-        item_data = cex_service.fetch_item(cex_id)
-
-        if item_data is None:
-            logger.error("Fetched item with cex_id %s is empty", cex_id)
-            messages.warning(request, f"Item with ID '{cex_id}' does not exist.")
-            return redirect("items:index")
 
-        existing_item = item_service.get_item_by_cex_id(item_data.cex_id)
-
-        if not existing_item:
-            logger.info(f"Creating item {item_data.cex_id} in database")
-            item, _ = item_service.create_item_and_price_history(
-                item_data=item_data, user=request.user
-            )
+        # Items already in the catalogue are linked straight away, a stale one is
+        # refreshed in the background rather than while the user waits
+        existing_item = await item_service.aget_item_by_cex_id(cex_id)
 
-            if not item:
-                logger.info("Could not create item with ID %s", cex_id)
-                messages.error(request, f"Could not add Item with ID '{cex_id}'.")
-                return redirect("items:index")
-
-            messages.info(request, f"Added {item_data.title}.")
-            logger.info("Redirecting to items index")
-            return redirect("items:index")
-        else:
+        if existing_item:
             logger.info(f"Item {existing_item.title} exists")
-            user_owns_item = user_item_service.user_owns_item(
-                request.user, existing_item
+            if not item_service.is_item_fresh(existing_item):
+                logger.info(f"Queueing refresh of stale item {existing_item.cex_id}")
+                await sync_to_async(queue_item_refresh)(existing_item.cex_id)
+
+            user_owns_item = await user_item_service.auser_owns_item(
+                user, existing_item
             )
             if user_owns_item:
-                logger.info(
-                    f"User {request.user.username} already owns {existing_item.title}"
-                )
-                messages.info(request, f"You already own '{item_data.title}'.")
+                logger.info(f"User {user.username} already owns {existing_item.title}")
+                messages.info(request, f"You already own '{existing_item.title}'.")
                 return redirect("items:index")
             else:
-                logger.info(
-                    f"Assigning {existing_item.title} to user {request.user.username}"
-                )
-                user_existing_item = user_item_service.add_user_item(
-                    request.user, item=existing_item
+                logger.info(f"Assigning {existing_item.title} to user {user.username}")
+                user_existing_item = await user_item_service.aadd_user_item(
+                    user, item=existing_item
                 )
 
                 if not user_existing_item:
                     raise Exception(
-                        f"Couldn't create user item relationship between {request.user.username} and {existing_item.title}"
+                        f"Couldn't create user item relationship between {user.username} and {existing_item.title}"
                     )
 
-                messages.info(request, f"Added {item_data.title}.")
+                messages.info(request, f"Added {existing_item.title}.")
                 logger.info("Redirecting to items index")
                 return redirect("items:index")
+
+        cex_service = CexService()
+
+        # Waiting on CEX no longer ties up a worker, other requests are served
+        # while this one is suspended
+        item_data = await cex_service.afetch_item(cex_id)
+
+        if item_data is None:
+            logger.error("Fetched item with cex_id %s is empty", cex_id)
+            messages.warning(request, f"Item with ID '{cex_id}' does not exist.")
+            return redirect("items:index")
+
+        logger.info(f"Creating item {item_data.cex_id} in database")
+        # The item, ownership and first price must commit together and the
+        # async ORM can't open a transaction so this part runs in a thread
+        item, _ = await sync_to_async(item_service.create_item_and_price_history)(
+            item_data=item_data, user=user
+        )
+
+        if not item:
+            logger.info("Could not create item with ID %s", cex_id)
+            messages.error(request, f"Could not add Item with ID '{cex_id}'.")
+            return redirect("items:index")
+
+        messages.info(request, f"Added {item_data.title}.")
+        logger.info("Redirecting to items index")
+        return redirect("items:index")
     except DatabaseError as e:
         logger.exception("Database error occured: %s", e)
         messages.error(request, "Database error occurred. Please try again later.")
@@ -235,6 +376,59 @@ def add_item_from_cex(request):
         return redirect("items:index")
 
 
+@login_required
+def bulk_add_items(request):
+    if request.method not in ("GET", "POST"):
+        logger.warning("Invalid request method (%s)", request.method)
+        messages.warning(request, "Invalid request method.")
+        return redirect("items:index")
+
+    form = BulkAddItemsForm(request.POST or None, request.FILES or None)
+    if request.method == "GET" or not form.is_valid():
+        return render(request, "items/bulk_add.html", {"bulk_add_items_form": form})
+
+    try:
+        job = BulkImportService().create_job(request.user, form.cleaned_data["cex_ids"])
+        if job is None:
+            messages.error(request, "Could not start the import. Please try again.")
+            return redirect("items:bulk-add")
+
+        bulk_import_task.delay(job.id)
+        logger.info(f"Queued import job {job.id}")
+        return redirect("items:import-job", job_id=job.id)
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        messages.error(request, "An unexpected error occurred. Please try again later.")
+        return redirect("items:bulk-add")
+
+
+@login_required
+def import_job(request, job_id):
+    job = get_object_or_404(ImportJob, id=job_id, user=request.user)
+    return render(request, "items/import_job.html", {"job": job})
+
+
+@login_required
+def import_job_progress(request, job_id):
+    job = (
+        ImportJob.objects.filter(id=job_id, user=request.user).defer("cex_ids").first()
+    )
+    if job is None:
+        return JsonResponse({"error": "Import not found."}, status=404)
+
+    return JsonResponse(
+        {
+            "status": job.status,
+            "finished": job.is_finished,
+            "total": job.total,
+            "processed": job.processed,
+            "added": job.added,
+            "already_owned": job.already_owned,
+            "not_found": job.not_found,
+        }
+    )
+
+
 @login_required
 def delete_item(request, cex_id):
     if request.method != "POST":
@@ -296,61 +490,48 @@ def update_item_prices(request):
 
 
 @login_required
+@read_from_replica
 def item_price_chart(request, cex_id):
     try:
-        item = get_object_or_404(Item, cex_id=cex_id)
-        price_history = item.price_history.all().order_by("date_checked")
-
-        if not price_history.exists():
+        price_chart_service = PriceChartService()
+
+        try:
+            chart_params = price_chart_service.parse_chart_params(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        # Everything needed for the ETag comes from the cache so unchanged charts
+        # are answered without touching the database
+        version = price_chart_service.get_history_version(cex_id)
+        etag = price_chart_service.get_chart_etag(cex_id, version, chart_params)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _chart_response(not_modified, etag, None)
+
+        chart = price_chart_service.get_or_build_chart(
+            cex_id,
+            version,
+            chart_params,
+            lambda: get_object_or_404(Item, cex_id=cex_id),
+        )
+        if chart is None:
             logger.warning(f"No price history found for item {cex_id}")
             return JsonResponse(
-                {"error": f"No price history available for item {cex_id}"}, status=404
+                {"error": f"No price history available for item {cex_id}"},
+                status=404,
             )
 
-        labels = []
-        sell_prices = []
-        exchange_prices = []
-        cash_prices = []
-
-        for entry in price_history:
-            labels.append(
-                entry.date_checked.strftime("%Y-%m-%d")
-            )  # Has to be string for json
-            sell_prices.append(
-                float(entry.sell_price)
-            )  # Has to change from Decimal to float to json serialise
-            exchange_prices.append(
-                float(entry.exchange_price)
-            )  # Has to change from Decimal to float to json serialise
-            cash_prices.append(
-                float(entry.cash_price)
-            )  # Has to change from Decimal to float to json serialise
-
-        data = {
-            "labels": labels,
-            "datasets": [
-                {
-                    "label": "Sell Price",
-                    "data": sell_prices,
-                    "borderColor": "rgba(255, 99, 132, 1)",
-                    "fill": False,
-                },
-                {
-                    "label": "Exchange Price",
-                    "data": exchange_prices,
-                    "borderColor": "rgba(54, 162, 235, 1)",
-                    "fill": False,
-                },
-                {
-                    "label": "Cash Price",
-                    "data": cash_prices,
-                    "borderColor": "rgba(75, 192, 192, 1)",
-                    "fill": False,
-                },
-            ],
-        }
+        body, last_modified = chart
 
-        return JsonResponse(data)
+        last_modified_timestamp = last_modified.timestamp() if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+
+        return _chart_response(response, etag, last_modified_timestamp)
 
     except Http404:
         logger.exception(f"Item with ID {cex_id} not found")
@@ -366,3 +547,93 @@ def item_price_chart(request, cex_id):
             {"error": "An unexpected error occurred. Please try again later."},
             status=500,
         )
+
+
+@login_required
+@read_from_replica
+def compare_items(request):
+    try:
+        item_service = ItemService(
+            validator=ItemDataValidator(),
+            user_item_service=UserItemService(),
+            price_history_service=PriceHistoryService(),
+        )
+
+        items = (
+            item_service.get_user_items(request.user)
+            .select_related(None)
+            .only("cex_id", "title")
+        )
+        context = {"compare_items_form": CompareItemsForm(items=items)}
+
+        return render(request, "items/compare.html", context)
+    except DatabaseError as e:
+        logger.exception("Database error occured: %s", e)
+        messages.error(request, "Database error occurred. Please try again later.")
+        return redirect("items:index")
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        messages.error(request, "An unexpected error occurred. Please try again later.")
+        return redirect("items:index")
+
+
+@login_required
+@read_from_replica
+def compare_items_chart(request):
+    try:
+        price_chart_service = PriceChartService()
+
+        try:
+            chart_params = price_chart_service.parse_chart_params(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        cex_ids = request.GET.getlist("cex_id")
+        if not cex_ids or len(cex_ids) > COMPARE_MAX_ITEMS:
+            return JsonResponse(
+                {"error": f"Choose between 1 and {COMPARE_MAX_ITEMS} items"},
+                status=400,
+            )
+
+        price = request.GET.get("price", "sell")
+        if price not in COMPARE_PRICE_FIELDS:
+            return JsonResponse(
+                {"error": f"price must be one of {', '.join(COMPARE_PRICE_FIELDS)}"},
+                status=400,
+            )
+
+        data = price_chart_service.build_comparison_data(
+            request.user,
+            cex_ids,
+            price=price,
+            start=chart_params["start"],
+            end=chart_params["end"],
+        )
+
+        if data is None:
+            logger.warning(f"No price history found to compare items {cex_ids}")
+            return JsonResponse(
+                {"error": "No price history available for these items"}, status=404
+            )
+
+        return JsonResponse(data)
+    except DatabaseError as e:
+        logger.exception("Database error occured: %s", e)
+        return JsonResponse(
+            {"error": "Database error. Please try again later."}, status=500
+        )
+    except Exception as e:
+        logger.exception("An unexpected error occured: %s", e)
+        return JsonResponse(
+            {"error": "An unexpected error occurred. Please try again later."},
+            status=500,
+        )
+
+
+def _chart_response(response, etag, last_modified_timestamp):
+    response["ETag"] = etag
+    if last_modified_timestamp:
+        response["Last-Modified"] = http_date(last_modified_timestamp)
+    # Browsers must revalidate so new history shows as soon as it is written
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,255 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from items.models.db_models import ApiToken, Item, PriceHistory, UserItem
+from items.services.api_token_service import ApiTokenService
+from items.services.collection_cache_service import CollectionCacheService
+from items.services.price_chart_service import PriceChartService
+from items.services.price_stats_service import PriceStatsService
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def api_key(user):
+    _, key = ApiTokenService().create_token(user, "scripts")
+    return key
+
+
+@pytest.fixture
+def auth(api_key):
+    return {"HTTP_AUTHORIZATION": f"Token {api_key}"}
+
+
+@pytest.fixture
+def owned_items(user):
+    items = [
+        Item.objects.create(
+            cex_id=f"{index}",
+            title=title,
+            sell_price=sell_price,
+            exchange_price=sell_price / 2,
+            cash_price=sell_price / 4,
+            last_checked=date(2025, 1, 1),
+        )
+        for index, (title, sell_price) in enumerate(
+            [("Alien", 8.0), ("Aliens", 12.0), ("Halloween", 4.0)]
+        )
+    ]
+    for item in items:
+        UserItem.objects.create(user=user, item=item)
+    return items
+
+
+@pytest.fixture
+def item_with_history(owned_items):
+    item = owned_items[0]
+    for days_ago, sell_price in [(20, 10.0), (10, 9.0), (0, 8.0)]:
+        PriceHistory.objects.create(
+            item=item,
+            sell_price=sell_price,
+            exchange_price=4.0,
+            cash_price=2.0,
+            date_checked=date.today() - timedelta(days=days_ago),
+        )
+    PriceStatsService().rebuild_price_stats()
+    return item
+
+
+@pytest.mark.django_db
+def test_authenticate(user, api_key):
+    token = ApiTokenService().authenticate(api_key)
+
+    assert token.user == user
+    assert token.last_used_at is not None
+    assert ApiToken.objects.get().key_hash != api_key
+    assert ApiTokenService().authenticate("wrong") is None
+
+
+@pytest.mark.django_db
+def test_authenticate_rejects_inactive_user(user, api_key):
+    user.is_active = False
+    user.save()
+
+    assert ApiTokenService().authenticate(api_key) is None
+
+
+@pytest.mark.django_db
+def test_authenticate_throttles_last_used(api_key):
+    token_service = ApiTokenService()
+    last_used_at = token_service.authenticate(api_key).last_used_at
+
+    with CaptureQueriesContext(connection) as queries:
+        token = token_service.authenticate(api_key)
+
+    # A recently used token is only looked up, not written
+    assert len(queries) == 1
+    assert token.last_used_at == last_used_at
+
+    ApiToken.objects.update(last_used_at=timezone.now() - timedelta(hours=1))
+    assert token_service.authenticate(api_key).last_used_at > last_used_at
+
+
+@pytest.mark.django_db
+def test_api_requires_token(client, user, owned_items):
+    client.force_login(user)
+
+    response = client.get(reverse("api:item-list"))
+    bad_token_response = client.get(
+        reverse("api:item-list"), HTTP_AUTHORIZATION="Token wrong"
+    )
+
+    # A session is not enough, scripts have to use a token
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Token"
+    assert bad_token_response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_item_list_filters_and_paginates(client, auth, owned_items):
+    response = client.get(
+        reverse("api:item-list"),
+        {"title": "alien", "ordering": "-sell_price", "limit": 1},
+        **auth,
+    )
+    data = response.json()
+    next_response = client.get(
+        reverse("api:item-list"),
+        {
+            "title": "alien",
+            "ordering": "-sell_price",
+            "limit": 1,
+            "cursor": data["next_cursor"],
+        },
+        **auth,
+    )
+    next_data = next_response.json()
+
+    assert [item["title"] for item in data["results"]] == ["Aliens"]
+    assert [item["title"] for item in next_data["results"]] == ["Alien"]
+    assert next_data["next_cursor"] is None
+    assert next_data["previous_cursor"] is not None
+
+
+@pytest.mark.django_db
+def test_item_list_only_shows_own_items(client, auth, owned_items):
+    other_user = User.objects.create_user(username="otheruser", password="password")
+    other_item = Item.objects.create(
+        cex_id="999", title="Not Mine", sell_price=1, exchange_price=1, cash_price=1
+    )
+    UserItem.objects.create(user=other_user, item=other_item)
+
+    response = client.get(reverse("api:item-list"), **auth)
+
+    assert {item["cex_id"] for item in response.json()["results"]} == {
+        "0",
+        "1",
+        "2",
+    }
+
+
+@pytest.mark.django_db
+def test_item_list_sparse_fields(client, auth, owned_items):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            reverse("api:item-list"), {"fields": "cex_id,title"}, **auth
+        )
+
+    assert response.json()["results"][0] == {"cex_id": "0", "title": "Alien"}
+    item_query = queries.captured_queries[-1]["sql"]
+    assert "sell_price" not in item_query
+    assert "itempricestats" not in item_query
+
+
+@pytest.mark.django_db
+def test_item_list_invalid_params(client, auth):
+    assert (
+        client.get(reverse("api:item-list"), {"fields": "password"}, **auth).status_code
+        == 400
+    )
+    assert client.get(reverse("api:item-list"), {"limit": 0}, **auth).status_code == 400
+    assert (
+        client.get(
+            reverse("api:item-list"), {"sell_price_min": "cheap"}, **auth
+        ).status_code
+        == 400
+    )
+
+
+@pytest.mark.django_db
+def test_item_list_etag(client, user, auth, owned_items):
+    response = client.get(reverse("api:item-list"), **auth)
+    etag = response["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = client.get(
+            reverse("api:item-list"), HTTP_IF_NONE_MATCH=etag, **auth
+        )
+
+    # Only the token is looked up
+    assert not_modified.status_code == 304
+    assert len(queries) == 1
+    assert response["Cache-Control"] == "private, no-cache"
+
+    CollectionCacheService().invalidate_collection(user.id)
+    changed = client.get(reverse("api:item-list"), HTTP_IF_NONE_MATCH=etag, **auth)
+    assert changed.status_code == 200
+
+
+@pytest.mark.django_db
+def test_item_detail(client, auth, item_with_history, owned_items):
+    response = client.get(
+        reverse("api:item-detail", args=[item_with_history.cex_id]), **auth
+    )
+    no_stats_response = client.get(
+        reverse("api:item-detail", args=[owned_items[2].cex_id]),
+        {"fields": "title,sell_price_min"},
+        **auth,
+    )
+
+    data = response.json()
+    assert data["title"] == "Alien"
+    assert data["sell_price_max"] == "10.00"
+    assert data["sell_price_min"] == "8.00"
+    assert no_stats_response.json() == {"title": "Halloween", "sell_price_min": None}
+
+
+@pytest.mark.django_db
+def test_item_detail_not_owned(client, auth):
+    Item.objects.create(
+        cex_id="999", title="Not Mine", sell_price=1, exchange_price=1, cash_price=1
+    )
+
+    response = client.get(reverse("api:item-detail", args=["999"]), **auth)
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_item_history(client, auth, item_with_history):
+    url = reverse("api:item-history", args=[item_with_history.cex_id])
+
+    response = client.get(url, {"limit": 2}, **auth)
+    data = response.json()
+    next_data = client.get(
+        url, {"limit": 2, "cursor": data["next_cursor"]}, **auth
+    ).json()
+
+    assert [entry["sell_price"] for entry in data["results"]] == ["8.00", "9.00"]
+    assert [entry["sell_price"] for entry in next_data["results"]] == ["10.00"]
+
+    # New history changes the ETag even though the collection did not change
+    etag = response["ETag"]
+    PriceChartService().invalidate_history(item_with_history.cex_id)
+    assert (
+        client.get(url, {"limit": 2}, HTTP_IF_NONE_MATCH=etag, **auth).status_code
+        == 200
+    )
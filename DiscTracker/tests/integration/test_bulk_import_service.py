@@ -0,0 +1,165 @@
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from items.forms import BulkAddItemsForm
+from items.models.db_models import (
+    ImportJob,
+    Item,
+    ItemPriceStats,
+    PriceHistory,
+    UserItem,
+)
+from items.models.pydantic_models import ItemData
+from items.services.bulk_import_service import BulkImportService
+
+
+@pytest.fixture
+def bulk_import_service():
+    return BulkImportService()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+def fetched_item(cex_id):
+    if cex_id == "missing":
+        return None
+    return ItemData(
+        cex_id=cex_id,
+        title=f"Film {cex_id}",
+        sell_price=6.0,
+        exchange_price=4.0,
+        cash_price=2.0,
+    )
+
+
+@pytest.mark.django_db
+@patch("items.services.cex_service.CexService.fetch_item", side_effect=fetched_item)
+def test_run_job(mock_fetch_item, bulk_import_service, settings, user, existing_item):
+    settings.CEX_REQUESTS_PER_SECOND = 1000
+    owned_item = Item.objects.create(
+        cex_id="111", title="Owned", sell_price=1, exchange_price=1, cash_price=1
+    )
+    UserItem.objects.create(user=user, item=owned_item)
+    job = bulk_import_service.create_job(
+        user, ["5060020626449", "111", "222", "333", "missing"]
+    )
+
+    job = bulk_import_service.run_job(job.id)
+
+    # Only IDs missing from the catalogue are fetched
+    assert sorted(call.args[0] for call in mock_fetch_item.call_args_list) == [
+        "222",
+        "333",
+        "missing",
+    ]
+    assert job.status == ImportJob.Status.COMPLETED
+    assert job.processed == 5
+    assert job.added == 3
+    assert job.already_owned == 1
+    assert job.not_found == ["missing"]
+    assert set(
+        UserItem.objects.filter(user=user).values_list("item__cex_id", flat=True)
+    ) == {"5060020626449", "111", "222", "333"}
+
+    new_item = Item.objects.get(cex_id="222")
+    assert new_item.last_checked == date.today()
+    assert PriceHistory.objects.filter(item=new_item).count() == 1
+    assert ItemPriceStats.objects.get(item=new_item).sell_price_min == 6
+    assert not PriceHistory.objects.filter(item=existing_item).exists()
+
+
+@pytest.mark.django_db
+@patch("items.services.cex_service.CexService.fetch_item", side_effect=fetched_item)
+def test_run_job_twice(mock_fetch_item, bulk_import_service, settings, user):
+    settings.CEX_REQUESTS_PER_SECOND = 1000
+    job = bulk_import_service.create_job(user, ["222"])
+
+    bulk_import_service.run_job(job.id)
+    bulk_import_service.run_job(job.id)
+
+    assert mock_fetch_item.call_count == 1
+    assert UserItem.objects.filter(user=user).count() == 1
+
+
+@pytest.mark.django_db
+@patch(
+    "items.services.bulk_import_service.BulkImportService._link_items",
+    side_effect=Exception,
+)
+def test_run_job_failure(mock_link_items, bulk_import_service, user, existing_item):
+    job = bulk_import_service.create_job(user, [existing_item.cex_id])
+
+    assert bulk_import_service.run_job(job.id) is None
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILED
+
+
+def test_bulk_add_items_form_parses_ids():
+    csv_file = SimpleUploadedFile("ids.csv", b"CEX ID,Title\n333,Alien\n111,Alien 3\n")
+    form = BulkAddItemsForm({"cex_ids": "111, 222\n222;  "}, {"csv_file": csv_file})
+
+    assert form.is_valid()
+    assert form.cleaned_data["cex_ids"] == ["111", "222", "333"]
+
+
+def test_bulk_add_items_form_rejects_invalid_ids():
+    form = BulkAddItemsForm({"cex_ids": "111\nnot-an-id"})
+
+    assert not form.is_valid()
+    assert "not-an-id" in str(form.errors)
+
+
+def test_bulk_add_items_form_requires_ids():
+    assert not BulkAddItemsForm({"cex_ids": " \n "}).is_valid()
+
+
+@pytest.mark.django_db
+@patch("items.views.bulk_import_task.delay")
+def test_bulk_add_view_queues_job(mock_delay, client, user):
+    client.force_login(user)
+
+    response = client.post(reverse("items:bulk-add"), {"cex_ids": "111\n222"})
+
+    job = ImportJob.objects.get(user=user)
+    assert job.cex_ids == ["111", "222"]
+    assert response.url == reverse("items:import-job", args=[job.id])
+    mock_delay.assert_called_once_with(job.id)
+
+
+@pytest.mark.django_db
+def test_import_job_progress(client, user):
+    other_user = User.objects.create_user(username="otheruser", password="password")
+    job = ImportJob.objects.create(
+        user=user, cex_ids=["111", "222"], total=2, processed=1
+    )
+    url = reverse("items:import-job-progress", args=[job.id])
+
+    client.force_login(user)
+    progress = client.get(url).json()
+    client.force_login(other_user)
+    other_response = client.get(url)
+
+    assert progress["status"] == "pending"
+    assert progress["processed"] == 1
+    assert progress["finished"] is False
+    assert other_response.status_code == 404
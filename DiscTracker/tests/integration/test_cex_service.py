@@ -1,7 +1,9 @@
+import httpx
 import pytest
 import requests
-from unittest.mock import patch
-from items.services.cex_service import CexService
+from asgiref.sync import async_to_sync
+from unittest.mock import AsyncMock, patch
+from items.services.cex_service import CexService, RateLimiter
 
 
 @pytest.fixture
@@ -153,3 +155,112 @@ def test_fetch_item_unexpected_error(mock_get, cex_service):
     item = cex_service.fetch_item("711719417576")
 
     assert item is None
+
+
+def cex_response(status_code, json=None):
+    request = httpx.Request("GET", "https://cex.test/711719417576/detail")
+    return httpx.Response(status_code, json=json, request=request)
+
+
+@patch("items.services.cex_service.httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_afetch_item_success(mock_get, cex_service):
+    mock_get.return_value = cex_response(
+        200,
+        {
+            "response": {
+                "ack": "success",
+                "data": {
+                    "boxDetails": [
+                        {
+                            "boxId": "711719417576",
+                            "boxName": "Spider-Man (2018) No DLC",
+                            "sellPrice": 15.0,
+                            "exchangePrice": 10.0,
+                            "cashPrice": 7.0,
+                        }
+                    ]
+                },
+                "error": {"code": "", "internal_message": "", "moreInfo": []},
+            }
+        },
+    )
+
+    item = async_to_sync(cex_service.afetch_item)("711719417576")
+
+    assert item.cex_id == "711719417576"
+    assert item.title == "Spider-Man (2018) No DLC"
+    assert item.sell_price == 15.0
+
+
+@patch("items.services.cex_service.httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_afetch_item_http_error(mock_get, cex_service):
+    mock_get.return_value = cex_response(404, {"response": {"data": ""}})
+
+    item = async_to_sync(cex_service.afetch_item)("711719417576")
+
+    assert item is None
+
+
+@patch("items.services.cex_service.httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_afetch_item_timeout(mock_get, cex_service):
+    mock_get.side_effect = httpx.ReadTimeout("CEX took too long")
+
+    item = async_to_sync(cex_service.afetch_item)("711719417576")
+
+    assert item is None
+
+
+@patch("items.services.cex_service.httpx.AsyncClient.get", new_callable=AsyncMock)
+def test_afetch_item_invalid_cex_id(mock_get, cex_service):
+    item = async_to_sync(cex_service.afetch_item)("-1")
+
+    assert item is None
+    mock_get.assert_not_called()
+
+
+@patch("items.services.cex_service.time.time", return_value=100.25)
+def test_rate_limiter_shares_budget_between_limiters(mock_time):
+    # Separate limiters stand in for separate workers sharing the cache
+    import_limiter = RateLimiter(2)
+    update_limiter = RateLimiter(2)
+
+    assert import_limiter._try_acquire() == 0
+    assert update_limiter._try_acquire() == 0
+    assert import_limiter._try_acquire() == pytest.approx(0.75)
+
+    mock_time.return_value = 101.0
+    assert update_limiter._try_acquire() == 0
+
+
+@patch("items.services.cex_service.time.time", return_value=100.0)
+def test_rate_limiter_slower_than_once_a_second(mock_time):
+    rate_limiter = RateLimiter(0.5)
+
+    assert rate_limiter._try_acquire() == 0
+    mock_time.return_value = 101.0
+    assert rate_limiter._try_acquire() == pytest.approx(1.0)
+
+
+@patch("items.services.cex_service.django_cache.incr", side_effect=ConnectionError)
+def test_rate_limiter_allows_calls_without_cache(mock_incr):
+    assert RateLimiter(1)._try_acquire() == 0
+
+
+@patch("items.services.cex_service.requests.get")
+def test_fetch_item_waits_for_rate_limit(mock_get, settings):
+    settings.CEX_REQUESTS_PER_SECOND = 1
+    clock = {"now": 100.6}
+
+    def sleep(seconds):
+        clock["now"] += seconds
+
+    with (
+        patch("items.services.cex_service.time.time", lambda: clock["now"]),
+        patch("items.services.cex_service.time.sleep", side_effect=sleep) as mock_sleep,
+    ):
+        CexService().fetch_item("711719417576")
+        CexService().fetch_item("711719417576")
+
+    # The second fetch waits for the next window before calling CEX
+    mock_sleep.assert_called_once_with(pytest.approx(0.4))
+    assert mock_get.call_count == 2
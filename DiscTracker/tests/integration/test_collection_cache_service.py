@@ -0,0 +1,206 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from disctracker.db_routers import is_pinned_to_primary
+from items.services.collection_cache_service import CollectionCacheService
+from items.services.item_service import ItemService
+from items.services.price_history_service import PriceHistoryService
+from items.services.user_item_service import UserItemService
+from items.validators.item_validator import ItemDataValidator
+from items.models.db_models import Item, UserItem
+
+
+@pytest.fixture
+def collection_cache_service():
+    return CollectionCacheService()
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        username="testuser", password="testpass"
+    )
+
+
+@pytest.fixture
+def other_user():
+    return get_user_model().objects.create_user(
+        username="otheruser", password="testpass"
+    )
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+@pytest.fixture
+def item_service(collection_cache_service):
+    return ItemService(
+        validator=ItemDataValidator(),
+        user_item_service=UserItemService(),
+        price_history_service=PriceHistoryService(),
+        collection_cache_service=collection_cache_service,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_adding_and_removing_items_invalidates_collection(
+    collection_cache_service, user, existing_item
+):
+    user_item_service = UserItemService(
+        collection_cache_service=collection_cache_service
+    )
+    version = collection_cache_service.get_collection_version(user.id)
+
+    user_item_service.add_user_item(user, existing_item)
+    added_version = collection_cache_service.get_collection_version(user.id)
+    user_item_service.delete_user_item(user, existing_item)
+    removed_version = collection_cache_service.get_collection_version(user.id)
+
+    assert len({version, added_version, removed_version}) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_price_update_invalidates_owners_only(
+    collection_cache_service, item_service, user, other_user, existing_item
+):
+    UserItem.objects.create(user=user, item=existing_item)
+    owner_version = collection_cache_service.get_collection_version(user.id)
+    other_version = collection_cache_service.get_collection_version(other_user.id)
+
+    item_service.update_item(
+        {
+            "cex_id": existing_item.cex_id,
+            "title": existing_item.title,
+            "sell_price": 7.0,
+            "exchange_price": 5.0,
+            "cash_price": 3.0,
+        }
+    )
+
+    assert collection_cache_service.get_collection_version(user.id) != owner_version
+    assert (
+        collection_cache_service.get_collection_version(other_user.id) == other_version
+    )
+
+
+@pytest.mark.django_db
+def test_invalidate_all_collections(collection_cache_service, user, other_user):
+    versions = [
+        collection_cache_service.get_collection_version(user_id)
+        for user_id in (user.id, other_user.id)
+    ]
+
+    collection_cache_service.invalidate_all_collections()
+
+    assert all(
+        collection_cache_service.get_collection_version(user_id) != version
+        for user_id, version in zip((user.id, other_user.id), versions)
+    )
+
+
+def test_invalidation_pins_users_to_primary(collection_cache_service, settings):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+
+    collection_cache_service.invalidate_collection(1)
+
+    # A lagging replica must not be cached as the new version
+    assert is_pinned_to_primary(1)
+    assert not is_pinned_to_primary(2)
+
+    collection_cache_service.invalidate_all_collections()
+
+    assert is_pinned_to_primary(2)
+
+
+@pytest.mark.django_db
+def test_index_grid_is_cached_per_query(
+    client, collection_cache_service, user, existing_item, django_assert_num_queries
+):
+    UserItem.objects.create(user=user, item=existing_item)
+    client.force_login(user)
+
+    client.get(reverse("items:index"))
+
+    # Only the user lookup remains once the grid and session are cached
+    with django_assert_num_queries(1):
+        response = client.get(reverse("items:index"))
+
+    assert b"Halloween (18) 1978" in response.content
+
+    filtered_response = client.get(reverse("items:index"), {"title": "matrix"})
+    assert b"Halloween (18) 1978" not in filtered_response.content
+
+
+@pytest.mark.django_db
+def test_index_grid_rerenders_after_invalidation(
+    client, collection_cache_service, user, existing_item
+):
+    client.force_login(user)
+    assert b"Halloween (18) 1978" not in client.get(reverse("items:index")).content
+
+    UserItem.objects.create(user=user, item=existing_item)
+    collection_cache_service.invalidate_collection(user.id)
+
+    assert b"Halloween (18) 1978" in client.get(reverse("items:index")).content
+
+
+@pytest.mark.django_db
+def test_index_not_modified_with_matching_etag(
+    client, user, existing_item, django_assert_num_queries
+):
+    UserItem.objects.create(user=user, item=existing_item)
+    client.force_login(user)
+    # Picks up the CSRF cookie which is part of the ETag
+    client.get(reverse("items:index"))
+    etag = client.get(reverse("items:index"))["ETag"]
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse("items:index"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert "private" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_index_etag_changes_with_collection_and_query(
+    client, collection_cache_service, user, existing_item
+):
+    client.force_login(user)
+    client.get(reverse("items:index"))
+    etag = client.get(reverse("items:index"))["ETag"]
+
+    filtered_response = client.get(
+        reverse("items:index"), {"title": "halloween"}, HTTP_IF_NONE_MATCH=etag
+    )
+    assert filtered_response.status_code == 200
+
+    collection_cache_service.invalidate_collection(user.id)
+    response = client.get(reverse("items:index"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_index_with_messages_is_not_conditional(client, user):
+    client.force_login(user)
+    client.get(reverse("items:index"))
+    etag = client.get(reverse("items:index"))["ETag"]
+
+    # Deleting an item the user doesn't own redirects back with an error message
+    client.post(reverse("items:delete-item", args=["missing"]))
+    response = client.get(reverse("items:index"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
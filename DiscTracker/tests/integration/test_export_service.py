@@ -0,0 +1,213 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from django.urls import reverse
+from items.models.db_models import Item, PriceHistory, UserItem
+from items.services.export_service import EXPORT_COLUMNS, ExportService
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+
+
+@pytest.fixture
+def archive_service(tmp_path):
+    return PriceHistoryArchiveService(archive_dir=tmp_path / "archive")
+
+
+@pytest.fixture
+def export_service(archive_service):
+    return ExportService(archive_service=archive_service)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def owned_item(user):
+    item = Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 2, 1),
+    )
+    UserItem.objects.create(user=user, item=item)
+    PriceHistory.objects.create(
+        item=item,
+        sell_price=9.0,
+        exchange_price=6.0,
+        cash_price=4.0,
+        date_checked=date(2025, 1, 1),
+    )
+    PriceHistory.objects.create(
+        item=item,
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date(2025, 2, 1),
+    )
+    return item
+
+
+@pytest.fixture
+def other_item():
+    other_user = User.objects.create_user(username="otheruser", password="password")
+    item = Item.objects.create(
+        cex_id="111", title="Not Mine", sell_price=1, exchange_price=1, cash_price=1
+    )
+    UserItem.objects.create(user=other_user, item=item)
+    PriceHistory.objects.create(item=item, sell_price=1, exchange_price=1, cash_price=1)
+    return item
+
+
+@pytest.mark.django_db
+def test_export_collection_csv(export_service, user, owned_item, other_item):
+    content = "".join(export_service.export_collection(user, "csv"))
+
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows == [
+        EXPORT_COLUMNS,
+        [
+            "current",
+            "5060020626449",
+            "Halloween (18) 1978",
+            "2025-02-01",
+            "8.00",
+            "5.00",
+            "3.00",
+        ],
+    ]
+
+
+@pytest.mark.django_db
+def test_export_collection_ndjson_with_history(
+    export_service, user, owned_item, other_item
+):
+    content = "".join(
+        export_service.export_collection(user, "ndjson", include_history=True)
+    )
+
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [(row["record"], row["date"], row["sell_price"]) for row in rows] == [
+        ("current", "2025-02-01", "8.00"),
+        ("history", "2025-01-01", "9.00"),
+        ("history", "2025-02-01", "8.00"),
+    ]
+    assert {row["cex_id"] for row in rows} == {owned_item.cex_id}
+
+
+@pytest.mark.django_db
+def test_export_collection_includes_archived_history(
+    export_service, archive_service, user, owned_item, other_item
+):
+    second_item = Item.objects.create(
+        cex_id="5051892006759",
+        title="Alien (18) 1979",
+        sell_price=4.0,
+        exchange_price=3.0,
+        cash_price=2.0,
+    )
+    UserItem.objects.create(user=user, item=second_item)
+    for date_checked, sell_price in [
+        (date(2023, 1, 1), 6.0),
+        (date(2024, 1, 1), 5.0),
+        (date(2025, 1, 1), 4.0),
+    ]:
+        PriceHistory.objects.create(
+            item=second_item,
+            sell_price=sell_price,
+            exchange_price=3.0,
+            cash_price=2.0,
+            date_checked=date_checked,
+        )
+    assert archive_service.archive_price_history(date(2025, 1, 15)) == 3
+
+    content = "".join(
+        export_service.export_collection(user, "csv", include_history=True)
+    )
+
+    rows = list(csv.reader(io.StringIO(content)))[1:]
+    history = [(row[1], row[3], row[4]) for row in rows if row[0] == "history"]
+    # Each item's archived entries come just before its live ones
+    assert history == [
+        (owned_item.cex_id, "2025-01-01", "9.00"),
+        (owned_item.cex_id, "2025-02-01", "8.00"),
+        (second_item.cex_id, "2023-01-01", "6.00"),
+        (second_item.cex_id, "2024-01-01", "5.00"),
+        (second_item.cex_id, "2025-01-01", "4.00"),
+    ]
+    assert PriceHistory.objects.filter(item__useritem__user=user).count() == 2
+
+
+@pytest.mark.django_db
+def test_export_collection_streams_in_chunks(export_service, user):
+    items = Item.objects.bulk_create(
+        Item(
+            cex_id=f"{index}",
+            title=f"Film {index}",
+            sell_price=1,
+            exchange_price=1,
+            cash_price=1,
+        )
+        for index in range(1200)
+    )
+    UserItem.objects.bulk_create(UserItem(user=user, item=item) for item in items)
+
+    chunks = list(export_service.export_collection(user, "ndjson"))
+
+    # One chunk per 500 rows rather than the whole export at once
+    assert [chunk.count("\n") for chunk in chunks] == [500, 500, 200]
+
+
+@pytest.mark.django_db
+def test_export_collection_invalid_arguments(export_service, user):
+    with pytest.raises(ValueError):
+        export_service.export_collection(None)
+    with pytest.raises(ValueError):
+        export_service.export_collection(user, "xml")
+
+
+@pytest.mark.django_db
+def test_export_view(client, user, owned_item):
+    client.force_login(user)
+
+    response = client.get(reverse("items:export"), {"format": "csv", "history": "1"})
+
+    content = b"".join(response.streaming_content).decode()
+    assert response["Content-Type"] == "text/csv"
+    assert response["Content-Disposition"] == (
+        'attachment; filename="collection-history.csv"'
+    )
+    assert len(content.splitlines()) == 4
+
+
+@pytest.mark.django_db
+def test_export_view_invalid_format(client, user):
+    client.force_login(user)
+
+    response = client.get(reverse("items:export"), {"format": "xml"})
+
+    assert response.url == reverse("items:index")
+
+
+@pytest.mark.django_db
+def test_export_view_streams_asynchronously_under_asgi(user, owned_item):
+    async def export():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        response = await client.get(reverse("items:export"), {"format": "ndjson"})
+        chunks = [chunk async for chunk in response.streaming_content]
+        return response, chunks
+
+    response, chunks = async_to_sync(export)()
+
+    # A sync iterator would be read into memory in full before sending
+    assert response.is_async
+    assert json.loads(b"".join(chunks))["cex_id"] == owned_item.cex_id
@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from items.filters import ItemFilter
+from items.models.db_models import Item
+
+TITLES = [
+    "Blade Runner 2049",
+    "Blade Runner (Final Cut)",
+    "The Matrix",
+    "Halloween (18) 1978",
+    "Runaway Train",
+]
+
+
+@pytest.fixture
+def catalogue():
+    items = Item.objects.bulk_create(
+        Item(
+            cex_id=f"50600206264{index:02d}",
+            title=title,
+            sell_price=8.0,
+            exchange_price=5.0,
+            cash_price=3.0,
+        )
+        for index, title in enumerate(TITLES)
+    )
+
+    return items
+
+
+def filtered_titles(data):
+    return [item.title for item in ItemFilter(data, queryset=Item.objects.all()).qs]
+
+
+@pytest.mark.django_db
+def test_title_search_is_case_insensitive(catalogue):
+    assert sorted(filtered_titles({"title": "blade RUNNER"})) == [
+        "Blade Runner (Final Cut)",
+        "Blade Runner 2049",
+    ]
+
+
+@pytest.mark.django_db
+def test_title_search_without_typo_tolerance(catalogue):
+    assert filtered_titles({"title": "blade runer"}) == []
+
+
+@pytest.mark.django_db
+def test_fuzzy_title_search_tolerates_typos(catalogue):
+    titles = filtered_titles({"title": "blade runer 2049", "fuzzy_title": "true"})
+
+    # Closest match is ranked first
+    assert titles[0] == "Blade Runner 2049"
+    assert "The Matrix" not in titles
+
+
+@pytest.mark.django_db
+def test_fuzzy_title_search_respects_ordering(catalogue):
+    titles = filtered_titles(
+        {"title": "blade runner", "fuzzy_title": "true", "ordering": "title"}
+    )
+
+    assert titles == sorted(titles)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data", [{"title": "runner"}, {"title": "runer", "fuzzy_title": "true"}]
+)
+def test_title_search_uses_trigram_index(catalogue, data):
+    with connection.cursor() as cursor:
+        # A handful of rows is cheaper to scan sequentially so force the planner
+        # to show which index it would use on a real sized catalogue
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    plan = ItemFilter(data, queryset=Item.objects.all()).qs.explain()
+
+    assert "items_item_title_trgm" in plan
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from items.filters import NULLABLE_ORDERING_FIELDS, ItemFilter
+from items.models.db_models import Item, UserItem
+from items.pagination import KeysetPaginator
+from items.services.item_service import ItemService
+from items.services.price_history_service import PriceHistoryService
+from items.services.user_item_service import UserItemService
+from items.validators.item_validator import ItemDataValidator
+
+ORDERING_INDEXES = {
+    "title": "items_item_title_id_idx",
+    "sell_price": "items_item_sell_id_idx",
+    "exchange_price": "items_item_exchange_id_idx",
+    "cash_price": "items_item_cash_id_idx",
+    "last_checked": "items_item_checked_id_idx",
+}
+
+
+@pytest.fixture
+def collector():
+    users = [
+        User.objects.create_user(username=f"user{index}", password="password")
+        for index in range(2)
+    ]
+
+    items = Item.objects.bulk_create(
+        Item(
+            cex_id=f"5060020{index:06d}",
+            title=f"Film {index * 7919 % 5000}",
+            sell_price=index * 37 % 3000 / 10,
+            exchange_price=index * 53 % 2000 / 10,
+            cash_price=index * 71 % 1000 / 10,
+            last_checked=date(2025, 1, 1) + timedelta(days=index % 365),
+        )
+        for index in range(2000)
+    )
+    UserItem.objects.bulk_create(
+        UserItem(user=users[index % 2], item=item) for index, item in enumerate(items)
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE items_item")
+        cursor.execute("ANALYZE items_useritem")
+
+    return users[0]
+
+
+def collection_page_plan(user, data, cursor=None):
+    item_service = ItemService(
+        validator=ItemDataValidator(),
+        user_item_service=UserItemService(),
+        price_history_service=PriceHistoryService(),
+    )
+    item_filter = ItemFilter(data, queryset=item_service.get_user_items(user))
+    paginator = KeysetPaginator(
+        item_filter.qs,
+        9,
+        ordering=item_filter.get_ordering(),
+        nullable_fields=NULLABLE_ORDERING_FIELDS,
+    )
+
+    queryset = item_filter.qs.order_by(*paginator._order_by(False))
+    if cursor:
+        position = paginator._decode_cursor(cursor)
+        queryset = queryset.filter(paginator._seek(position["values"], False))
+    return paginator, queryset[:10].explain()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("field_name", ORDERING_INDEXES)
+@pytest.mark.parametrize("descending", [False, True])
+def test_collection_ordering_uses_index(collector, field_name, descending):
+    ordering = f"-{field_name}" if descending else field_name
+
+    _, plan = collection_page_plan(collector, {"ordering": ordering})
+
+    assert ORDERING_INDEXES[field_name] in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_default_ordering_uses_title_index(collector):
+    _, plan = collection_page_plan(collector, {})
+
+    assert "items_item_title_id_idx" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_price_range_and_ordering_use_index(collector):
+    _, plan = collection_page_plan(
+        collector,
+        {"ordering": "-sell_price", "sell_price_min": "50", "sell_price_max": "150"},
+    )
+
+    assert "items_item_sell_id_idx" in plan
+    assert "Index Cond" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_later_page_seeks_into_index(collector):
+    paginator, _ = collection_page_plan(collector, {"ordering": "sell_price"})
+    next_cursor = paginator.get_page().next_cursor
+
+    _, plan = collection_page_plan(collector, {"ordering": "sell_price"}, next_cursor)
+
+    assert "Index Cond: (sell_price >=" in plan
+    assert "Sort" not in plan
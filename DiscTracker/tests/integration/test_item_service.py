@@ -1,6 +1,7 @@
-from datetime import date
+from datetime import date, timedelta
 from django.db import DatabaseError
-from unittest.mock import patch
+from django.urls import reverse
+from unittest.mock import AsyncMock, patch
 from django.contrib.auth import get_user_model
 
 import pytest
@@ -9,6 +10,7 @@ from items.services.user_item_service import UserItemService
 from items.services.price_history_service import PriceHistoryService
 from items.validators.item_validator import ItemDataValidator
 from items.models.db_models import Item, UserItem, PriceHistory
+from items.models.pydantic_models import ItemData
 
 
 @pytest.fixture
@@ -51,6 +53,7 @@ def existing_item():
         exchange_price=5.0,
         cash_price=3.0,
         last_checked=date(2025, 1, 1),
+        last_refreshed=date(2025, 1, 1),
     )
 
 
@@ -629,3 +632,85 @@ def test_create_or_update_item_and_price_history_unknown_exception(
 
     assert item_service.get_item_by_cex_id(valid_fetched_item_data["cex_id"]) is None
     assert PriceHistory.objects.count() == 0
+
+
+@pytest.mark.django_db
+@patch("items.views.CexService.afetch_item", new_callable=AsyncMock)
+def test_add_item_view_creates_item(
+    mock_afetch_item, client, user, existing_item_fetched_data
+):
+    mock_afetch_item.return_value = ItemData(**existing_item_fetched_data)
+    client.force_login(user)
+
+    response = client.post(reverse("items:add-item"), {"cex_id": "5060020626449"})
+
+    assert response.status_code == 302
+    item = Item.objects.get(cex_id="5060020626449")
+    assert UserItem.objects.filter(user=user, item=item).exists()
+    assert PriceHistory.objects.filter(item=item).count() == 1
+
+
+@pytest.mark.django_db
+@patch("items.tasks.refresh_item_task.delay")
+@patch("items.views.CexService.afetch_item", new_callable=AsyncMock)
+def test_add_item_view_links_fresh_item_without_cex(
+    mock_afetch_item, mock_delay, client, user, existing_item
+):
+    existing_item.last_refreshed = date.today()
+    existing_item.save()
+    client.force_login(user)
+
+    client.post(reverse("items:add-item"), {"cex_id": existing_item.cex_id})
+    response = client.post(
+        reverse("items:add-item"), {"cex_id": existing_item.cex_id}, follow=True
+    )
+
+    assert UserItem.objects.filter(user=user, item=existing_item).count() == 1
+    assert "You already own" in response.content.decode()
+    mock_afetch_item.assert_not_called()
+    mock_delay.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("items.tasks.refresh_item_task.delay")
+@patch("items.views.CexService.afetch_item", new_callable=AsyncMock)
+def test_add_item_view_queues_refresh_of_stale_item(
+    mock_afetch_item, mock_delay, client, user, existing_item
+):
+    other_user = get_user_model().objects.create_user(
+        username="otheruser", password="testpass"
+    )
+    client.force_login(user)
+    client.post(reverse("items:add-item"), {"cex_id": existing_item.cex_id})
+    client.force_login(other_user)
+    client.post(reverse("items:add-item"), {"cex_id": existing_item.cex_id})
+
+    assert UserItem.objects.filter(item=existing_item).count() == 2
+    mock_afetch_item.assert_not_called()
+    # The second add finds the refresh already queued
+    mock_delay.assert_called_once_with(existing_item.cex_id)
+
+
+@pytest.mark.django_db
+def test_is_item_fresh(item_service, existing_item, settings):
+    settings.ITEM_FRESHNESS_DAYS = 2
+
+    existing_item.last_refreshed = date.today() - timedelta(days=2)
+    assert item_service.is_item_fresh(existing_item) is True
+
+    existing_item.last_refreshed = date.today() - timedelta(days=3)
+    assert item_service.is_item_fresh(existing_item) is False
+
+
+@pytest.mark.django_db
+@patch("items.views.CexService.afetch_item", new_callable=AsyncMock)
+def test_add_item_view_unknown_item(mock_afetch_item, client, user):
+    mock_afetch_item.return_value = None
+    client.force_login(user)
+
+    response = client.post(
+        reverse("items:add-item"), {"cex_id": "5060020626449"}, follow=True
+    )
+
+    assert "does not exist" in response.content.decode()
+    assert not UserItem.objects.exists()
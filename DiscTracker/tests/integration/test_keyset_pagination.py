@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from items.filters import NULLABLE_ORDERING_FIELDS, ItemFilter
+from items.models.db_models import Item, ItemPriceStats, UserItem
+from items.pagination import KeysetPaginator
+from items.services.price_stats_service import PRICE_FIELDS
+
+ORDERINGS = [
+    choice for choice, _ in ItemFilter.base_filters["ordering"].extra["choices"]
+]
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def collection(user):
+    items = []
+    for index in range(23):
+        # Repeated titles and prices so the id tie-break matters
+        item = Item.objects.create(
+            cex_id=f"50600206264{index:02d}",
+            title=f"Film {index % 5}",
+            sell_price=index % 4,
+            exchange_price=index % 3,
+            cash_price=index % 2,
+            last_checked=date(2025, 1, 1) + timedelta(days=index % 6),
+        )
+        UserItem.objects.create(user=user, item=item)
+        if index % 3:
+            ItemPriceStats.objects.create(
+                item=item,
+                entry_count=1,
+                **{
+                    f"{price_field}_{stat}": getattr(item, price_field)
+                    for price_field in PRICE_FIELDS
+                    for stat in ("min", "max", "sum", "avg")
+                },
+                sell_price_change_30d=index % 4 - 2,
+            )
+        items.append(item)
+    return items
+
+
+def get_paginator(user, ordering=None, **data):
+    if ordering:
+        data["ordering"] = ordering
+    item_filter = ItemFilter(
+        data,
+        queryset=Item.objects.filter(useritem__user=user).select_related("price_stats"),
+    )
+    return item_filter, KeysetPaginator(
+        item_filter.qs,
+        5,
+        ordering=item_filter.get_ordering(),
+        nullable_fields=NULLABLE_ORDERING_FIELDS,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", [None, *ORDERINGS])
+def test_pages_match_offset_ordering(user, collection, ordering):
+    item_filter, paginator = get_paginator(user, ordering)
+    expected = [
+        item.id for item in item_filter.qs.order_by(*paginator._order_by(False))
+    ]
+
+    pages = [paginator.get_page()]
+    while pages[-1].has_next:
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+
+    assert [item.id for page in pages for item in page.object_list] == expected
+    assert len(pages) == 5
+
+    # Walking back from the last page returns the same pages
+    page = pages[-1]
+    for expected_page in reversed(pages[:-1]):
+        page = paginator.get_page(page.previous_cursor)
+        assert [item.id for item in page.object_list] == [
+            item.id for item in expected_page.object_list
+        ]
+    assert not page.has_previous
+
+
+@pytest.mark.django_db
+def test_fuzzy_title_pages_reach_the_end(user):
+    # Titles of different lengths give many distinct and some tied similarities
+    for index in range(34):
+        item = Item.objects.create(
+            cex_id=f"70000000000{index:02d}",
+            title=f"Blade Runner {'Final Cut ' * (index % 4)}{index}",
+            sell_price=1,
+            exchange_price=1,
+            cash_price=1,
+            last_checked=date(2025, 1, 1),
+        )
+        UserItem.objects.create(user=user, item=item)
+    _, paginator = get_paginator(user, title="blade runer", fuzzy_title="true")
+
+    pages = [paginator.get_page()]
+    while pages[-1].has_next and len(pages) <= 10:
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+
+    item_ids = [item.id for page in pages for item in page.object_list]
+    assert len(pages) == 7
+    assert len(item_ids) == len(set(item_ids)) == 34
+
+
+@pytest.mark.django_db
+def test_first_page_has_no_previous(user, collection):
+    _, paginator = get_paginator(user)
+
+    page = paginator.get_page()
+
+    assert not page.has_previous
+    assert page.previous_cursor is None
+    assert page.has_next
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "W10"])
+def test_invalid_cursor_shows_first_page(user, collection, cursor):
+    _, paginator = get_paginator(user)
+
+    page = paginator.get_page(cursor)
+
+    assert page.object_list == paginator.get_page().object_list
+
+
+@pytest.mark.django_db
+def test_cursor_from_other_ordering_is_ignored(user, collection):
+    _, title_paginator = get_paginator(user, "title")
+    _, price_paginator = get_paginator(user, "-sell_price")
+
+    cursor = title_paginator.get_page().next_cursor
+
+    assert not price_paginator.get_page(cursor).has_previous
+
+
+@pytest.mark.django_db
+def test_page_query_has_no_offset_or_count(user, collection, django_assert_num_queries):
+    _, paginator = get_paginator(user, "-price_stats__sell_price_change_30d")
+    cursor = paginator.get_page().next_cursor
+
+    with django_assert_num_queries(1) as context:
+        paginator.get_page(cursor)
+
+    sql = context.captured_queries[0]["sql"]
+    assert "OFFSET" not in sql
+    assert "COUNT" not in sql
+
+
+@pytest.mark.django_db
+def test_approximate_count(user, collection):
+    item_filter, _ = get_paginator(user)
+    paginator = KeysetPaginator(
+        item_filter.qs, 5, ordering=["title", "id"], approximate_count=True
+    )
+
+    assert paginator.get_page().approximate_count > 0
+
+
+@pytest.mark.django_db
+def test_index_follows_cursor(client, user, collection):
+    client.force_login(user)
+
+    first_page = client.get(reverse("items:index"), {"ordering": "-sell_price"})
+    second_page = client.get(
+        reverse("items:index"),
+        {
+            "ordering": "-sell_price",
+            "cursor": first_page.context["page_obj"].next_cursor,
+        },
+    )
+
+    first_ids = {item.id for item in first_page.context["items_list"]}
+    second_ids = {item.id for item in second_page.context["items_list"]}
+    assert len(second_ids) == 9
+    assert not first_ids & second_ids
@@ -0,0 +1,496 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from disctracker.db_routers import is_pinned_to_primary
+from items.services.price_chart_service import PriceChartService, lttb_indices
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+from items.services.price_history_service import PriceHistoryService
+from items.services.price_series_service import PriceSeriesService
+from items.models.db_models import Item, PriceHistory, UserItem
+
+
+@pytest.fixture
+def price_chart_service():
+    return PriceChartService()
+
+
+@pytest.fixture
+def existing_item():
+    item = Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+    PriceHistory.objects.create(
+        item=item,
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date(2025, 1, 1),
+    )
+    return item
+
+
+@pytest.fixture
+def logged_in_client(client):
+    user = User.objects.create_user(username="testuser", password="password")
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def compared_items(logged_in_client):
+    user = User.objects.get(username="testuser")
+    other_user = User.objects.create_user(username="otheruser", password="password")
+
+    items = []
+    for cex_id, title, history in [
+        ("111", "Alien", [(date(2025, 1, 1), 5.0), (date(2025, 1, 3), 4.0)]),
+        ("222", "Aliens", [(date(2025, 1, 2), 7.0), (date(2025, 1, 5), 6.0)]),
+        ("333", "Alien 3", [(date(2025, 1, 4), 9.0)]),
+    ]:
+        item = Item.objects.create(
+            cex_id=cex_id,
+            title=title,
+            sell_price=history[-1][1],
+            exchange_price=1.0,
+            cash_price=1.0,
+        )
+        for date_checked, sell_price in history:
+            PriceHistory.objects.create(
+                item=item,
+                sell_price=sell_price,
+                exchange_price=1.0,
+                cash_price=1.0,
+                date_checked=date_checked,
+            )
+        items.append(item)
+
+    UserItem.objects.create(user=user, item=items[0])
+    UserItem.objects.create(user=user, item=items[1])
+    UserItem.objects.create(user=other_user, item=items[2])
+    return user, items
+
+
+def chart_url(item):
+    return reverse("items:item-price-chart", args=[item.cex_id])
+
+
+def test_lttb_indices_keeps_ends_and_spikes():
+    x = np.arange(1000)
+    ys = np.ones((3, 1000))
+    ys[0, 400] = 50.0  # Sell price spike
+    ys[2, 700] = 0.0  # Cash price dip
+
+    indices = lttb_indices(x, ys, 20)
+
+    assert indices.size == 20
+    assert indices[0] == 0
+    assert indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+    assert 400 in indices
+    assert 700 in indices
+
+
+def test_lttb_indices_below_threshold():
+    indices = lttb_indices(np.arange(10), np.ones((3, 10)), 20)
+
+    assert indices.tolist() == list(range(10))
+
+
+@pytest.mark.django_db
+def test_build_chart_data_uses_one_query(
+    price_chart_service, existing_item, django_assert_num_queries, settings
+):
+    settings.PRICE_SERIES_STORE_ENABLED = False
+    PriceHistory.objects.create(
+        item=existing_item,
+        sell_price=7.5,
+        exchange_price=4.25,
+        cash_price=2.0,
+        date_checked=date(2025, 1, 8),
+    )
+
+    with django_assert_num_queries(1):
+        data = price_chart_service.build_chart_data(existing_item)
+
+    assert data["labels"] == ["2025-01-01", "2025-01-08"]
+    assert [dataset["data"] for dataset in data["datasets"]] == [
+        [8.0, 7.5],
+        [5.0, 4.25],
+        [3.0, 2.0],
+    ]
+
+
+@pytest.mark.django_db
+def test_build_chart_data_downsamples(price_chart_service, existing_item):
+    PriceHistory.objects.bulk_create(
+        PriceHistory(
+            item=existing_item,
+            sell_price=8.0 + day % 5,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date(2025, 1, 2) + timedelta(days=day),
+        )
+        for day in range(500)
+    )
+
+    data = price_chart_service.build_chart_data(existing_item, max_points=50)
+
+    assert len(data["labels"]) == 50
+    assert data["labels"][0] == "2025-01-01"
+    assert data["labels"][-1] == "2026-05-16"
+    assert all(len(dataset["data"]) == 50 for dataset in data["datasets"])
+
+
+def test_parse_chart_params_presets(price_chart_service):
+    chart_params = price_chart_service.parse_chart_params(
+        {"range": "30d", "points": "300"}
+    )
+
+    assert chart_params == {
+        "include_archived": False,
+        "max_points": 300,
+        "start": date.today() - timedelta(days=30),
+        "end": None,
+    }
+
+
+def test_parse_chart_params_dates_override_preset(price_chart_service):
+    chart_params = price_chart_service.parse_chart_params(
+        {"range": "1y", "from": "2024-01-01", "to": "2024-06-30"}
+    )
+
+    assert chart_params["start"] == date(2024, 1, 1)
+    assert chart_params["end"] == date(2024, 6, 30)
+
+
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        {"range": "5y"},
+        {"from": "01/01/2024"},
+        {"from": "2024-06-30", "to": "2024-01-01"},
+        {"points": "-1"},
+    ],
+)
+def test_parse_chart_params_invalid(price_chart_service, query_params):
+    with pytest.raises(ValueError):
+        price_chart_service.parse_chart_params(query_params)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("series_store_enabled", [False, True])
+def test_build_chart_data_date_range(
+    price_chart_service, existing_item, settings, series_store_enabled
+):
+    settings.PRICE_SERIES_STORE_ENABLED = series_store_enabled
+    for date_checked, sell_price in [
+        (date(2025, 2, 1), 7.0),
+        (date(2025, 3, 1), 6.0),
+        (date(2026, 1, 1), 5.0),
+    ]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date_checked,
+        )
+    PriceSeriesService().rebuild_from_price_history(existing_item)
+
+    data = price_chart_service.build_chart_data(
+        existing_item, start=date(2025, 1, 15), end=date(2025, 12, 31)
+    )
+
+    # Opens with the price that was current on the first day of the window
+    assert data["labels"] == ["2025-01-15", "2025-02-01", "2025-03-01"]
+    assert data["datasets"][0]["data"] == [8.0, 7.0, 6.0]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("series_store_enabled", [False, True])
+def test_build_chart_data_opens_with_archived_price(
+    existing_item, settings, tmp_path, series_store_enabled
+):
+    settings.PRICE_SERIES_STORE_ENABLED = series_store_enabled
+    archive_service = PriceHistoryArchiveService(archive_dir=tmp_path / "archive")
+    price_chart_service = PriceChartService(archive_service=archive_service)
+    for date_checked, sell_price in [
+        (date(2025, 2, 1), 7.0),
+        (date(2025, 3, 1), 6.0),
+        (date(2026, 1, 1), 5.0),
+    ]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date_checked,
+        )
+    assert archive_service.archive_price_history(date(2025, 2, 15)) == 2
+    PriceSeriesService().rebuild_from_price_history(existing_item)
+
+    data = price_chart_service.build_chart_data(
+        existing_item, start=date(2025, 2, 15), end=date(2025, 12, 31)
+    )
+
+    # The change before the window is only in the archive
+    assert data["labels"] == ["2025-02-15", "2025-03-01"]
+    assert data["datasets"][0]["data"] == [7.0, 6.0]
+
+    data = price_chart_service.build_chart_data(
+        existing_item,
+        include_archived=True,
+        start=date(2025, 1, 15),
+        end=date(2025, 12, 31),
+    )
+
+    assert data["labels"] == ["2025-01-15", "2025-02-01", "2025-03-01"]
+    assert data["datasets"][0]["data"] == [8.0, 7.0, 6.0]
+
+
+@pytest.mark.django_db
+def test_build_chart_data_without_history(price_chart_service, existing_item):
+    existing_item.price_history.all().delete()
+
+    assert price_chart_service.build_chart_data(existing_item) is None
+
+
+def test_serialise_chart_data(price_chart_service):
+    body, last_modified = price_chart_service.serialise_chart_data(
+        {"labels": ["2025-01-01"], "datasets": [{"data": [8.0]}]}
+    )
+
+    assert body == b'{"labels":["2025-01-01"],"datasets":[{"data":[8.0]}]}'
+    assert last_modified.isoformat() == "2025-01-01T00:00:00+00:00"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_price_history_entry_invalidates_chart(price_chart_service, existing_item):
+    version = price_chart_service.get_history_version(existing_item.cex_id)
+
+    PriceHistoryService(
+        price_chart_service=price_chart_service
+    ).create_price_history_entry(existing_item)
+
+    assert price_chart_service.get_history_version(existing_item.cex_id) != version
+
+
+@pytest.mark.django_db
+def test_invalidation_waits_for_commit(
+    price_chart_service, existing_item, django_capture_on_commit_callbacks, settings
+):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+    version = price_chart_service.get_history_version(existing_item.cex_id)
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        price_chart_service.invalidate_history_on_commit([existing_item.cex_id])
+
+    assert len(callbacks) == 1
+    assert price_chart_service.get_history_version(existing_item.cex_id) == version
+    assert not is_pinned_to_primary(1)
+
+    callbacks[0]()
+
+    assert price_chart_service.get_history_version(existing_item.cex_id) != version
+    # Any user can open the chart, so none may cache it from a lagging replica
+    assert is_pinned_to_primary(1)
+
+
+@pytest.mark.django_db
+def test_chart_is_served_from_cache(
+    logged_in_client, existing_item, django_assert_num_queries
+):
+    first_response = logged_in_client.get(chart_url(existing_item))
+
+    # Only the user lookup remains once the chart and session are cached
+    with django_assert_num_queries(1):
+        second_response = logged_in_client.get(chart_url(existing_item))
+
+    assert first_response.status_code == 200
+    assert second_response.content == first_response.content
+    assert second_response["ETag"] == first_response["ETag"]
+    assert second_response["Last-Modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+@pytest.mark.django_db
+def test_chart_not_modified_with_matching_etag(logged_in_client, existing_item):
+    etag = logged_in_client.get(chart_url(existing_item))["ETag"]
+
+    response = logged_in_client.get(chart_url(existing_item), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_chart_etag_changes_after_invalidation(
+    price_chart_service, logged_in_client, existing_item
+):
+    etag = logged_in_client.get(chart_url(existing_item))["ETag"]
+
+    price_chart_service.invalidate_history(existing_item.cex_id)
+    response = logged_in_client.get(chart_url(existing_item), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query_params", [{"points": "2"}, {"from": "yesterday"}])
+def test_chart_rejects_invalid_params(logged_in_client, existing_item, query_params):
+    response = logged_in_client.get(chart_url(existing_item), query_params)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_chart_etag_depends_on_query(logged_in_client, existing_item):
+    etag = logged_in_client.get(chart_url(existing_item))["ETag"]
+
+    response = logged_in_client.get(
+        chart_url(existing_item), {"include_archived": "1"}, HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_build_comparison_data_aligns_series(
+    price_chart_service, compared_items, django_assert_num_queries
+):
+    user, _ = compared_items
+
+    with django_assert_num_queries(1):
+        data = price_chart_service.build_comparison_data(user, ["222", "111", "333"])
+
+    assert data["labels"] == [
+        "2025-01-01",
+        "2025-01-02",
+        "2025-01-03",
+        "2025-01-05",
+    ]
+    # Item 333 belongs to someone else so it is left out
+    assert [dataset["label"] for dataset in data["datasets"]] == ["Aliens", "Alien"]
+    assert data["datasets"][0]["data"] == [None, 7.0, 7.0, 6.0]
+    assert data["datasets"][1]["data"] == [5.0, 5.0, 4.0, 4.0]
+
+
+@pytest.mark.django_db
+def test_build_comparison_data_window(price_chart_service, compared_items):
+    user, _ = compared_items
+
+    data = price_chart_service.build_comparison_data(
+        user, ["111", "222"], start=date(2025, 1, 4)
+    )
+
+    assert data["labels"] == ["2025-01-04", "2025-01-05"]
+    assert data["datasets"][0]["data"] == [4.0, 4.0]
+    assert data["datasets"][1]["data"] == [7.0, 6.0]
+
+
+@pytest.mark.django_db
+def test_build_comparison_data_not_owned(price_chart_service, compared_items):
+    user, _ = compared_items
+
+    assert price_chart_service.build_comparison_data(user, ["333"]) is None
+
+
+@pytest.mark.django_db
+def test_compare_items_chart(logged_in_client, compared_items):
+    response = logged_in_client.get(
+        reverse("items:compare-chart"),
+        {"cex_id": ["111", "222"], "price": "cash"},
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["datasets"]) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        {},
+        {"cex_id": [str(index) for index in range(11)]},
+        {"cex_id": "111", "price": "trade"},
+        {"cex_id": "111", "range": "5y"},
+    ],
+)
+def test_compare_items_chart_invalid(logged_in_client, compared_items, query_params):
+    response = logged_in_client.get(reverse("items:compare-chart"), query_params)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_compare_items_page(logged_in_client, compared_items):
+    response = logged_in_client.get(reverse("items:compare"))
+
+    assert response.status_code == 200
+    assert b"Aliens" in response.content
+    assert b"Alien 3" not in response.content
+
+
+@pytest.mark.django_db
+def test_build_chart_data_window_opens_on_change(price_chart_service, existing_item):
+    PriceHistory.objects.create(
+        item=existing_item,
+        sell_price=7.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date(2025, 2, 1),
+    )
+
+    data = price_chart_service.build_chart_data(existing_item, start=date(2025, 2, 1))
+
+    # A change on the first day already opens the window
+    assert data["labels"] == ["2025-02-01"]
+    assert data["datasets"][0]["data"] == [7.0]
+
+
+@pytest.mark.django_db
+def test_detail_embeds_initial_chart(
+    logged_in_client, existing_item, django_assert_num_queries
+):
+    UserItem.objects.create(
+        user=User.objects.get(username="testuser"), item=existing_item
+    )
+    PriceHistory.objects.create(
+        item=existing_item,
+        sell_price=7.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date.today(),
+    )
+    url = reverse("items:detail", args=[existing_item.cex_id])
+
+    # User, the item with its stats and the chart window
+    with django_assert_num_queries(3):
+        response = logged_in_client.get(url)
+
+    assert response.status_code == 200
+    assert response.context["chart_data"]["datasets"][0]["data"] == [8.0, 7.0]
+    assert 'id="initial-chart-data"' in response.content.decode()
+    assert 'hx-trigger="load"' not in response.content.decode()
+
+    with django_assert_num_queries(2):
+        logged_in_client.get(url)
+
+
+@pytest.mark.django_db
+def test_detail_requires_ownership(logged_in_client, existing_item):
+    response = logged_in_client.get(
+        reverse("items:detail", args=[existing_item.cex_id])
+    )
+
+    assert response.status_code == 302
+    assert response.url == reverse("items:index")
@@ -0,0 +1,193 @@
+import json
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from django.urls import reverse
+from items.models.db_models import Item, PriceHistory, UserItem
+from items.services.price_event_service import PriceEventService
+from items.services.price_stats_service import PriceStatsService
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.channels = []
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channels.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        if not self.messages:
+            raise redis.ConnectionError("Connection closed")
+        return self.messages.pop(0)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeAsyncRedis:
+    def __init__(self, messages):
+        self.fake_pubsub = FakePubSub(messages)
+        self.closed = False
+
+    def pubsub(self):
+        return self.fake_pubsub
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def redis_client():
+    return MagicMock()
+
+
+@pytest.fixture
+def price_event_service(redis_client):
+    return PriceEventService(redis_client=redis_client)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def owned_item(user):
+    item = Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 2, 1),
+    )
+    UserItem.objects.create(user=user, item=item)
+    PriceHistory.objects.create(
+        item=item,
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date(2025, 2, 1),
+    )
+    PriceStatsService().rebuild_price_stats()
+    return item
+
+
+@pytest.mark.django_db
+def test_publish_price_change(price_event_service, redis_client, user, owned_item):
+    other_user = User.objects.create_user(username="otheruser", password="password")
+    UserItem.objects.create(user=other_user, item=owned_item)
+
+    price_event_service.publish_price_change(owned_item.id)
+
+    pipeline = redis_client.pipeline.return_value.__enter__.return_value
+    channels = [call.args[0] for call in pipeline.publish.call_args_list]
+    message = json.loads(pipeline.publish.call_args.args[1])
+
+    # Every owner is sent the change on their own channel
+    assert sorted(channels) == sorted(
+        [f"price_events:{user.id}", f"price_events:{other_user.id}"]
+    )
+    pipeline.execute.assert_called_once()
+    assert message["cex_id"] == owned_item.cex_id
+    assert message["sell_price"] == "8.00"
+    assert message["last_checked"] == "2025-02-01"
+    assert message["sell_price_min"] == "8.00"
+
+
+@pytest.mark.django_db
+def test_publish_price_change_without_owners(price_event_service, redis_client):
+    item = Item.objects.create(
+        cex_id="111", title="Nobody's", sell_price=1, exchange_price=1, cash_price=1
+    )
+
+    price_event_service.publish_price_change(item.id)
+
+    redis_client.pipeline.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_publish_price_change_redis_error(
+    price_event_service, redis_client, owned_item
+):
+    redis_client.pipeline.side_effect = redis.ConnectionError
+
+    # A missed update must not fail the refresh that already committed
+    price_event_service.publish_price_change(owned_item.id)
+
+
+@pytest.mark.django_db
+def test_publish_price_change_on_commit(
+    price_event_service, redis_client, owned_item, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        price_event_service.publish_price_change_on_commit(owned_item)
+
+    redis_client.pipeline.assert_not_called()
+    callbacks[0]()
+    redis_client.pipeline.assert_called_once()
+
+
+def test_stream_price_events(price_event_service):
+    fake_redis = FakeAsyncRedis(
+        [None, {"type": "message", "data": b'{"cex_id": "111"}'}]
+    )
+
+    async def read_stream():
+        return [
+            chunk
+            async for chunk in price_event_service.stream_price_events(
+                7, redis_client=fake_redis
+            )
+        ]
+
+    chunks = async_to_sync(read_stream)()
+
+    assert fake_redis.fake_pubsub.channels == ["price_events:7"]
+    assert chunks == [
+        "retry: 5000\n\n",
+        ": keepalive\n\n",
+        'event: price-change\ndata: {"cex_id": "111"}\n\n',
+    ]
+    # The stream ends when Redis goes away and the browser reconnects
+    assert fake_redis.fake_pubsub.closed
+    assert fake_redis.closed
+
+
+@pytest.mark.django_db
+def test_price_events_view_under_wsgi(client, user):
+    client.force_login(user)
+
+    response = client.get(reverse("items:price-events"))
+
+    # Tells the browser to stop reconnecting rather than tie up a worker
+    assert response.status_code == 204
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("items.views.PriceEventService.stream_price_events")
+def test_price_events_view_under_asgi(mock_stream, user):
+    async def stream(user_id):
+        yield f"data: {user_id}\n\n"
+
+    mock_stream.side_effect = stream
+
+    async def open_stream():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        response = await client.get(reverse("items:price-events"))
+        chunks = [chunk async for chunk in response.streaming_content]
+        return response, chunks
+
+    response, chunks = async_to_sync(open_stream)()
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert response["X-Accel-Buffering"] == "no"
+    assert chunks == [f"data: {user.id}\n\n".encode()]
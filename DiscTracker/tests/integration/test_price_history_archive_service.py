@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+from items.models.db_models import Item, PriceHistory
+
+
+@pytest.fixture
+def archive_service(tmp_path):
+    return PriceHistoryArchiveService(archive_dir=tmp_path / "archive")
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+@pytest.fixture
+def price_history(existing_item):
+    entries = [
+        (date(2022, 6, 1), 10.5),
+        (date(2023, 3, 1), 9.0),
+        (date(2023, 9, 1), 8.75),
+        (date(2025, 1, 1), 8.0),
+    ]
+    return [
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date_checked,
+        )
+        for date_checked, sell_price in entries
+    ]
+
+
+@pytest.mark.django_db
+def test_archive_price_history_moves_old_entries(
+    archive_service, existing_item, price_history
+):
+    archived_count = archive_service.archive_price_history(
+        date(2024, 1, 1), batch_size=2
+    )
+
+    assert archived_count == 3
+    assert PriceHistory.objects.count() == 1
+    assert list(archive_service.archive_dir.glob("year=*/*.parquet"))
+
+    archived = archive_service.get_archived_price_history(existing_item)
+    assert [row[0] for row in archived] == [
+        date(2022, 6, 1),
+        date(2023, 3, 1),
+        date(2023, 9, 1),
+    ]
+    assert archived[0][1:] == (Decimal("10.50"), Decimal("5.00"), Decimal("3.00"))
+
+
+@pytest.mark.django_db
+def test_archive_price_history_keeps_latest_entry(archive_service, existing_item):
+    PriceHistory.objects.create(
+        item=existing_item,
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date(2020, 1, 1),
+    )
+
+    archived_count = archive_service.archive_price_history(date(2024, 1, 1))
+
+    assert archived_count == 0
+    assert PriceHistory.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_archive_price_history_keeps_30_day_baseline(archive_service, existing_item):
+    for days_ago, sell_price in [(900, 12.0), (800, 10.0), (20, 8.0)]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date.today() - timedelta(days=days_ago),
+        )
+
+    archived_count = archive_service.archive_price_history(
+        date.today() - timedelta(days=730)
+    )
+
+    # The change from 800 days ago is still the price 30 days ago
+    assert archived_count == 1
+    assert list(
+        PriceHistory.objects.order_by("date_checked").values_list(
+            "sell_price", flat=True
+        )
+    ) == [Decimal("10.00"), Decimal("8.00")]
+
+
+@pytest.mark.django_db
+def test_get_archived_price_history_date_range(
+    archive_service, existing_item, price_history
+):
+    archive_service.archive_price_history(date(2024, 1, 1))
+
+    archived = archive_service.get_archived_price_history(
+        existing_item, start=date(2023, 1, 1), end=date(2023, 6, 30)
+    )
+
+    assert [row[0] for row in archived] == [date(2023, 3, 1)]
+
+
+@pytest.mark.django_db
+def test_get_archived_price_history_no_archive(archive_service, existing_item):
+    assert archive_service.get_archived_price_history(existing_item) == []
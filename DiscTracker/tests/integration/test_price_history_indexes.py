@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from items.models.db_models import Item, PriceHistory
+
+
+@pytest.fixture
+def items_with_history():
+    items = [
+        Item.objects.create(
+            cex_id=f"500000000000{index}",
+            title=f"Item {index}",
+            sell_price=8.0,
+            exchange_price=5.0,
+            cash_price=3.0,
+            last_checked=date(2025, 1, 1),
+        )
+        for index in range(5)
+    ]
+
+    start = date(2015, 1, 1)
+    PriceHistory.objects.bulk_create(
+        PriceHistory(
+            item=item,
+            sell_price=8.0 + day % 7,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=start + timedelta(days=day),
+        )
+        for day in range(1000)
+        for item in items
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE items_pricehistory")
+        # Small test tables are cheaper to scan sequentially so force the planner to
+        # show which index it would use on a real sized table
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    return items
+
+
+@pytest.mark.django_db
+def test_date_range_scan_uses_brin_index(items_with_history):
+    plan = PriceHistory.objects.filter(
+        date_checked__gte=date(2016, 1, 1), date_checked__lt=date(2016, 2, 1)
+    ).explain()
+
+    assert "items_pricehistory_date_brin" in plan
+
+
+@pytest.mark.django_db
+def test_item_chart_read_is_index_only_scan(items_with_history):
+    item = items_with_history[0]
+
+    with connection.cursor() as cursor:
+        # The visibility map is empty until VACUUM which can't run inside the test
+        # transaction, so a bitmap scan looks just as cheap here
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    plan = (
+        item.price_history.order_by("date_checked")
+        .values_list("date_checked", "sell_price", "exchange_price", "cash_price")
+        .explain()
+    )
+
+    assert "Index Only Scan using items_pricehistory_chart_idx" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_latest_item_price_uses_chart_index(items_with_history):
+    item = items_with_history[0]
+
+    plan = (
+        PriceHistory.objects.filter(item=item).order_by("-date_checked")[:1].explain()
+    )
+
+    assert "items_pricehistory_chart_idx" in plan
+    assert "Sort" not in plan
+
+
+@pytest.mark.django_db
+def test_item_chart_window_uses_chart_index(items_with_history):
+    item = items_with_history[0]
+
+    plan = (
+        item.price_history.filter(
+            date_checked__gte=date(2016, 1, 1), date_checked__lte=date(2016, 3, 31)
+        )
+        .order_by("date_checked")
+        .values_list("date_checked", "sell_price", "exchange_price", "cash_price")
+        .explain()
+    )
+
+    assert "Index Cond" in plan
+    assert "items_pricehistory_chart_idx" in plan
@@ -1,10 +1,12 @@
-from datetime import date
+from datetime import date, timedelta
+from django.contrib.auth.models import User
 from django.db import DatabaseError
+from django.urls import reverse
 from unittest.mock import patch
 
 import pytest
 from items.services.price_history_service import PriceHistoryService
-from items.models.db_models import Item, PriceHistory
+from items.models.db_models import Item, PriceHistory, UserItem
 
 
 @pytest.fixture
@@ -145,3 +147,84 @@ def test_has_price_changed_false(price_history_service, existing_item):
     assert (
         price_history_service.has_price_changed(existing_item, 8.0, 5.0, 3.0) is False
     )
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="testuser", password="password")
+
+
+@pytest.fixture
+def owned_history(user, existing_item):
+    UserItem.objects.create(user=user, item=existing_item)
+    return [
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=8.0 + day,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date(2025, 1, 1) + timedelta(days=day),
+        )
+        for day in range(150)
+    ]
+
+
+@pytest.mark.django_db
+def test_get_user_price_history_only_owned_items(
+    price_history_service, user, owned_history
+):
+    other_item = Item.objects.create(
+        cex_id="5051892011892",
+        title="Alien (18) 1979",
+        sell_price=6.0,
+        exchange_price=4.0,
+        cash_price=2.0,
+        last_checked=date(2025, 1, 1),
+    )
+    PriceHistory.objects.create(
+        item=other_item, sell_price=6.0, exchange_price=4.0, cash_price=2.0
+    )
+
+    price_history = price_history_service.get_user_price_history(user)
+
+    assert price_history.count() == len(owned_history)
+    assert {entry.item.cex_id for entry in price_history} == {"5060020626449"}
+
+
+@pytest.mark.django_db
+def test_get_user_price_history_invalid_user(price_history_service):
+    with pytest.raises(ValueError):
+        price_history_service.get_user_price_history(None)
+
+
+@pytest.mark.django_db
+def test_price_history_view_pages(
+    client, user, owned_history, django_assert_max_num_queries
+):
+    client.force_login(user)
+
+    with django_assert_max_num_queries(3):
+        response = client.get(reverse("items:price-history"))
+        content = response.content.decode()
+
+    assert response.status_code == 200
+    assert content.count("<tr>") == 101  # Header and a full page of entries
+    assert "May 30, 2025" in content  # Newest entry first
+    assert "Halloween (18) 1978" in content
+
+    next_cursor = content.split("cursor=")[1].split('"')[0]
+    response = client.get(reverse("items:price-history"), {"cursor": next_cursor})
+    content = response.content.decode()
+
+    assert content.count("<tr>") == 51
+    assert "Jan. 1, 2025" in content
+
+
+@pytest.mark.django_db
+def test_price_history_view_empty(client, user):
+    client.force_login(user)
+
+    response = client.get(reverse("items:price-history"))
+    content = response.content.decode()
+
+    assert "No price history available yet" in content
@@ -0,0 +1,167 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from items.services.price_history_service import PriceHistoryService
+from items.services.price_interval_service import PriceIntervalService
+from items.models.db_models import Item, PriceHistory, PriceInterval
+
+
+@pytest.fixture
+def price_interval_service():
+    return PriceIntervalService()
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+@pytest.mark.django_db
+def test_record_price_opens_interval(price_interval_service, existing_item):
+    interval = price_interval_service.record_price(existing_item, date(2025, 1, 1))
+
+    assert interval.valid_from == date(2025, 1, 1)
+    assert interval.valid_to == date(2025, 1, 1)
+    assert interval.sell_price == existing_item.sell_price
+    assert PriceInterval.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_record_price_extends_interval_when_price_unchanged(
+    price_interval_service, existing_item
+):
+    price_interval_service.record_price(existing_item, date(2025, 1, 1))
+    price_interval_service.record_price(existing_item, date(2025, 1, 5))
+    interval = price_interval_service.record_price(existing_item, date(2025, 1, 9))
+
+    assert interval.valid_from == date(2025, 1, 1)
+    assert interval.valid_to == date(2025, 1, 9)
+    assert PriceInterval.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_record_price_closes_interval_when_price_changed(
+    price_interval_service, existing_item
+):
+    price_interval_service.record_price(existing_item, date(2025, 1, 1))
+    price_interval_service.record_price(existing_item, date(2025, 1, 5))
+
+    existing_item.sell_price = 10.0
+    interval = price_interval_service.record_price(existing_item, date(2025, 1, 9))
+
+    assert interval.valid_from == date(2025, 1, 9)
+    assert interval.sell_price == 10.0
+
+    previous_interval = PriceInterval.objects.get(valid_from=date(2025, 1, 1))
+    assert previous_interval.valid_to == date(2025, 1, 8)
+    assert PriceInterval.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_record_price_changed_on_day_already_extended_to(
+    price_interval_service, existing_item
+):
+    price_interval_service.record_price(existing_item, date(2025, 1, 1))
+    price_interval_service.record_price(existing_item, date(2025, 1, 5))
+
+    existing_item.sell_price = 10.0
+    price_interval_service.record_price(existing_item, date(2025, 1, 5))
+
+    intervals = list(price_interval_service.get_intervals(existing_item))
+    assert [(i.valid_from.day, i.valid_to.day) for i in intervals] == [
+        (1, 4),
+        (5, 5),
+    ]
+    assert price_interval_service.get_price_at(
+        existing_item, date(2025, 1, 5)
+    ).sell_price == Decimal("10.00")
+
+
+@pytest.mark.django_db
+def test_record_price_invalid_item(price_interval_service):
+    interval = price_interval_service.record_price({"one": 1}, date(2025, 1, 1))
+
+    assert interval is None
+    assert PriceInterval.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_get_price_at(price_interval_service, existing_item):
+    price_interval_service.record_price(existing_item, date(2025, 1, 1))
+    price_interval_service.record_price(existing_item, date(2025, 1, 5))
+    existing_item.sell_price = 10.0
+    price_interval_service.record_price(existing_item, date(2025, 1, 9))
+
+    assert (
+        price_interval_service.get_price_at(existing_item, date(2024, 12, 31)) is None
+    )
+    assert price_interval_service.get_price_at(
+        existing_item, date(2025, 1, 3)
+    ).sell_price == Decimal("8.00")
+    assert price_interval_service.get_price_at(
+        existing_item, date(2025, 1, 9)
+    ).sell_price == Decimal("10.00")
+
+
+@pytest.mark.django_db
+def test_rebuild_from_price_history(price_interval_service, existing_item):
+    for day, sell_price in [(1, 8.0), (2, 8.0), (3, 8.0), (4, 9.0), (5, 8.0)]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date(2025, 1, day),
+        )
+
+    interval_count = price_interval_service.rebuild_from_price_history(existing_item)
+
+    intervals = list(price_interval_service.get_intervals(existing_item))
+    assert interval_count == 3
+    assert [(i.valid_from.day, i.valid_to.day) for i in intervals] == [
+        (1, 3),
+        (4, 4),
+        (5, 5),
+    ]
+
+
+@pytest.mark.django_db
+def test_rebuild_from_change_only_history(price_interval_service, existing_item):
+    for day, sell_price in [(1, 8.0), (5, 9.0), (9, 8.0)]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date(2025, 1, day),
+        )
+
+    price_interval_service.rebuild_from_price_history(existing_item)
+
+    intervals = list(price_interval_service.get_intervals(existing_item))
+    assert [(i.valid_from.day, i.valid_to.day) for i in intervals] == [
+        (1, 4),
+        (5, 8),
+        (9, 9),
+    ]
+
+
+@pytest.mark.django_db
+def test_price_history_service_records_intervals(price_interval_service, existing_item):
+    price_history_service = PriceHistoryService(
+        price_interval_service=price_interval_service
+    )
+
+    price_history_service.create_price_history_entry(existing_item)
+    price_history_service.create_price_history_if_price_changed(existing_item)
+
+    assert PriceHistory.objects.count() == 1
+    assert PriceInterval.objects.count() == 1
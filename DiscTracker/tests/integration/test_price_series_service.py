@@ -0,0 +1,125 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from items.services.price_history_service import PriceHistoryService
+from items.services.price_series_service import (
+    PriceSeriesService,
+    decode_block,
+    encode_points,
+)
+from items.models.db_models import Item, PriceHistory, PriceSeriesBlock
+
+
+@pytest.fixture
+def price_series_service():
+    return PriceSeriesService()
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+def test_encode_decode_round_trip():
+    day_deltas = [3, 1, 200, 0]
+    prices = [(800, 500, 300), (750, 500, 300), (300000, 0, 1), (299999, 12, 1)]
+
+    dates, decoded_prices = decode_block(encode_points(day_deltas, prices), 2025)
+
+    assert dates.tolist() == [
+        date(2025, 1, 4),
+        date(2025, 1, 5),
+        date(2025, 7, 24),
+        date(2025, 7, 24),
+    ]
+    assert decoded_prices.tolist() == [list(point) for point in prices]
+
+
+def test_decode_truncated_block():
+    data = encode_points([1], [(300000, 0, 0)])
+
+    with pytest.raises(ValueError):
+        decode_block(data[:-1], 2025)
+
+
+@pytest.mark.django_db
+def test_append_price_creates_and_extends_block(price_series_service, existing_item):
+    price_series_service.append_price(existing_item, 8.0, 5.0, 3.0, date(2025, 1, 1))
+    price_series_service.append_price(existing_item, 7.5, 5.0, 2.0, date(2025, 1, 8))
+
+    block = PriceSeriesBlock.objects.get(item=existing_item)
+    assert block.point_count == 2
+    assert block.last_date == date(2025, 1, 8)
+    assert block.last_sell_price == 750
+
+    series = price_series_service.get_price_series(existing_item)
+    assert series["dates"].tolist() == [date(2025, 1, 1), date(2025, 1, 8)]
+    np.testing.assert_allclose(series["sell_prices"], [8.0, 7.5])
+    np.testing.assert_allclose(series["cash_prices"], [3.0, 2.0])
+
+
+@pytest.mark.django_db
+def test_append_price_out_of_order(price_series_service, existing_item):
+    price_series_service.append_price(existing_item, 8.0, 5.0, 3.0, date(2025, 1, 8))
+    block = price_series_service.append_price(
+        existing_item, 7.5, 5.0, 2.0, date(2025, 1, 1)
+    )
+
+    assert block is None
+    assert PriceSeriesBlock.objects.get(item=existing_item).point_count == 1
+
+
+@pytest.mark.django_db
+def test_rebuild_from_price_history(price_series_service, existing_item):
+    for date_checked, sell_price in [
+        (date(2024, 12, 30), 9.0),
+        (date(2025, 1, 2), 8.5),
+        (date(2025, 2, 1), 8.0),
+    ]:
+        PriceHistory.objects.create(
+            item=existing_item,
+            sell_price=sell_price,
+            exchange_price=5.0,
+            cash_price=3.0,
+            date_checked=date_checked,
+        )
+
+    point_count = price_series_service.rebuild_from_price_history(existing_item)
+
+    series = price_series_service.get_price_series(existing_item)
+    assert point_count == 3
+    assert PriceSeriesBlock.objects.filter(item=existing_item).count() == 2
+    assert series["dates"].tolist() == [
+        date(2024, 12, 30),
+        date(2025, 1, 2),
+        date(2025, 2, 1),
+    ]
+    np.testing.assert_allclose(series["sell_prices"], [9.0, 8.5, 8.0])
+
+
+@pytest.mark.django_db
+def test_get_price_series_empty(price_series_service, existing_item):
+    series = price_series_service.get_price_series(existing_item)
+
+    assert series["dates"].size == 0
+
+
+@pytest.mark.django_db
+def test_price_history_service_appends_series(price_series_service, existing_item):
+    price_history_service = PriceHistoryService(
+        price_series_service=price_series_service
+    )
+
+    price_history_service.create_price_history_entry(existing_item)
+
+    series = price_series_service.get_price_series(existing_item)
+    assert series["dates"].tolist() == [date.today()]
+    np.testing.assert_allclose(series["exchange_prices"], [5.0])
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from items.services.price_history_archive_service import PriceHistoryArchiveService
+from items.services.price_history_service import PriceHistoryService
+from items.services.price_stats_service import PriceStatsService
+from items.models.db_models import Item, ItemPriceStats, PriceHistory
+
+
+@pytest.fixture
+def archive_service(tmp_path):
+    return PriceHistoryArchiveService(archive_dir=tmp_path / "archive")
+
+
+@pytest.fixture
+def price_stats_service(archive_service):
+    return PriceStatsService(archive_service=archive_service)
+
+
+@pytest.fixture
+def existing_item():
+    return Item.objects.create(
+        cex_id="5060020626449",
+        title="Halloween (18) 1978",
+        sell_price=8.0,
+        exchange_price=5.0,
+        cash_price=3.0,
+        last_checked=date(2025, 1, 1),
+    )
+
+
+def create_price_history(item, sell_price, days_ago):
+    return PriceHistory.objects.create(
+        item=item,
+        sell_price=sell_price,
+        exchange_price=5.0,
+        cash_price=3.0,
+        date_checked=date.today() - timedelta(days=days_ago),
+    )
+
+
+@pytest.mark.django_db
+def test_record_price_history_entry_creates_stats(price_stats_service, existing_item):
+    price_entry = create_price_history(existing_item, 8.0, 0)
+
+    stats = price_stats_service.record_price_history_entry(price_entry)
+
+    assert stats.entry_count == 1
+    assert stats.sell_price_min == Decimal("8.00")
+    assert stats.sell_price_max == Decimal("8.00")
+    assert stats.sell_price_avg == Decimal("8.00")
+    assert stats.sell_price_change_30d == Decimal("0.00")
+
+
+@pytest.mark.django_db
+def test_record_price_history_entry_updates_stats_incrementally(
+    price_stats_service, existing_item
+):
+    for sell_price, days_ago in [(10.0, 60), (6.0, 40), (9.0, 10)]:
+        price_entry = create_price_history(existing_item, sell_price, days_ago)
+        stats = price_stats_service.record_price_history_entry(price_entry)
+
+    assert stats.entry_count == 3
+    assert stats.sell_price_min == Decimal("6.00")
+    assert stats.sell_price_max == Decimal("10.00")
+    assert stats.sell_price_avg == Decimal("8.33")
+    # Compared against the price 30 days ago which was 6.0
+    assert stats.sell_price_change_30d == Decimal("3.00")
+
+
+@pytest.mark.django_db
+def test_record_price_history_entry_invalid_entry(price_stats_service):
+    stats = price_stats_service.record_price_history_entry({"one": 1})
+
+    assert stats is None
+    assert ItemPriceStats.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_price_stats(price_stats_service, existing_item):
+    create_price_history(existing_item, 10.0, 60)
+    create_price_history(existing_item, 8.0, 10)
+
+    rebuilt_count = price_stats_service.rebuild_price_stats()
+
+    stats = ItemPriceStats.objects.get(item=existing_item)
+    assert rebuilt_count == 1
+    assert stats.entry_count == 2
+    assert stats.sell_price_min == Decimal("8.00")
+    assert stats.sell_price_max == Decimal("10.00")
+    assert stats.sell_price_avg == Decimal("9.00")
+    assert stats.sell_price_change_30d == Decimal("-2.00")
+
+
+@pytest.mark.django_db
+def test_rebuild_price_stats_includes_archived_history(
+    price_stats_service, archive_service, existing_item
+):
+    create_price_history(existing_item, 10.0, 90)
+    create_price_history(existing_item, 6.0, 60)
+    create_price_history(existing_item, 8.0, 10)
+    price_stats_service.rebuild_price_stats()
+    stats_before = ItemPriceStats.objects.get(item=existing_item)
+
+    # The entry from 60 days ago is the 30 day baseline so it stays
+    assert archive_service.archive_price_history(date.today() - timedelta(days=30)) == 1
+    price_stats_service.rebuild_price_stats()
+
+    stats = ItemPriceStats.objects.get(item=existing_item)
+    assert PriceHistory.objects.filter(item=existing_item).count() == 2
+    assert stats.entry_count == stats_before.entry_count == 3
+    assert stats.sell_price_min == stats_before.sell_price_min == Decimal("6.00")
+    assert stats.sell_price_max == stats_before.sell_price_max == Decimal("10.00")
+    assert stats.sell_price_sum == stats_before.sell_price_sum == Decimal("24.00")
+    assert stats.sell_price_avg == stats_before.sell_price_avg == Decimal("8.00")
+    assert stats.sell_price_change_30d == stats_before.sell_price_change_30d
+    assert stats.sell_price_change_30d == Decimal("2.00")
+
+
+@pytest.mark.django_db
+def test_price_history_service_records_stats(existing_item):
+    price_history_service = PriceHistoryService()
+
+    price_history_service.create_price_history_entry(existing_item)
+
+    stats = ItemPriceStats.objects.get(item=existing_item)
+    assert stats.entry_count == 1
+    assert stats.cash_price_max == Decimal("3.00")
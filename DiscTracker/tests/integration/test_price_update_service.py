@@ -9,7 +9,8 @@ from items.services.price_history_service import PriceHistoryService
 from items.services.cex_service import CexService
 from items.validators.item_validator import ItemDataValidator
 from items.models.pydantic_models import ItemData
-from items.models.db_models import Item
+from items.models.db_models import Item, PriceHistory
+from items.tasks import refresh_item_task
 
 
 @pytest.fixture
@@ -21,6 +22,7 @@ def existing_item():
         exchange_price=15.0,
         cash_price=10.0,
         last_checked=date(2024, 12, 31),
+        last_refreshed=date(2024, 12, 31),
     )
 
 
@@ -472,3 +474,81 @@ def test_check_price_updates_unexpected_error_outer(
     updated_items = price_update_service.check_price_updates()
 
     assert updated_items is None
+
+
+@pytest.mark.django_db
+@patch("items.services.cex_service.CexService.fetch_item")
+def test_refresh_item_task_updates_price(mock_fetch, existing_item):
+    mock_fetch.return_value = ItemData(
+        cex_id=existing_item.cex_id,
+        title=existing_item.title,
+        sell_price=18.0,
+        exchange_price=15.0,
+        cash_price=10.0,
+    )
+
+    refresh_item_task(existing_item.cex_id)
+
+    existing_item.refresh_from_db()
+    assert existing_item.sell_price == 18.0
+    assert existing_item.last_checked == date.today()
+    assert existing_item.last_refreshed == date.today()
+    assert PriceHistory.objects.filter(item=existing_item).count() == 1
+    mock_fetch.assert_called_once_with(existing_item.cex_id)
+
+
+@pytest.mark.django_db
+@patch("items.services.cex_service.CexService.fetch_item")
+def test_refresh_item_task_unchanged_price_makes_item_fresh(
+    mock_fetch, existing_item, price_update_service
+):
+    mock_fetch.return_value = ItemData(
+        cex_id=existing_item.cex_id,
+        title=existing_item.title,
+        sell_price=20.0,
+        exchange_price=15.0,
+        cash_price=10.0,
+    )
+    assert not price_update_service.item_service.is_item_fresh(existing_item)
+
+    refresh_item_task(existing_item.cex_id)
+
+    existing_item.refresh_from_db()
+    # The price change date stays put but the item no longer needs a refresh
+    assert existing_item.last_checked == date(2024, 12, 31)
+    assert existing_item.last_refreshed == date.today()
+    assert price_update_service.item_service.is_item_fresh(existing_item)
+    assert PriceHistory.objects.filter(item=existing_item).count() == 0
+
+
+@pytest.mark.django_db
+@patch("items.services.cex_service.CexService.fetch_item")
+def test_refresh_item_task_missing_item(mock_fetch):
+    refresh_item_task("missing")
+
+    mock_fetch.assert_not_called()
+
+
+@pytest.mark.django_db
+@patch("items.services.price_event_service.PriceEventService.publish_price_change")
+@patch("items.services.cex_service.CexService.fetch_item")
+def test_update_item_price_publishes_change_on_commit(
+    mock_fetch_item,
+    mock_publish,
+    price_update_service,
+    existing_item,
+    django_capture_on_commit_callbacks,
+):
+    mock_fetch_item.return_value = ItemData(
+        cex_id=existing_item.cex_id,
+        title=existing_item.title,
+        sell_price=18.0,
+        exchange_price=15.0,
+        cash_price=10.0,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        price_update_service.update_item_price(existing_item)
+        mock_publish.assert_not_called()
+
+    mock_publish.assert_called_once_with(existing_item.id)
@@ -0,0 +1,59 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from disctracker.db_routers import pin_to_primary
+from items.models.db_models import Item, UserItem
+
+# Run with DATABASE_REPLICA_HOST set, pointing it at the primary's own host
+# simulates a replica with a second connection. That connection only sees
+# committed rows, hence the transactional tests.
+pytestmark = [
+    pytest.mark.skipif(
+        not settings.DATABASE_REPLICA_ALIAS, reason="No read replica configured"
+    ),
+    pytest.mark.django_db(transaction=True, databases=["default", "replica"]),
+]
+
+
+@pytest.fixture
+def user():
+    user = User.objects.create_user(username="testuser", password="password")
+    item = Item.objects.create(
+        cex_id="111", title="Alien", sell_price=1, exchange_price=1, cash_price=1
+    )
+    UserItem.objects.create(user=user, item=item)
+    return user
+
+
+def test_read_only_view_reads_replica(client, user):
+    client.force_login(user)
+
+    with CaptureQueriesContext(connections["replica"]) as replica_queries:
+        response = client.get(reverse("items:export"), {"format": "ndjson"})
+        content = b"".join(response.streaming_content)
+
+    assert b'"cex_id": "111"' in content
+    assert replica_queries.captured_queries
+
+
+def test_pinned_user_reads_primary(client, user):
+    client.force_login(user)
+    pin_to_primary(user.id)
+
+    with CaptureQueriesContext(connections["replica"]) as replica_queries:
+        client.get(reverse("items:index"))
+
+    assert not replica_queries.captured_queries
+
+
+def test_write_pins_user(client, user):
+    client.force_login(user)
+
+    client.post(reverse("items:delete-item", args=["111"]))
+    with CaptureQueriesContext(connections["replica"]) as replica_queries:
+        client.get(reverse("items:index"))
+
+    assert not replica_queries.captured_queries
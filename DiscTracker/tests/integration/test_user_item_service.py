@@ -1,4 +1,5 @@
 from datetime import date
+from asgiref.sync import async_to_sync
 from django.db import DatabaseError
 from unittest.mock import patch
 import pytest
@@ -82,3 +83,25 @@ def test_delete_user_item_not_owned(user_item_service, user, item):
 def test_delete_user_item_database_error(mock_delete, user_item_service, user, item):
     mock_delete.side_effect = DatabaseError
     assert user_item_service.delete_user_item(user, item) is False
+
+
+@pytest.mark.django_db
+def test_aadd_user_item_success(user_item_service, user, item):
+    with patch.object(
+        user_item_service.collection_cache_service, "invalidate_collection"
+    ) as mock_invalidate:
+        user_item = async_to_sync(user_item_service.aadd_user_item)(user, item)
+
+    assert user_item.user == user
+    assert UserItem.objects.filter(user=user, item=item).exists()
+    mock_invalidate.assert_called_once_with(user.id)
+
+
+@pytest.mark.django_db
+def test_aadd_user_item_already_owned(user_item_service, user, item):
+    UserItem.objects.create(user=user, item=item)
+
+    user_item = async_to_sync(user_item_service.aadd_user_item)(user, item)
+
+    assert user_item is None
+    assert UserItem.objects.filter(user=user, item=item).count() == 1
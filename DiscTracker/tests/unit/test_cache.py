@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache import cache
+from disctracker.db_routers import is_pinned_to_primary
+from items.cache import CacheNamespace
+
+
+@pytest.fixture
+def namespace():
+    return CacheNamespace("test", timeout=60)
+
+
+def test_keys_are_namespaced(namespace):
+    namespace.set(namespace.key("grid", 1, "abc"), "html")
+
+    assert cache.get("test:grid:1:abc") == "html"
+    assert CacheNamespace("other").get("test:grid:1:abc") == "html"
+    assert CacheNamespace("other").key("grid", 1, "abc") == "other:grid:1:abc"
+
+
+def test_version_is_stable_until_bumped(namespace):
+    version = namespace.get_version(1)
+    other_version = namespace.get_version(2)
+
+    assert namespace.get_version(1) == version
+
+    namespace.bump_version(1)
+
+    assert namespace.get_version(1) != version
+    assert namespace.get_version(2) == other_version
+
+
+def test_bump_version_after_cache_flush(namespace):
+    version = namespace.get_version(1)
+    cache.clear()
+
+    namespace.bump_version(1)
+
+    assert namespace.get_version(1) > version
+
+
+def test_bump_version_pins_readers_to_primary(namespace, settings):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+
+    namespace.bump_version(1, pin_user_id=1)
+
+    assert is_pinned_to_primary(1)
+    assert not is_pinned_to_primary(2)
+
+    namespace.bump_version(2)
+
+    assert is_pinned_to_primary(2)
+
+
+@pytest.mark.django_db
+def test_bump_version_on_commit(
+    namespace, settings, django_capture_on_commit_callbacks
+):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+    version = namespace.get_version(1)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        namespace.bump_version_on_commit(1, pin_user_id=1)
+
+        assert namespace.get_version(1) == version
+        assert not is_pinned_to_primary(1)
+
+    assert namespace.get_version(1) != version
+    assert is_pinned_to_primary(1)
+
+
+def test_get_or_build_caches_value(namespace):
+    build = MagicMock(return_value="chart")
+
+    assert namespace.get_or_build("test:chart", build) == "chart"
+    assert namespace.get_or_build("test:chart", build) == "chart"
+
+    build.assert_called_once()
+    assert cache.get("test:chart:lock") is None
+
+
+def test_get_or_build_does_not_cache_none(namespace):
+    build = MagicMock(return_value=None)
+
+    assert namespace.get_or_build("test:chart", build) is None
+    assert namespace.get_or_build("test:chart", build) is None
+
+    assert build.call_count == 2
+
+
+def test_get_or_build_releases_lock_on_error(namespace):
+    build = MagicMock(side_effect=RuntimeError)
+
+    with pytest.raises(RuntimeError):
+        namespace.get_or_build("test:chart", build)
+
+    assert cache.get("test:chart:lock") is None
+
+
+def test_get_or_build_waits_for_other_builder(namespace):
+    cache.add("test:chart:lock", True)
+    build = MagicMock(return_value="rebuilt")
+
+    def other_builder_finishes(seconds):
+        cache.set("test:chart", "chart")
+
+    with patch("items.cache.time.sleep", side_effect=other_builder_finishes):
+        assert namespace.get_or_build("test:chart", build) == "chart"
+
+    build.assert_not_called()
+
+
+def test_get_or_build_builds_when_other_builder_gives_up(namespace):
+    cache.add("test:chart:lock", True)
+    build = MagicMock(return_value="chart")
+
+    def other_builder_fails(seconds):
+        cache.delete("test:chart:lock")
+
+    with patch("items.cache.time.sleep", side_effect=other_builder_fails):
+        assert namespace.get_or_build("test:chart", build) == "chart"
+
+    build.assert_called_once()
+    assert cache.get("test:chart") == "chart"
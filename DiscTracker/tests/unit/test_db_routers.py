@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from disctracker.db_routers import (
+    ReplicaRouter,
+    is_pinned_to_primary,
+    pin_to_primary,
+    read_from_replica,
+    replica_reads,
+)
+from disctracker.middleware import ReplicaPinningMiddleware
+from items.models.db_models import Item
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+    settings.REPLICA_PIN_SECONDS = 10
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter()
+
+
+def make_request(method="get", user_id=1):
+    request = getattr(RequestFactory(), method)("/items/")
+    request.user = MagicMock(id=user_id, is_authenticated=True)
+    return request
+
+
+def read_alias_view(request):
+    return HttpResponse(ReplicaRouter().db_for_read(Item))
+
+
+def test_reads_stay_on_primary_by_default(replica, router):
+    assert router.db_for_read(Item) == "default"
+
+    with replica_reads():
+        assert router.db_for_read(Item) == "replica"
+        # Writes never go to the replica, even for an instance read from it
+        assert router.db_for_write(Item) == "default"
+
+    assert router.db_for_read(Item) == "default"
+
+
+def test_without_replica_everything_uses_primary(settings, router):
+    settings.DATABASE_REPLICA_ALIAS = None
+
+    with replica_reads():
+        assert router.db_for_read(Item) == "default"
+    assert read_from_replica(read_alias_view)(make_request()).content == b"default"
+
+
+def test_replica_is_not_migrated(replica, router):
+    assert router.allow_migrate("default", "items")
+    assert not router.allow_migrate("replica", "items")
+
+
+def test_read_from_replica(replica):
+    assert read_from_replica(read_alias_view)(make_request()).content == b"replica"
+
+
+def test_read_from_replica_pinned_user(replica):
+    pin_to_primary(1)
+
+    assert read_from_replica(read_alias_view)(make_request()).content == b"default"
+    assert read_from_replica(read_alias_view)(make_request(user_id=2)).content == (
+        b"replica"
+    )
+
+
+def test_pin_all_users(replica):
+    pin_to_primary()
+
+    assert is_pinned_to_primary(1)
+    assert is_pinned_to_primary(None)
+
+
+def test_pin_without_replica_is_skipped(settings):
+    settings.DATABASE_REPLICA_ALIAS = None
+
+    pin_to_primary(1)
+
+    assert not is_pinned_to_primary(1)
+
+
+def test_middleware_pins_after_write(replica):
+    middleware = ReplicaPinningMiddleware(lambda request: HttpResponse())
+
+    middleware(make_request("get", user_id=1))
+    middleware(make_request("post", user_id=2))
+    anonymous_request = make_request("post", user_id=None)
+    anonymous_request.user = AnonymousUser()
+    middleware(anonymous_request)
+
+    assert not is_pinned_to_primary(1)
+    assert is_pinned_to_primary(2)
+    assert not is_pinned_to_primary(None)
+
+
+def test_middleware_stays_async_for_async_views(replica):
+    async def view(request):
+        return HttpResponse()
+
+    middleware = ReplicaPinningMiddleware(view)
+    assert iscoroutinefunction(middleware)
+
+    async_to_sync(middleware)(make_request("post", user_id=3))
+
+    assert is_pinned_to_primary(3)
@@ -27,4 +27,13 @@ gpg --batch --yes --symmetric --cipher-algo AES256 --passphrase $GPG_PASSPHRASE
 # Upload the backup to S3
 aws s3 cp $BACKUP_DIR/db-backup-$TIMESTAMP.sql.gz.gpg s3://$S3_BUCKET_NAME/ --sse AES256
 
+# Archived price history lives outside Postgres so back it up separately
+if [ -n "$ARCHIVE_DIR" ] && [ -d "$ARCHIVE_DIR" ]; then
+  tar -czf $BACKUP_DIR/archive-backup-$TIMESTAMP.tar.gz -C $ARCHIVE_DIR .
+
+  gpg --batch --yes --symmetric --cipher-algo AES256 --passphrase $GPG_PASSPHRASE -o $BACKUP_DIR/archive-backup-$TIMESTAMP.tar.gz.gpg $BACKUP_DIR/archive-backup-$TIMESTAMP.tar.gz
+
+  aws s3 cp $BACKUP_DIR/archive-backup-$TIMESTAMP.tar.gz.gpg s3://$S3_BUCKET_NAME/ --sse AES256
+fi
+
 echo "✅ Backup completed and securely uploaded to S3!"
\ No newline at end of file